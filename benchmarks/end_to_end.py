@@ -0,0 +1,189 @@
+"""
+Runs end-to-end conversions of synthetic Enrich2, Enrich and EMPIRIC inputs
+at increasing sizes and reports wall time, throughput and peak memory per
+stage. Each conversion runs in a fresh interpreter through the
+`mavedbconvert` command line with `--report` so peak memory is not shared
+between runs.
+
+Usage:
+  end_to_end.py [--sizes=N] [--programs=P] [--output=O] [--workdir=D] [--seed=S]
+  end_to_end.py -h | --help
+
+Options:
+  -h --help         Show this screen.
+
+  --sizes=N         Comma separated numbers of rows to generate.
+                    [default: 10000,100000,1000000]
+
+  --programs=P      Comma separated programs to benchmark.
+                    [default: enrich2,enrich,empiric]
+
+  --output=O        Write the collected results to this JSON file.
+                    [default: None]
+
+  --workdir=D       Directory to generate inputs and outputs in. A temporary
+                    directory that is removed afterwards is used if not
+                    given. [default: None]
+
+  --seed=S          Random seed. [default: 0]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+
+import docopt
+
+import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Input file name and extra command line arguments per program.
+PROGRAMS = {
+    "enrich2": ("enrich2.h5", []),
+    "enrich": ("enrich.tsv", ["--score-column=log2_ratio"]),
+    "empiric": ("empiric.tsv", ["--score-column=score"]),
+}
+
+
+def run_conversion(program, src, wtseq, dst, report_path):
+    """
+    Converts `src` with the `mavedbconvert` command line in a subprocess and
+    returns the parsed run report. The conversion cache is bypassed so
+    repeated runs on the same workdir are timed in full.
+    """
+    _, extra = PROGRAMS[program]
+    cmd = [
+        sys.executable,
+        "-m",
+        "mavedbconvert.main",
+        program,
+        src,
+        "--wtseq={}".format(wtseq),
+        "--dst={}".format(dst),
+        "--report={}".format(report_path),
+        "--no-cache",
+    ] + extra
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (ROOT, env.get("PYTHONPATH", None)) if p
+    )
+    started = time.perf_counter()
+    result = subprocess.run(
+        cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    wall_time = time.perf_counter() - started
+    if not os.path.isfile(report_path):
+        raise RuntimeError(
+            "{} failed without writing a report:\n{}".format(program, result.stderr)
+        )
+    with open(report_path, "rt") as fh:
+        report = json.load(fh)
+    report["process_wall_time"] = wall_time
+    report["returncode"] = result.returncode
+    return report
+
+
+def benchmark(programs, sizes, workdir, seed=0):
+    """
+    Generates an input for every program and size, converts it and returns
+    one result dictionary per run.
+    """
+    results = []
+    for program in programs:
+        filename, _ = PROGRAMS[program]
+        for size in sizes:
+            run_dir = os.path.join(workdir, "{}_{}".format(program, size))
+            os.makedirs(run_dir, exist_ok=True)
+            src = os.path.join(run_dir, filename)
+
+            started = time.perf_counter()
+            wtseq, rows = synthetic.generate(program, src, size, seed=seed)
+            generate_time = time.perf_counter() - started
+
+            report = run_conversion(
+                program,
+                src,
+                wtseq,
+                os.path.join(run_dir, "output"),
+                os.path.join(run_dir, "report.json"),
+            )
+            results.append(
+                {
+                    "program": program,
+                    "size": size,
+                    "rows": rows,
+                    "input_size": os.path.getsize(src),
+                    "generate_time": generate_time,
+                    "report": report,
+                }
+            )
+            print(format_row(results[-1]), flush=True)
+    return results
+
+
+HEADER = "{:<8} {:>9} {:>10} {:>8} {:>11} {:>11} {:>13}  {}".format(
+    "program",
+    "rows",
+    "input (MB)",
+    "status",
+    "elapsed (s)",
+    "rows/s",
+    "peak RSS (MB)",
+    "slowest stage",
+)
+
+
+def format_row(result):
+    report = result["report"]
+    stages = report.get("stages", {})
+    slowest = max(stages.items(), key=lambda kv: kv[1]["wall_time"], default=None)
+    rate = report.get("rows_per_second", None)
+    rss = report.get("peak_rss", None)
+    return "{:<8} {:>9} {:>10.1f} {:>8} {:>11.2f} {:>11} {:>13}  {}".format(
+        result["program"],
+        result["rows"],
+        result["input_size"] / 2**20,
+        report["status"],
+        report["elapsed"],
+        "-" if rate is None else "{:.0f}".format(rate),
+        "-" if rss is None else "{:.1f}".format(rss / 2**20),
+        (
+            "-"
+            if slowest is None
+            else "{} ({:.2f}s)".format(slowest[0], slowest[1]["wall_time"])
+        ),
+    )
+
+
+def main():
+    args = docopt.docopt(__doc__)
+    programs = [p.strip() for p in args["--programs"].split(",") if p.strip()]
+    unknown = set(programs) - set(PROGRAMS)
+    if unknown:
+        raise ValueError("Unknown programs: {}.".format(", ".join(sorted(unknown))))
+    sizes = [int(s) for s in args["--sizes"].split(",") if s.strip()]
+
+    workdir = args["--workdir"]
+    cleanup = workdir in (None, "None")
+    if cleanup:
+        workdir = tempfile.mkdtemp(prefix="mavedbconvert_bench_")
+    try:
+        print(HEADER)
+        print("-" * len(HEADER))
+        results = benchmark(programs, sizes, workdir, seed=int(args["--seed"]))
+    finally:
+        if cleanup:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args["--output"] not in (None, "None"):
+        with open(args["--output"], "wt") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Micro-benchmarks for the HGVS hot paths in `mavedbconvert.utilities` and the
+wild-type validation in `mavedbconvert.base.BaseProgram`.
+
+Results can be saved as a baseline and compared against a later run, for
+example before and after a change to the parsing code:
+
+    python benchmarks/micro.py --save
+    # ... make changes ...
+    python benchmarks/micro.py --compare=benchmarks/baselines/<commit>.json
+
+Usage:
+  micro.py [--filter=F] [--repeat=R] [--save] [--baseline=B] [--compare=B] [--threshold=T]
+  micro.py -h | --help
+
+Options:
+  -h --help         Show this screen.
+
+  --filter=F        Only run benchmarks whose name contains this substring.
+                    [default: None]
+
+  --repeat=R        Number of timing repeats. The fastest is reported.
+                    [default: 5]
+
+  --save            Save the results as a baseline.
+
+  --baseline=B      File to save the baseline to. Defaults to
+                    'baselines/<commit>.json' next to this script.
+                    [default: None]
+
+  --compare=B       Compare the results against this baseline file and exit
+                    with status 1 if any benchmark regressed. [default: None]
+
+  --threshold=T     Relative slowdown reported as a regression.
+                    [default: 0.10]
+"""
+
+import os
+import sys
+import json
+import timeit
+import platform
+import tempfile
+import subprocess
+from collections import OrderedDict
+
+import docopt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mavedbconvert import utilities, base  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+WT_SEQUENCE = "ATGAAAGCTTTTGGGCCCACTTTACAACGCTGCTTAGAGCGATGAGCTAAC" * 4
+NT_SINGLE = "c.4A>G"
+NT_SILENT = "c.6="
+NT_MULTI = "c.[4A>G;8C>T;12T>A]"
+PRO_SINGLE = "p.Lys2Glu"
+PRO_SILENT = "p.Lys2="
+PRO_MULTI = "p.[Lys2Glu;Ala3Val;Phe4Leu]"
+COLUMN = ["1.5", "NaN", "2", None, "undefined", "-0.25", "", "3e-4"] * 125
+
+
+class _Program(base.BaseProgram):
+    """Concrete `BaseProgram` used to call the validation methods."""
+
+    def load_input_file(self):
+        pass  # pragma: no cover
+
+    def parse_input(self, df):
+        pass  # pragma: no cover
+
+    def parse_row(self, row):
+        pass  # pragma: no cover
+
+
+def make_program():
+    dst = tempfile.mkdtemp(prefix="mavedbconvert_micro_")
+    return _Program(
+        src=os.path.join(dst, "input.tsv"), wt_sequence=WT_SEQUENCE, dst=dst
+    )
+
+
+def benchmarks():
+    """
+    Returns an ordered mapping of benchmark names to zero argument callables.
+    Callables operating on a list report the time for the whole list.
+    """
+    program = make_program()
+    return OrderedDict(
+        [
+            (
+                "NucleotideSubstitutionEvent[single]",
+                lambda: utilities.NucleotideSubstitutionEvent(NT_SINGLE),
+            ),
+            (
+                "NucleotideSubstitutionEvent[silent]",
+                lambda: utilities.NucleotideSubstitutionEvent(NT_SILENT),
+            ),
+            (
+                "ProteinSubstitutionEvent[single]",
+                lambda: utilities.ProteinSubstitutionEvent(PRO_SINGLE),
+            ),
+            (
+                "ProteinSubstitutionEvent[silent]",
+                lambda: utilities.ProteinSubstitutionEvent(PRO_SILENT),
+            ),
+            ("split_variant[single]", lambda: utilities.split_variant(NT_SINGLE)),
+            ("split_variant[multi]", lambda: utilities.split_variant(NT_MULTI)),
+            ("normalize_variant[nt]", lambda: utilities.normalize_variant(NT_MULTI)),
+            (
+                "normalize_variant[pro]",
+                lambda: utilities.normalize_variant("p.[Lys2???;Ala3Val]"),
+            ),
+            (
+                "hgvs_nt_from_event_list[single]",
+                lambda: utilities.hgvs_nt_from_event_list(["4A>G"], "c"),
+            ),
+            (
+                "hgvs_nt_from_event_list[multi]",
+                lambda: utilities.hgvs_nt_from_event_list(
+                    ["4A>G", "8C>T", "12T>A"], "c"
+                ),
+            ),
+            (
+                "hgvs_pro_from_event_list[single]",
+                lambda: utilities.hgvs_pro_from_event_list(["Lys2Glu"]),
+            ),
+            (
+                "hgvs_pro_from_event_list[multi]",
+                lambda: utilities.hgvs_pro_from_event_list(
+                    ["Lys2Glu", "Ala3Val", "Phe4Leu"]
+                ),
+            ),
+            ("is_null[value]", lambda: utilities.is_null("1.5")),
+            ("is_null[null]", lambda: utilities.is_null("undefined")),
+            ("format_column[1000]", lambda: utilities.format_column(COLUMN)),
+            (
+                "validate_against_wt_sequence[single]",
+                lambda: program.validate_against_wt_sequence(NT_SINGLE),
+            ),
+            (
+                "validate_against_wt_sequence[multi]",
+                lambda: program.validate_against_wt_sequence(NT_MULTI),
+            ),
+            (
+                "validate_against_wt_sequence[special]",
+                lambda: program.validate_against_wt_sequence("_wt"),
+            ),
+            (
+                "validate_against_protein_sequence[single]",
+                lambda: program.validate_against_protein_sequence(PRO_SINGLE),
+            ),
+            (
+                "validate_against_protein_sequence[multi]",
+                lambda: program.validate_against_protein_sequence(PRO_MULTI),
+            ),
+            (
+                "validate_against_protein_sequence[special]",
+                lambda: program.validate_against_protein_sequence("_sy"),
+            ),
+        ]
+    )
+
+
+def time_call(func, repeat=5):
+    """Returns the fastest time per call of `func` in seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(name_filter=None, repeat=5):
+    """
+    Runs the benchmarks and returns a baseline document with the time per
+    call of each benchmark in seconds.
+    """
+    results = OrderedDict()
+    for name, func in benchmarks().items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = time_call(func, repeat=repeat)
+    return OrderedDict(
+        [
+            ("commit", git_revision()),
+            ("python", platform.python_version()),
+            ("machine", platform.machine()),
+            ("results", results),
+        ]
+    )
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Formats a comparison of two baseline documents as a plain text table.
+
+    Returns
+    -------
+    tuple[str, list[str]]
+        The table and the names of benchmarks slower than the baseline by more
+        than `threshold`.
+    """
+    header = "{:<44} {:>12} {:>12} {:>8}".format(
+        "benchmark", "baseline (us)", "current (us)", "ratio"
+    )
+    lines = [
+        "Comparing {} against baseline {}".format(
+            current["commit"], baseline.get("commit", None)
+        ),
+        header,
+        "-" * len(header),
+    ]
+    regressions = []
+    for name, seconds in current["results"].items():
+        before = baseline["results"].get(name, None)
+        if before is None:
+            lines.append("{:<44} {:>12} {:>12.2f}".format(name, "-", seconds * 1e6))
+            continue
+        ratio = seconds / before
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        lines.append(
+            "{:<44} {:>12.2f} {:>12.2f} {:>8.2f}{}".format(
+                name, before * 1e6, seconds * 1e6, ratio, flag
+            )
+        )
+    return "\n".join(lines), regressions
+
+
+def main():
+    args = docopt.docopt(__doc__)
+    name_filter = args["--filter"]
+    if name_filter == "None":
+        name_filter = None
+    current = run(name_filter, repeat=int(args["--repeat"]))
+
+    for name, seconds in current["results"].items():
+        print("{:<44} {:>12.2f} us".format(name, seconds * 1e6))
+
+    if args["--save"]:
+        path = args["--baseline"]
+        if path in (None, "None"):
+            path = os.path.join(
+                BASELINE_DIR, "{}.json".format(current["commit"] or "baseline")
+            )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wt") as fh:
+            json.dump(current, fh, indent=2)
+        print("Saved baseline to {}".format(path))
+
+    if args["--compare"] not in (None, "None"):
+        with open(args["--compare"], "rt") as fh:
+            baseline = json.load(fh)
+        table, regressions = compare(
+            current, baseline, threshold=float(args["--threshold"])
+        )
+        print(table)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
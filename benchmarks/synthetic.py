@@ -0,0 +1,379 @@
+"""
+Generates synthetic Enrich2, Enrich and EMPIRIC inputs for benchmarking
+mavedbconvert at scale. The wild-type sequence each input was generated from
+is written next to it as a FASTA file with the same name and a '.fa'
+extension.
+
+Usage:
+  synthetic.py enrich2 <dst> [--variants=N] [--conditions=C] [--replicates=R] [--timepoints=T] [--codons=L] [--seed=S]
+  synthetic.py enrich <dst> [--variants=N] [--codons=L] [--seed=S]
+  synthetic.py empiric <dst> [--variants=N] [--seed=S]
+  synthetic.py -h | --help
+
+Options:
+  -h --help         Show this screen.
+
+  <dst>             Output file. Enrich2 outputs are HDF5 stores unless the
+                    extension is '.tsv'. EMPIRIC outputs are Excel files if
+                    the extension is '.xlsx' and TSV otherwise.
+
+  --variants=N      Number of variants (rows) to generate. [default: 10000]
+
+  --conditions=C    Number of Enrich2 conditions. [default: 2]
+
+  --replicates=R    Number of Enrich2 replicates per condition. [default: 3]
+
+  --timepoints=T    Number of Enrich2 timepoints per replicate. [default: 4]
+
+  --codons=L        Number of codons in the wild-type sequence. Inferred from
+                    the number of variants if not given. [default: None]
+
+  --seed=S          Random seed. [default: 0]
+"""
+
+import os
+import math
+
+import docopt
+import numpy as np
+import pandas as pd
+from fqfa.constants.translation.table import CODON_TABLE
+from fqfa.constants.iupac.protein import AA_CODES
+
+__all__ = [
+    "wild_type_sequence",
+    "enrich2_variants",
+    "write_enrich2_h5",
+    "write_enrich2_tsv",
+    "write_enrich_tsv",
+    "write_empiric",
+    "write_fasta",
+]
+
+
+BASES = "ACGT"
+CODONS = sorted(CODON_TABLE)
+SENSE_CODONS = [c for c in CODONS if CODON_TABLE[c] != "*"]
+AMINO_ACIDS = sorted(set(CODON_TABLE.values()) - {"*"})
+
+# Relative frequency of variants with 1, 2 and 3 events.
+EVENT_WEIGHTS = (0.6, 0.3, 0.1)
+
+
+def wild_type_sequence(n_codons, seed=0):
+    """
+    Returns a random coding sequence of `n_codons` sense codons.
+
+    Parameters
+    ----------
+    n_codons : int
+        Number of codons in the sequence.
+
+    seed : int, optional.
+        Random seed.
+
+    Returns
+    -------
+    str
+    """
+    rng = np.random.default_rng(seed)
+    return "".join(rng.choice(SENSE_CODONS, size=n_codons))
+
+
+def default_codons(n_variants, program):
+    """
+    Returns a wild-type length in codons large enough to generate
+    `n_variants` unique variants for `program`.
+    """
+    if program == "empiric":
+        return max(10, math.ceil(n_variants / (len(CODONS) - 1)))
+    return max(50, min(2000, int(math.sqrt(n_variants)) * 2))
+
+
+def _n_events(rng, size):
+    return rng.choice(np.arange(1, len(EVENT_WEIGHTS) + 1), size=size, p=EVENT_WEIGHTS)
+
+
+def enrich2_variants(wt_sequence, n_variants, seed=0):
+    """
+    Generates unique Enrich2 style mixed variants, eg
+    `c.4A>G (p.Lys2Glu), c.9T>C (p.=)`, with at most one event per codon.
+
+    Parameters
+    ----------
+    wt_sequence : str
+        Coding wild-type sequence.
+
+    n_variants : int
+        Number of unique variants to generate.
+
+    seed : int, optional.
+        Random seed.
+
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        The nucleotide level variants and the corresponding protein level
+        variants used to index the synonymous table. Protein variants are
+        `None` for variants that are synonymous at every codon.
+    """
+    rng = np.random.default_rng(seed)
+    n_codons = len(wt_sequence) // 3
+    seen = set()
+    nt_variants = []
+    pro_variants = []
+    while len(nt_variants) < n_variants:
+        batch = n_variants - len(nt_variants)
+        for k in _n_events(rng, batch):
+            codon_positions = np.sort(rng.choice(n_codons, size=k, replace=False))
+            frames = rng.integers(0, 3, size=k)
+            shifts = rng.integers(1, 4, size=k)
+            nt_events = []
+            pro_events = []
+            for codon_pos, frame, shift in zip(codon_positions, frames, shifts):
+                pos = 3 * codon_pos + frame
+                ref = wt_sequence[pos]
+                alt = BASES[(BASES.index(ref) + shift) % 4]
+                wt_codon = wt_sequence[3 * codon_pos : 3 * codon_pos + 3]
+                mut_codon = wt_codon[:frame] + alt + wt_codon[frame + 1 :]
+                wt_aa = AA_CODES[CODON_TABLE[wt_codon]]
+                mut_aa = AA_CODES[CODON_TABLE[mut_codon]]
+                if wt_aa == mut_aa:
+                    pro = "p.="
+                else:
+                    pro = "p.{}{}{}".format(wt_aa, codon_pos + 1, mut_aa)
+                    pro_events.append(pro)
+                nt_events.append("c.{}{}>{} ({})".format(pos + 1, ref, alt, pro))
+
+            nt_variant = ", ".join(nt_events)
+            if nt_variant in seen:
+                continue
+            seen.add(nt_variant)
+            nt_variants.append(nt_variant)
+            pro_variants.append(", ".join(pro_events) if pro_events else None)
+    return nt_variants, pro_variants
+
+
+def _enrich2_tables(index, conditions, replicates, timepoints, rng):
+    """Returns the scores, shared scores and counts tables of an element."""
+    scores_columns = pd.MultiIndex.from_product(
+        [conditions, ["SE", "epsilon", "score"]], names=["condition", "value"]
+    )
+    shared_columns = pd.MultiIndex.from_product(
+        [conditions, replicates, ["SE", "score"]],
+        names=["condition", "selection", "value"],
+    )
+    counts_columns = pd.MultiIndex.from_product(
+        [conditions, replicates, timepoints],
+        names=["condition", "selection", "timepoint"],
+    )
+    n = len(index)
+    scores = rng.normal(size=(n, len(scores_columns)))
+    # Sprinkle missing scores so the null filters have work to do.
+    scores[rng.random(size=scores.shape) < 0.01] = np.NaN
+    shared = rng.normal(size=(n, len(shared_columns)))
+    counts = rng.poisson(lam=50, size=(n, len(counts_columns))).astype(float)
+    return (
+        pd.DataFrame(scores, index=index, columns=scores_columns),
+        pd.DataFrame(shared, index=index, columns=shared_columns),
+        pd.DataFrame(counts, index=index, columns=counts_columns),
+    )
+
+
+def write_enrich2_h5(
+    path,
+    wt_sequence,
+    n_variants,
+    n_conditions=2,
+    n_replicates=3,
+    n_timepoints=4,
+    seed=0,
+):
+    """
+    Writes an Enrich2 experiment HDF5 store with variants and synonymous
+    element tables for every condition, replicate and timepoint.
+
+    Returns
+    -------
+    int
+        The number of rows in the variants element.
+    """
+    rng = np.random.default_rng(seed)
+    conditions = ["c{}".format(i + 1) for i in range(n_conditions)]
+    replicates = ["rep{}".format(i + 1) for i in range(n_replicates)]
+    timepoints = ["t{}".format(i) for i in range(n_timepoints)]
+
+    nt_variants, pro_variants = enrich2_variants(wt_sequence, n_variants, seed=seed)
+    synonymous = list(dict.fromkeys(v for v in pro_variants if v is not None))
+
+    with pd.HDFStore(path, mode="w") as store:
+        for element, index in (
+            ("variants", ["_wt"] + nt_variants),
+            ("synonymous", ["_wt"] + synonymous),
+        ):
+            scores, shared, counts = _enrich2_tables(
+                pd.Index(index), conditions, replicates, timepoints, rng
+            )
+            store["/main/{}/scores".format(element)] = scores
+            store["/main/{}/scores_shared".format(element)] = shared
+            store["/main/{}/counts".format(element)] = counts
+    return len(nt_variants) + 1
+
+
+def write_enrich2_tsv(path, wt_sequence, n_variants, seed=0):
+    """Writes an Enrich2 style scores TSV indexed by the column 'hgvs'."""
+    rng = np.random.default_rng(seed)
+    nt_variants, _ = enrich2_variants(wt_sequence, n_variants, seed=seed)
+    df = pd.DataFrame(
+        {
+            "hgvs": nt_variants,
+            "score": rng.normal(size=len(nt_variants)),
+            "SE": rng.random(size=len(nt_variants)),
+            "count": rng.poisson(lam=50, size=len(nt_variants)),
+        }
+    )
+    df.to_csv(path, sep="\t", index=False)
+    return len(df)
+
+
+def write_enrich_tsv(path, wt_sequence, n_variants, seed=0, one_based=True):
+    """
+    Writes an Enrich seqID TSV with unique `<positions>-<amino acids>`
+    seqIDs and the data columns 'log2_ratio' and 'nscor_log2_ratio'.
+    """
+    rng = np.random.default_rng(seed)
+    protein = [CODON_TABLE[c] for c in _codons(wt_sequence)]
+    seen = set()
+    seq_ids = []
+    while len(seq_ids) < n_variants:
+        for k in _n_events(rng, n_variants - len(seq_ids)):
+            positions = np.sort(rng.choice(len(protein), size=k, replace=False))
+            aas = [
+                rng.choice([aa for aa in AMINO_ACIDS if aa != protein[p]])
+                for p in positions
+            ]
+            seq_id = "{}-{}".format(
+                ",".join(str(p + int(one_based)) for p in positions), ",".join(aas)
+            )
+            if seq_id not in seen:
+                seen.add(seq_id)
+                seq_ids.append(seq_id)
+
+    n = len(seq_ids)
+    scores = rng.normal(size=n)
+    nscores = rng.normal(size=n)
+    nscores[rng.random(size=n) < 0.01] = np.NaN
+    pd.DataFrame(
+        {"seqID": seq_ids, "log2_ratio": scores, "nscor_log2_ratio": nscores}
+    ).to_csv(path, sep="\t", index=False)
+    return n
+
+
+def write_empiric(path, wt_sequence, n_variants, seed=0, one_based=True):
+    """
+    Writes an EMPIRIC table with the columns 'Position', 'Amino Acid',
+    'Codon', 'score' and 'SE', covering every non wild-type codon at each
+    position in turn. The output is an Excel file if `path` ends in '.xlsx'
+    and a TSV file otherwise.
+    """
+    rng = np.random.default_rng(seed)
+    wt_codons = _codons(wt_sequence)
+    positions, codons = [], []
+    for i, wt_codon in enumerate(wt_codons):
+        for codon in CODONS:
+            if codon != wt_codon:
+                positions.append(i + int(one_based))
+                codons.append(codon)
+        if len(codons) >= n_variants:
+            break
+
+    positions, codons = positions[:n_variants], codons[:n_variants]
+    n = len(codons)
+    df = pd.DataFrame(
+        {
+            "Position": positions,
+            "Amino Acid": [CODON_TABLE[c] for c in codons],
+            "Codon": codons,
+            "score": rng.normal(size=n),
+            "SE": rng.random(size=n),
+        }
+    )
+    if path.lower().endswith(".xlsx"):
+        df.to_excel(path, index=False, engine="xlsxwriter")
+    else:
+        df.to_csv(path, sep="\t", index=False)
+    return n
+
+
+def write_fasta(path, wt_sequence, name="wild_type"):
+    """Writes `wt_sequence` as a single record FASTA file."""
+    with open(path, "wt") as fh:
+        fh.write(">{}\n".format(name))
+        for i in range(0, len(wt_sequence), 60):
+            fh.write(wt_sequence[i : i + 60] + "\n")
+
+
+def fasta_path(dst):
+    """Returns the FASTA path the wild-type sequence of `dst` is written to."""
+    return os.path.splitext(dst)[0] + ".fa"
+
+
+def _codons(wt_sequence):
+    return [wt_sequence[i : i + 3] for i in range(0, len(wt_sequence), 3)]
+
+
+def generate(program, dst, n_variants, n_codons=None, seed=0, **kwargs):
+    """
+    Generates a synthetic input for `program` at `dst` and writes its
+    wild-type sequence to a FASTA file.
+
+    Returns
+    -------
+    tuple[str, int]
+        Path to the FASTA file and the number of rows generated.
+    """
+    if n_codons is None:
+        n_codons = default_codons(n_variants, program)
+    wt_sequence = wild_type_sequence(n_codons, seed=seed)
+    if program == "enrich2" and dst.lower().endswith(".tsv"):
+        n = write_enrich2_tsv(dst, wt_sequence, n_variants, seed=seed)
+    elif program == "enrich2":
+        n = write_enrich2_h5(dst, wt_sequence, n_variants, seed=seed, **kwargs)
+    elif program == "enrich":
+        n = write_enrich_tsv(dst, wt_sequence, n_variants, seed=seed)
+    elif program == "empiric":
+        n = write_empiric(dst, wt_sequence, n_variants, seed=seed)
+    else:
+        raise ValueError("{} is not a recognised format.".format(program))
+
+    fasta = fasta_path(dst)
+    write_fasta(fasta, wt_sequence)
+    return fasta, n
+
+
+def main():
+    args = docopt.docopt(__doc__)
+    program = next(p for p in ("enrich2", "enrich", "empiric") if args[p])
+    kwargs = {}
+    if program == "enrich2" and not args["<dst>"].lower().endswith(".tsv"):
+        kwargs = {
+            "n_conditions": int(args["--conditions"]),
+            "n_replicates": int(args["--replicates"]),
+            "n_timepoints": int(args["--timepoints"]),
+        }
+    codons = args.get("--codons", "None")
+    fasta, n = generate(
+        program,
+        args["<dst>"],
+        n_variants=int(args["--variants"]),
+        n_codons=None if codons in (None, "None") else int(codons),
+        seed=int(args["--seed"]),
+        **kwargs
+    )
+    print(
+        "Wrote {} rows to {} with wild-type sequence {}".format(n, args["<dst>"], fasta)
+    )
+
+
+if __name__ == "__main__":
+    main()
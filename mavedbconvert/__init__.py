@@ -1,6 +1,9 @@
 import os
 import sys
+import queue
+import atexit
 import logging.config
+from logging.handlers import QueueHandler, QueueListener
 
 __all__ = [
     "base",
@@ -12,9 +15,26 @@ __all__ = [
     "utilities",
     "filters",
     "validators",
+    "profiling",
+    "report",
+    "readers",
+    "writers",
+    "compression",
+    "cache",
+    "variant_cache",
+    "incremental",
+    "sharding",
+    "reference",
+    "policy",
+    "preflight",
+    "offsets",
+    "variant_table",
     "LOGGER",
+    "LOG_LISTENER",
 ]
 
+__version__ = "0.4.0-alpha"
+
 HOMEDIR = os.path.normpath(os.path.expanduser("~/.mavedb_convert/"))
 if not os.path.isdir(HOMEDIR):
     os.mkdir(HOMEDIR)  # pragma: no cover
@@ -53,3 +73,25 @@ logging.config.dictConfig(
         },
     }
 )
+
+
+def _start_log_listener():
+    """
+    Moves the console and file handlers of the package logger behind a
+    `QueueHandler` so that log records are written by a background thread
+    and logging calls do not block on I/O. Records still pending at exit
+    are flushed.
+    """
+    logger = logging.getLogger(LOGGER)
+    handlers = list(logger.handlers)
+    log_queue = queue.Queue(-1)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+LOG_LISTENER = _start_log_listener()
@@ -1,14 +1,36 @@
+import io
 import os
 import re
+import sys
+import copy
 import logging
+from collections import OrderedDict
 import numpy as np
+import pandas as pd
 from abc import ABCMeta, abstractmethod
 
 from hgvsp import is_multi
-from fqfa.constants.iupac.protein import AA_CODES
 from fqfa.validator.validator import dna_bases_validator
+from joblib import Parallel, delayed
 
-from . import LOGGER, utilities, constants
+from . import (
+    LOGGER,
+    utilities,
+    constants,
+    validators,
+    profiling,
+    readers,
+    writers,
+    compression,
+    incremental,
+    sharding,
+    reference,
+    exceptions,
+    policy,
+    report,
+    preflight,
+    offsets,
+)
 
 
 logger = logging.getLogger(LOGGER)
@@ -17,6 +39,18 @@ logger = logging.getLogger(LOGGER)
 __all__ = ["BaseProgram"]
 
 
+def _convert_sheet(program, sheet_name, df):
+    """
+    Worker for `BaseProgram.convert_all_sheets`. Returns the sheet name, the
+    output file and `None`, or the sheet name, `None` and the error message
+    if the sheet could not be converted.
+    """
+    try:
+        return sheet_name, program.convert_sheet(sheet_name, df), None
+    except Exception as e:
+        return sheet_name, None, "{}: {}".format(type(e).__name__, e)
+
+
 class BaseProgram(metaclass=ABCMeta):
     """
     Convert an input file to MaveDB_ compliant counts or scores files.
@@ -24,23 +58,27 @@ class BaseProgram(metaclass=ABCMeta):
     Attributes
     ----------
     src : str
-        Source file to convert.
+        Source file to convert. Use '-' to stream a TSV file from stdin and
+        write the converted rows to stdout.
 
     wt_sequence : str
         A DNA wild-type sequence used for validation and inference of
         missing variants.
 
-    offset : int, optional.
+    offset : Union[int, str], optional.
         The number of bases to clip in `wt_seq`. The resulting sequence
-        should be the coding sequence analyzed in your input file.
+        should be the coding sequence analyzed in your input file. Use
+        'auto' to infer the offset from the input in programs that support
+        it.
 
     dst : str, optional.
         Directory to save the output to. Inferred as input directory if not
         specified.
 
-    one_based : bool, optional.
+    one_based : Union[bool, str], optional.
         Set to `True` if input positions are `1-based` relative to the
-        the wild-type sequence specified.
+        the wild-type sequence specified. Use 'auto' to infer the base from
+        the input in programs that support it.
 
     skip_header_rows : int
         The number of lines to skip at the start of the input file. Only
@@ -69,8 +107,56 @@ class BaseProgram(metaclass=ABCMeta):
 
     input_type : str, optional.
         The MaveDB file type. Can be either 'scores' or 'counts'.
+
+    csv_engine : str, optional.
+        Engine used to read TSV/CSV inputs. Either 'c', the default `pandas`
+        parser, or 'pyarrow' for the multithreaded `pyarrow` reader.
+
+    output_compression : str, optional.
+        Compress output files with 'gzip' or 'zstd'. Compressed inputs are
+        detected from their leading bytes and decompressed as they are read.
+
+    output_formats : list[str], optional.
+        Formats to write each output in. Any of 'csv', 'parquet' and
+        'feather'. Defaults to 'csv'.
+
+    variant_cache : Union[bool, `VariantCache`], optional.
+        Look up and store parsed variants in an on-disk cache shared across
+        runs. Set to `True` to use the cache in `~/.mavedb_convert`. Used
+        only in Enrich2.
+
+    incremental : bool, optional.
+        Reuse the variants parsed by the previous conversion to the same
+        output file for rows whose variant columns are unchanged. Used only
+        in Enrich and EMPIRIC.
+
+    shard : tuple[int, int], optional.
+        Convert only a slice of the input, given as the one-based shard
+        number and the number of shards, eg `(2, 4)`. Shards convert
+        contiguous row ranges of TSV and Excel inputs and of each Enrich2
+        HDF5 dataset, and write partial outputs and a metadata file that
+        `sharding.merge` combines.
+
+    preflight : bool, optional.
+        Parse a stratified sample of the input before converting it and
+        refuse to continue if most sampled rows fail with errors pointing at
+        a wrong offset, coordinate base or wild-type sequence.
+
+    error_policy : str, optional.
+        What to do with rows that cannot be parsed: 'fail' aborts at the
+        first invalid row, 'collect' writes every invalid row to an invalid
+        rows file, a number such as '100' aborts after that many invalid
+        rows and a percentage such as '5%' aborts once that fraction of rows
+        is invalid. Defaults to `DEFAULT_ERROR_POLICY`.
     """
 
+    # Error policy used if none is given, see `policy.ErrorPolicy.parse`.
+    DEFAULT_ERROR_POLICY = policy.FAIL
+
+    # Whether the offset and coordinate base can be inferred from the input.
+    INFERS_OFFSET = False
+    INFERS_ONE_BASED = False
+
     def __init__(
         self,
         src,
@@ -85,22 +171,50 @@ class BaseProgram(metaclass=ABCMeta):
         input_type=None,
         sheet_name=None,
         is_coding=True,
+        csv_engine=None,
+        output_compression=None,
+        output_formats=None,
+        incremental=False,
+        shard=None,
+        preflight=True,
+        error_policy=None,
     ):
-        # Check the input is a readable file.
-        self.src = os.path.normpath(os.path.expanduser(src))
-        logger.info("Checking read permission for '{}'".format(self.src))
-        os.access(self.src, os.R_OK)
+        # Streamed input is always read as TSV from stdin.
+        self.streaming = src == constants.STREAM_SRC
+        self.chunksize = constants.STREAM_CHUNK_SIZE
+        if self.streaming:
+            self.src = src
+            src_filename, ext = "stdin", ".tsv"
+            # Detected from the stream when it is first read.
+            self.input_compression = None
+        else:
+            # Check the input is a readable file.
+            self.src = os.path.normpath(os.path.expanduser(src))
+            logger.info("Checking read permission for '{}'".format(self.src))
+            os.access(self.src, os.R_OK)
+            # Strip a compression extension, eg '.gz', before inferring the
+            # file type. The magic bytes take precedence over the extension.
+            filename, ext_compression = compression.split_compression_extension(
+                os.path.split(src)[1]
+            )
+            src_filename, ext = os.path.splitext(filename)
+            if os.path.isfile(self.src):
+                self.input_compression = compression.detect_compression(self.src)
+            else:
+                self.input_compression = ext_compression
 
-        src_filename, ext = os.path.splitext(os.path.split(src)[1])
         self.src_filename = src_filename
         self.dst_filename = "mavedb_{}.csv".format(re.sub(r"\s+", "_", src_filename))
+        self.invalid_rows_filename = "{}_invalid_rows.csv".format(src_filename)
         self.ext = ext.lower()
 
         # Set directory as the same directory as the input file if not provided
         # For HDF5 files, create a further directory with the same name
         # as the input file since there will be multiple output files.
         self.dst = dst
-        if self.dst is None:
+        if self.dst is None and self.streaming:
+            self.dst = os.getcwd()
+        elif self.dst is None:
             dst, _ = os.path.split(src)
             if self.ext.lower() == ".h5":
                 dst = os.path.normpath(
@@ -124,14 +238,108 @@ class BaseProgram(metaclass=ABCMeta):
         self.score_column = score_column
         self.hgvs_column = hgvs_column
         self.input_type = input_type
-        self.one_based = one_based
+
+        # An inferred coordinate base is set from the input before it is
+        # parsed, see `resolve_one_based`.
+        self.one_based_pending = one_based == constants.AUTO_ONE_BASED
+        if self.one_based_pending and not self.INFERS_ONE_BASED:
+            raise ValueError(
+                "The coordinate base cannot be inferred for {} inputs.".format(
+                    type(self).__name__
+                )
+            )
+        self.one_based = True if self.one_based_pending else one_based
+
+        if csv_engine is None:
+            csv_engine = constants.default_csv_engine
+        if csv_engine not in constants.csv_engines:
+            raise ValueError(
+                "'{}' is not a supported CSV engine. Choose from {}.".format(
+                    csv_engine, ", ".join(constants.csv_engines)
+                )
+            )
+        self.csv_engine = csv_engine
+
+        if output_compression not in (None,) + compression.OUTPUT_COMPRESSIONS:
+            raise ValueError(
+                "Outputs can only be compressed with {}.".format(
+                    ", ".join(compression.OUTPUT_COMPRESSIONS)
+                )
+            )
+        if output_compression is not None and self.streaming:
+            raise ValueError(
+                "Streamed output cannot be compressed. Pipe stdout to a "
+                "compressor instead."
+            )
+        self.output_compression = output_compression
+
+        if output_formats is None:
+            output_formats = [constants.default_output_format]
+        if isinstance(output_formats, str):
+            output_formats = [output_formats]
+        unknown = [f for f in output_formats if f not in constants.output_formats]
+        if unknown or not output_formats:
+            raise ValueError(
+                "Supported output formats are {}.".format(
+                    ", ".join(constants.output_formats)
+                )
+            )
+        if self.streaming and list(output_formats) != ["csv"]:
+            raise ValueError("Streamed output can only be written as csv.")
+        self.output_formats = list(output_formats)
+        # Files written by the conversion, in the order they were written.
+        self.output_files = []
+
+        if incremental and self.streaming:
+            raise ValueError("Streamed input cannot be converted incrementally.")
+        self.incremental = incremental
+
+        if shard is not None:
+            index, count = shard
+            if not 1 <= index <= count:
+                raise ValueError(
+                    "Shard number must be between 1 and the number of shards. "
+                    "Found {}/{}.".format(index, count)
+                )
+            if self.streaming:
+                raise ValueError("Streamed input cannot be sharded.")
+            shard = (int(index), int(count))
+        self.shard = shard
+        self.preflight = preflight
+        # Row ranges selected by the shard as (start, stop, total rows).
+        self.shard_slices = []
+        # Outputs written by the conversion, see `write_output`.
+        self.datasets = []
+        self.invalid_rows_files = []
+        self._invalid_rows_files = set()
+
+        if error_policy is None:
+            error_policy = self.DEFAULT_ERROR_POLICY
+        self.error_policy = policy.ErrorPolicy.parse(error_policy)
+        # Errors of the rows `try_parse_row` could not parse, by row label.
+        self.row_errors = OrderedDict()
 
         # Initialize sequence information.
         self._wt_sequence = None
         self.codons = None
         self.protein_sequence = None
+        self.wt_index = None
 
-        self.offset = offset
+        # An inferred offset is set from the input before it is parsed.
+        self.offset_pending = offset == constants.AUTO_OFFSET
+        if self.offset_pending and not self.INFERS_OFFSET:
+            raise ValueError(
+                "The offset cannot be inferred for {} inputs.".format(
+                    type(self).__name__
+                )
+            )
+        if self.offset_pending and self.one_based_pending:
+            raise ValueError(
+                "The offset and the coordinate base cannot both be inferred. "
+                "Shifting positions by a codon is indistinguishable from "
+                "switching between zero-based and one-based positions."
+            )
+        self.offset = 0 if self.offset_pending else offset
         self.wt_sequence = wt_sequence
 
     @property
@@ -147,6 +355,7 @@ class BaseProgram(metaclass=ABCMeta):
         if self.is_coding:
             self.protein_sequence = utilities.translate_dna(seq, offset=0)
             self.codons = list(utilities.slicer(seq, 3))
+        self.wt_index = reference.WildTypeIndex(seq, is_coding=self.is_coding)
         self._wt_sequence = seq
 
     @property
@@ -171,16 +380,649 @@ class BaseProgram(metaclass=ABCMeta):
 
     @property
     def output_file(self):
-        return os.path.normpath(os.path.join(self.output_directory, self.dst_filename))
+        return self.output_path(self.dst_filename)
+
+    def output_path(self, filename):
+        """
+        Returns the path of the output file `filename` in the output
+        directory, with a compression extension if outputs are compressed.
+        Sharded conversions insert the shard number into the file name.
+        """
+        if self.shard is not None:
+            filename = sharding.shard_filename(filename, self.shard)
+        return os.path.normpath(
+            os.path.join(self.output_directory, filename)
+        ) + compression.output_suffix(self.output_compression)
+
+    def format_path(self, path, output_format):
+        """
+        Returns the path an output written to the csv file `path` is saved
+        to in `output_format`, eg 'mavedb_scores.parquet' for
+        'mavedb_scores.csv.gz'.
+        """
+        if output_format == "csv":
+            return path
+        suffix = compression.output_suffix(self.output_compression)
+        if suffix and path.endswith(suffix):
+            path = path[: -len(suffix)]
+        return "{}.{}".format(os.path.splitext(path)[0], output_format)
+
+    def write_output(self, df, path, df_type=None, group=None):
+        """
+        Writes a MaveDB-compliant dataframe to `path` in each format in
+        `output_formats`. CSV outputs are compressed if `output_compression`
+        is set. Parquet and Feather outputs use the matching internal codec.
+
+        The written dataset is recorded in `datasets` with its type, either
+        'scores' or 'counts', and `group`, which identifies the scores and
+        counts datasets that must define the same variants.
+        """
+        name = os.path.basename(path)
+        suffix = compression.output_suffix(self.output_compression)
+        if suffix and name.endswith(suffix):
+            name = name[: -len(suffix)]
+        dataset = OrderedDict(
+            [
+                ("name", sharding.unshard_filename(name)),
+                ("df_type", df_type),
+                ("group", group),
+                ("files", OrderedDict()),
+            ]
+        )
+        self.datasets.append(dataset)
+
+        for output_format in self.output_formats:
+            output_path = self.format_path(path, output_format)
+            logger.info("Writing to {}".format(output_path))
+            if output_format == "csv":
+                with profiling.stage("to_csv", rows=len(df)):
+                    with compression.open_output(
+                        output_path, self.output_compression
+                    ) as fh:
+                        writers.write_csv(df, fh)
+            else:
+                with profiling.stage("to_{}".format(output_format), rows=len(df)):
+                    writers.write_columnar(
+                        df,
+                        output_path,
+                        output_format,
+                        compression=self.output_compression,
+                    )
+            if output_path not in self.output_files:
+                self.output_files.append(output_path)
+            dataset["files"][output_format] = os.path.basename(output_path)
+
+    def select_shard(self, df):
+        """
+        Returns the rows of `df` converted by this shard, or `df` if the
+        conversion is not sharded.
+        """
+        if self.shard is None:
+            return df
+        start, stop = sharding.shard_bounds(len(df), self.shard)
+        logger.info(
+            "Converting rows {} to {} of {} (shard {} of {}).".format(
+                start, stop, len(df), *self.shard
+            )
+        )
+        self.shard_slices.append([start, stop, len(df)])
+        return df.iloc[start:stop]
+
+    def write_shard_metadata(self):
+        """
+        Writes the metadata file `sharding.merge` reads to combine the
+        outputs of each shard, if the conversion is sharded.
+        """
+        if self.shard is None:
+            return
+        path = sharding.write_metadata(self)
+        if path not in self.output_files:
+            self.output_files.append(path)
+
+    def parse_variants(self, df, columns, parse):
+        """
+        Parses the variants of the rows of `df` with `parse`. When converting
+        incrementally, rows whose `columns` are unchanged since the previous
+        conversion to the same output file reuse the stored variants and only
+        new or changed rows are passed to `parse`.
+
+        Parameters
+        ----------
+        df : `pd.DataFrame`
+            Input rows.
+
+        columns : list[str]
+            Columns the variants are parsed from.
+
+        parse : Callable[[`pd.DataFrame`], tuple[list, list]]
+            Returns the `hgvs_nt` and `hgvs_pro` variants of each row of a
+            dataframe.
+
+        Returns
+        -------
+        tuple[list, list]
+            The `hgvs_nt` and `hgvs_pro` variants of each row.
+        """
+        if not self.incremental:
+            return parse(df)
+        context = "{}:{}:{}:{}".format(
+            type(self).__name__, self.wt_sequence, self.offset, self.one_based
+        )
+        return incremental.parse_rows(
+            df,
+            columns,
+            parse,
+            path=incremental.rows_path(self.output_file),
+            context=context,
+        )
+
+    def run_preflight(self, df):
+        """
+        Parses a stratified sample of the rows of `df` with `parse_row` before
+        the whole input is converted, logging the expected invalid rate and
+        the most common errors. Inputs with no more than
+        `preflight.SAMPLE_SIZE` rows are not sampled.
+
+        Returns
+        -------
+        `preflight.Preflight`, optional.
+
+        Raises
+        ------
+        PreflightError
+            If most sampled rows fail with errors pointing at a wrong offset,
+            coordinate base or wild-type sequence.
+        """
+        if not self.preflight or len(df) <= preflight.SAMPLE_SIZE:
+            return None
+        with profiling.stage("preflight", rows=preflight.SAMPLE_SIZE):
+            result = preflight.run(
+                self.parse_row,
+                lambda sample: self.preflight_rows(df.iloc[sample]),
+                df.index,
+                self.preflight_positions(df),
+                size=preflight.SAMPLE_SIZE,
+            )
+        result.log(logger)
+        result.check()
+        return result
+
+    def resolve_offset(self, df):
+        """
+        Infers the codon offset from the residues of a sample of rows of
+        `df`, given by `coordinate_residues`, if the offset is 'auto'. Every
+        offset placing the sampled positions within the wild-type sequence
+        is scored by how far the agreement of the residues with the
+        wild-type deviates from chance. Must be called before the offset is
+        applied to `df`.
+
+        Returns
+        -------
+        `offsets.CodonOffsetEstimate`, optional.
+
+        Raises
+        ------
+        ValueError
+            If the evidence does not favour one of the offsets.
+        """
+        if not (self.offset_pending and self.INFERS_OFFSET):
+            return None
+        with profiling.stage("infer_offset") as stage:
+            sample, _ = preflight.sample_rows(self.preflight_positions(df))
+            stage.rows = len(sample)
+            positions, residues, wild_type = self.coordinate_residues(
+                df.iloc[sample]
+            )
+            estimate = offsets.infer_codon_offset(
+                positions, residues, wild_type, one_based=self.one_based
+            )
+        estimate.check()
+        logger.info("Inferred the offset from the input. {}".format(estimate.summary()))
+        self.offset = estimate.offset
+        self.offset_pending = False
+        return estimate
+
+    def resolve_one_based(self, df):
+        """
+        Infers whether the positions of `df` are zero-based or one-based if
+        `one_based` is 'auto'. The residues of a sample of rows, given by
+        `coordinate_residues`, are compared against the wild-type sequence
+        with positions read in both bases at once. Only converters setting
+        `INFERS_ONE_BASED` define `coordinate_residues`.
+
+        Returns
+        -------
+        `offsets.BaseEstimate`, optional.
+
+        Raises
+        ------
+        ValueError
+            If the evidence does not favour one of the bases.
+        """
+        if not (self.one_based_pending and self.INFERS_ONE_BASED):
+            return None
+        with profiling.stage("infer_one_based") as stage:
+            sample, _ = preflight.sample_rows(self.preflight_positions(df))
+            stage.rows = len(sample)
+            positions, residues, wild_type = self.coordinate_residues(
+                df.iloc[sample]
+            )
+            estimate = offsets.infer_one_based(positions, residues, wild_type)
+        estimate.check()
+        logger.info(
+            "Inferred {} positions. {}".format(
+                "one-based" if estimate.one_based else "zero-based",
+                estimate.summary(),
+            )
+        )
+        self.one_based = estimate.one_based
+        self.one_based_pending = False
+        return estimate
+
+    def preflight_positions(self, df):
+        """
+        Returns the values the preflight sample is stratified by, such as
+        the variants or positions of each row of `df`.
+        """
+        return df.index
+
+    def preflight_rows(self, df):
+        """Returns the rows of `df` in the form `parse_row` expects."""
+        return [row for _, row in df.iterrows()]
+
+    def try_parse_row(self, label, row):
+        """
+        Parses `row` with `parse_row` under the error policy. If the row
+        cannot be parsed and the policy does not abort, its error is kept in
+        `row_errors` under `label` and `None` is returned. Aborts with the
+        original error when failing fast, or `ErrorBudgetExceeded` once the
+        error budget is spent.
+        """
+        try:
+            result = self.parse_row(row)
+        except Exception as e:
+            if self.error_policy.fail_fast:
+                raise
+            self.row_errors[label] = e
+            self.error_policy.record(errors=1, error=e)
+            return None
+        self.error_policy.record()
+        return result
+
+    def drop_invalid_rows(self, df):
+        """
+        Removes the rows of `df` in `row_errors`, writes them to the invalid
+        rows file and checks the error budget of the whole input. Streamed
+        chunks leave the final check to `convert_stream`.
+
+        Returns
+        -------
+        `pd.DataFrame`
+        """
+        labels = [label for label in self.row_errors if label in df.index]
+        if labels:
+            self.write_invalid_rows(
+                df.loc[labels, :],
+                [self.row_errors[label] for label in labels],
+                self.invalid_rows_filename,
+            )
+            df = df.drop(index=labels)
+        self.row_errors.clear()
+        if not self.streaming:
+            self.error_policy.check(final=True)
+        return df
+
+    def write_invalid_rows(self, invalid, errors, filename):
+        """
+        Writes rows that could not be converted to `filename` in the output
+        directory, adding the code and description of each error, and logs a
+        summary of the errors. Streamed chunks append to the file written
+        for earlier chunks.
+
+        Parameters
+        ----------
+        invalid : `pd.DataFrame`
+            Input rows that could not be converted.
+
+        errors : list
+            Error of each row, a `VariantError` or a message.
+
+        filename : str
+            File name of the invalid rows file.
+
+        Returns
+        -------
+        str
+            Path of the invalid rows file.
+        """
+        if self.shard is not None:
+            filename = sharding.shard_filename(filename, self.shard)
+        path = os.path.join(self.output_directory, filename)
+        summary = report.ErrorSummary()
+        for row, error in zip(invalid.index, errors):
+            summary.add(row, error)
+        summary.log(logger, path)
+
+        invalid = invalid.copy()
+        invalid["error_code"] = [report.ErrorSummary.error_code(e) for e in errors]
+        invalid["error_description"] = [str(e) for e in errors]
+        append = self.streaming and path in self._invalid_rows_files
+        with open(
+            path,
+            "a" if append else "w",
+            newline="",
+            buffering=compression.OUTPUT_BUFFER_SIZE,
+        ) as fh:
+            writers.write_csv(invalid, fh, index=True, header=not append)
+        self._invalid_rows_files.add(path)
+        if path not in self.output_files:
+            self.output_files.append(path)
+            self.invalid_rows_files.append(
+                {"name": sharding.unshard_filename(filename), "file": filename}
+            )
+        return path
 
     def convert(self):
         """
-        Runs `parse_input` and saves the Mavedb-compliant result to file.
+        Runs `parse_input` and saves the Mavedb-compliant result to file, or
+        to stdout when streaming.
         """
         logger.info("Processing file {}".format(self.src))
-        mave_df = self.parse_input(self.load_input_file())
-        logger.info("Writing to {}".format(self.output_file))
-        mave_df.to_csv(self.output_file, sep=",", index=None, na_rep=np.NaN)
+        if self.streaming:
+            return self.convert_stream()
+        with profiling.stage("load_input_file") as stage:
+            df = self.select_shard(self.load_input_file())
+            stage.rows = len(df)
+        self.run_preflight(df)
+        mave_df = self.parse_input(df)
+        self.write_output(mave_df, self.output_file, df_type=self.input_type)
+        self.write_shard_metadata()
+
+    def convert_all_sheets(self, n_jobs=1):
+        """
+        Converts every sheet of an Excel input file. The workbook is read
+        once and each sheet is converted by a separate `joblib` worker,
+        writing to its own output file named after the input and the sheet,
+        eg `mavedb_<input>_<sheet>.csv`.
+
+        A sheet that fails to convert does not stop the others. Failures are
+        logged and reported together once all sheets have been processed.
+
+        Parameters
+        ----------
+        n_jobs : int, optional.
+            Number of workers. Use -1 for one worker per CPU.
+
+        Returns
+        -------
+        `OrderedDict`
+            Output file paths keyed by sheet name.
+
+        Raises
+        ------
+        ValueError
+            If the input is not an Excel file or any sheet failed to convert.
+        """
+        if self.streaming or self.extension not in (".xlsx", ".xls"):
+            raise ValueError("Only Excel inputs can be converted sheet by sheet.")
+        if self.shard is not None:
+            raise ValueError("Sheet by sheet conversions cannot be sharded.")
+
+        logger.info("Processing every sheet in {}".format(self.src))
+        with profiling.stage("load_input_file") as stage:
+            sheets = self.read_excel_sheets()
+            stage.rows = sum(len(df) for df in sheets.values())
+
+        if n_jobs > 0:
+            n_jobs = min(n_jobs, len(sheets))
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_convert_sheet)(self, name, df) for name, df in sheets.items()
+        )
+
+        outputs = OrderedDict()
+        failed = []
+        for name, output_file, error in results:
+            if error is None:
+                logger.info("Wrote sheet '{}' to {}".format(name, output_file))
+                outputs[name] = output_file
+            else:
+                logger.error("Could not convert sheet '{}': {}".format(name, error))
+                failed.append(name)
+
+        if failed:
+            raise ValueError(
+                "{} of {} sheets could not be converted: {}.".format(
+                    len(failed), len(results), ", ".join(failed)
+                )
+            )
+        return outputs
+
+    def convert_sheet(self, sheet_name, df):
+        """
+        Converts a dataframe read from the sheet `sheet_name` and saves the
+        result to a file named after the input file and the sheet.
+
+        Returns
+        -------
+        str
+            Path of the output file.
+        """
+        program = copy.copy(self)
+        # Sheets are converted with their own error budget and records of the
+        # rows and files written.
+        program.error_policy = copy.deepcopy(self.error_policy)
+        program.error_policy.reset()
+        program.row_errors = OrderedDict()
+        program.output_files = []
+        program.datasets = []
+        program.shard_slices = []
+        program.invalid_rows_files = []
+        program._invalid_rows_files = set()
+
+        program.sheet_name = sheet_name
+        name = "{}_{}".format(
+            re.sub(r"\s+", "_", self.src_filename), re.sub(r"\s+", "_", sheet_name)
+        )
+        program.dst_filename = "mavedb_{}.csv".format(name)
+        program.invalid_rows_filename = "{}_invalid_rows.csv".format(name)
+        df = program.prepare_input(df)
+        program.run_preflight(df)
+        mave_df = program.parse_input(df)
+        program.write_output(mave_df, program.output_file, df_type=program.input_type)
+        return program.output_file
+
+    def convert_stream(self, parse=None):
+        """
+        Converts the chunks returned by `load_input_file` one at a time and
+        writes the MaveDB-compliant rows to stdout as soon as each chunk is
+        ready.
+
+        The output always has every column of `constants.variant_columns`,
+        empty where a chunk has no variants of that kind, followed by the
+        other columns of the first chunk with converted rows. HGVS
+        uniqueness is checked across chunks using 64-bit hashes of the
+        primary column. The error budget is checked against the whole input
+        once the last chunk has been converted.
+
+        Parameters
+        ----------
+        parse : callable, optional.
+            Callback converting a single input chunk into a MaveDB dataframe.
+            Defaults to `parse_input`.
+        """
+        if parse is None:
+            parse = self.parse_input
+
+        logger.info("Streaming rows from stdin in chunks of {}".format(self.chunksize))
+        columns = None
+        uniqueness = None
+        n_chunks = 0
+        n_rows = 0
+        for chunk in self.load_input_file():
+            n_chunks += 1
+            mave_df = parse(chunk)
+            if mave_df.empty:
+                continue
+            if columns is None:
+                # The header is written before later chunks are seen, so a
+                # variant column empty in this chunk may be filled later.
+                columns = list(constants.variant_columns) + [
+                    c for c in mave_df.columns if c not in constants.variant_columns
+                ]
+                filled = [
+                    c
+                    for c in constants.variant_columns
+                    if c in mave_df.columns
+                    and not all(utilities.null_mask(mave_df[c]))
+                ]
+                uniqueness = validators.StreamingUniquenessValidator(filled)
+            mave_df = mave_df.reindex(columns=columns)
+            uniqueness.validate(mave_df)
+            with profiling.stage("to_csv", rows=len(mave_df)):
+                writers.write_csv(mave_df, sys.stdout, header=n_rows == 0)
+                sys.stdout.flush()
+            n_rows += len(mave_df)
+
+        if not n_chunks:
+            raise ValueError("No rows were read from stdin.")
+        self.error_policy.check(final=True)
+        if columns is None:
+            raise ValueError("Could not parse any variants. Aborting.")
+        logger.info("Wrote {} rows to stdout".format(n_rows))
+
+    @property
+    def required_columns(self):
+        """
+        Input columns needed by the converter regardless of their type. Other
+        non-numeric columns are dropped during conversion.
+        """
+        return [c for c in (self.score_column, self.hgvs_column) if c]
+
+    def read_delimited(self, sep="\t"):
+        """
+        Reads a delimited input file into a dataframe. When streaming, the
+        input is read from stdin and an iterator over dataframes with at most
+        `chunksize` rows is returned instead. The 'pyarrow' engine is only
+        used for files; streamed input is always read with `pandas`.
+
+        Parameters
+        ----------
+        sep : str, optional.
+            Column delimiter.
+
+        Returns
+        -------
+        Union[`pd.DataFrame`, Iterator[`pd.DataFrame`]]
+        """
+        if not self.streaming and self.csv_engine == "pyarrow":
+            return readers.read_csv_arrow(
+                self.src,
+                sep=sep,
+                skip_header_rows=self.skip_header_rows,
+                skip_footer_rows=self.skip_footer_rows,
+                na_values=constants.extra_na,
+                required_columns=self.required_columns,
+                compression=self.input_compression,
+            )
+        if not self.streaming:
+            return pd.read_csv(
+                self.src,
+                delimiter=sep,
+                na_values=constants.extra_na,
+                skipfooter=self.skip_footer_rows,
+                skiprows=self.skip_header_rows,
+                compression=self.input_compression,
+            )
+
+        if self.skip_footer_rows:
+            raise ValueError("Footer rows cannot be skipped when streaming input.")
+        source = sys.stdin
+        buffer = getattr(sys.stdin, "buffer", None)
+        if buffer is not None:
+            self.input_compression = compression.detect_compression(buffer)
+            if self.input_compression is not None:
+                source = buffer
+        return pd.read_csv(
+            source,
+            delimiter=sep,
+            na_values=constants.extra_na,
+            skiprows=self.skip_header_rows,
+            chunksize=self.chunksize,
+            compression=self.input_compression,
+        )
+
+    def read_excel(self):
+        """
+        Reads a single sheet of an Excel input file into a dataframe. Sheet
+        names are probed from the workbook metadata so only the sheet named
+        by `sheet_name`, or the first sheet if not set, is parsed.
+
+        Returns
+        -------
+        `pd.DataFrame`
+        """
+        source = self.excel_source()
+        with pd.ExcelFile(source, engine=utilities.excel_engine()) as workbook:
+            sheet_names = workbook.sheet_names
+            if self.sheet_name is None:
+                self.sheet_name = sheet_names[0]
+                if len(sheet_names) > 1:
+                    logger.warning(
+                        "Multiple sheet names detected ({}). Parsing "
+                        "{} only. Re-run with the `sheet_name` argument "
+                        "to parse a specific sheet.".format(
+                            ", ".join(sheet_names), self.sheet_name
+                        )
+                    )
+            elif self.sheet_name not in sheet_names:
+                raise KeyError(f"invalid Excel sheet name '{self.sheet_name}'")
+
+            return self._parse_sheet(workbook, self.sheet_name)
+
+    def read_excel_sheets(self):
+        """
+        Reads every sheet of an Excel input file, opening the workbook once.
+
+        Returns
+        -------
+        `OrderedDict`
+            Dataframes keyed by sheet name in workbook order.
+        """
+        source = self.excel_source()
+        with pd.ExcelFile(source, engine=utilities.excel_engine()) as workbook:
+            return OrderedDict(
+                (name, self._parse_sheet(workbook, name))
+                for name in workbook.sheet_names
+            )
+
+    def excel_source(self):
+        """
+        Returns the path of an Excel input, or an in-memory copy of it if it
+        is compressed since Excel readers need random access.
+        """
+        if self.input_compression is None:
+            return self.src
+        with compression.open_input(self.src, self.input_compression) as fh:
+            return io.BytesIO(fh.read())
+
+    def _parse_sheet(self, workbook, sheet_name):
+        return workbook.parse(
+            sheet_name=sheet_name,
+            na_values=constants.extra_na,
+            skiprows=self.skip_header_rows,
+            skipfooter=self.skip_footer_rows,
+        )
+
+    def prepare_input(self, df):
+        """
+        Validates and prepares a dataframe, or a single streamed chunk, read
+        by `load_input_file`.
+
+        Returns
+        -------
+        `pd.DataFrame`
+        """
+        return df
 
     @abstractmethod
     def load_input_file(self):
@@ -194,10 +1036,215 @@ class BaseProgram(metaclass=ABCMeta):
     def parse_row(self, row):
         pass  # pragma: no cover
 
+    @staticmethod
+    def _substitution_events(variants, event_type, skip):
+        """
+        Splits `variants` into substitution events of `event_type`, skipping
+        variants for which `skip` returns `True`. Returns the index of the
+        variant each event belongs to and the events.
+        """
+        rows = []
+        events = []
+        for i, variant in enumerate(variants):
+            if skip(variant):
+                continue
+            if is_multi(variant):
+                singles = utilities.split_variant(variant)
+            else:
+                singles = [variant]
+            for single in singles:
+                if single in constants.special_variants:
+                    continue
+                rows.append(i)
+                events.append(event_type(single))
+        return rows, events
+
+    def wt_sequence_errors(self, variants):
+        """
+        Checks that the reference bases in a batch of substitution variants
+        match those in the wild-type sequence. The position and reference
+        base of every substitution event are extracted in one pass, see
+        `reference.extract_nucleotide_events`, and compared against the
+        wild-type index in one vectorized step. Error messages are only
+        built for variants that fail.
+
+        Parameters
+        ----------
+        variants : Sequence[str]
+            Nucleotide substitution variants with valid HGVS_ syntax. Special
+            variants and silent events are skipped.
+
+        Returns
+        -------
+        list
+            `None` for each valid variant, otherwise a `VariantError` for the
+            first failing event in the variant: an `IndexError` subclass if
+            it is out of bounds or a `ReferenceMismatchError` if its reference
+            base does not match.
+        """
+        rows, positions, refs = reference.extract_nucleotide_events(variants)
+        indices = positions - int(self.one_based)
+        mismatched = self.wt_index.base_mismatches(indices, refs)
+        failing = np.flatnonzero(mismatched)
+        # Keep the first failing event of each row.
+        failing = failing[np.unique(rows[failing], return_index=True)[1]]
+
+        errors = [None] * len(variants)
+        for k in failing:
+            errors[rows[k]] = self._wt_reference_error(
+                variants[rows[k]], int(indices[k]), chr(refs[k])
+            )
+        return errors
+
+    def _wt_reference_error(self, variant, index, ref):
+        """
+        Returns the error for a nucleotide substitution event in `variant`
+        with the zero-based `index` and reference base `ref` that failed
+        validation against the wild-type sequence.
+        """
+        length = len(self.wt_index)
+        variant = str(variant)
+        if index < 0:
+            return exceptions.NegativePositionError(variant=variant)
+        if index >= length:
+            return exceptions.PositionOutOfBoundsError(
+                variant=variant,
+                sequence=self.wt_sequence,
+                index=index,
+                position=index + int(self.one_based),
+                max_index=length - 1,
+                length=length,
+                sequence_name="wild-type sequence",
+            )
+        return exceptions.ReferenceMismatchError(
+            variant=variant,
+            sequence=self.wt_sequence,
+            index=index,
+            unit="base",
+            wt=self.wt_sequence[index],
+            ref=ref,
+            position=index + 1,
+            sequence_name="wild-type sequence",
+        )
+
+    def protein_sequence_errors(self, variants):
+        """
+        Checks that the reference amino acids in a batch of substitution
+        variants match those in the translated wild-type sequence. See
+        `wt_sequence_errors`.
+
+        Parameters
+        ----------
+        variants : Sequence[str]
+            Protein substitution variants with valid HGVS_ syntax.
+
+        Returns
+        -------
+        list
+            `None` for each valid variant, otherwise a `VariantError` for the
+            first failing event in the variant: an `InvalidPositionError` if
+            its position is less than 1, a `PositionOutOfBoundsError` if it
+            extends beyond the protein sequence or a `ReferenceMismatchError`
+            if its reference amino acid does not match.
+        """
+        rows, events = self._substitution_events(
+            variants,
+            utilities.ProteinSubstitutionEvent,
+            skip=lambda v: v in constants.special_variants or "p.=" in v,
+        )
+        positions = np.fromiter(
+            (event.position for event in events), dtype=np.int64, count=len(events)
+        )
+        mismatched = self._aa_mismatches(positions, [event.ref for event in events])
+
+        errors = [None] * len(variants)
+        for k in np.flatnonzero(mismatched):
+            i = rows[k]
+            if errors[i] is None:
+                errors[i] = self._protein_reference_error(
+                    events[k], events[k].position, events[k].ref
+                )
+        return errors
+
+    def _aa_mismatches(self, positions, refs):
+        """
+        Returns a boolean mask of the protein substitution events with the
+        1-based `positions` and reference amino acids `refs` that are out of
+        bounds, including positions less than 1, or do not match the
+        translated wild-type sequence.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        out_of_bounds = (positions < 1) | (positions > self.wt_index.protein_length)
+        return out_of_bounds | self.wt_index.aa_mismatches(positions - 1, refs)
+
+    def _protein_reference_error(self, variant, position, ref):
+        """
+        Returns the error for a protein substitution event in `variant` with
+        the 1-based `position` and reference amino acid `ref` that failed
+        validation against the translated wild-type sequence.
+        """
+        length = self.wt_index.protein_length
+        variant = str(variant)
+        if position < 1:
+            return exceptions.InvalidPositionError(variant=variant, position=position)
+        if position > length:
+            return exceptions.PositionOutOfBoundsError(
+                variant=variant,
+                sequence=self.protein_sequence,
+                index=position - 1,
+                position=position,
+                max_index=length - 1,
+                length=length,
+                sequence_name="translated wild-type sequence",
+            )
+        return exceptions.ReferenceMismatchError(
+            variant=variant,
+            sequence=self.protein_sequence,
+            index=position - 1,
+            unit="AA",
+            wt=str(self.wt_index.protein_codes[position - 1]),
+            ref=ref,
+            position=position,
+            sequence_name="translated protein sequence",
+        )
+
+    def protein_reference_errors(self, hgvs_pro):
+        """
+        Bulk counterpart of `protein_sequence_errors` for a column of protein
+        HGVS strings. The position and reference amino acid of every
+        substitution event are extracted in one pass and compared against
+        the translated wild-type sequence in one vectorized step.
+
+        Parameters
+        ----------
+        hgvs_pro : `pd.Series`
+            Protein HGVS strings. Missing values, special variants and `p.=`
+            are skipped.
+
+        Returns
+        -------
+        `pd.Series`
+            The error of the first failing event of each failing row, indexed
+            by the labels of the failing rows in `hgvs_pro`.
+        """
+        rows, positions, refs = reference.extract_protein_events(hgvs_pro)
+        mismatched = self._aa_mismatches(positions, refs)
+        failing = np.flatnonzero(mismatched)
+        # Keep the first failing event of each row.
+        failing = failing[np.unique(rows[failing], return_index=True)[1]]
+        errors = [
+            self._protein_reference_error(
+                hgvs_pro.iloc[rows[k]], int(positions[k]), refs[k]
+            )
+            for k in failing
+        ]
+        return pd.Series(errors, index=hgvs_pro.index[rows[failing]], dtype=object)
+
     def validate_against_wt_sequence(self, variant):
         """
         Checks that the reference base in a substitution variant matches that
-        in the wild-type sequence provided.
+        in the wild-type sequence provided. Use `wt_sequence_errors` to
+        validate many variants.
 
         Parameters
         ----------
@@ -205,10 +1252,8 @@ class BaseProgram(metaclass=ABCMeta):
             A nucleotide substitution variant with valid HGVS_ syntax.
         """
         if is_multi(variant):
-            _ = [
+            for v in utilities.split_variant(variant):
                 self.validate_against_wt_sequence(v)
-                for v in utilities.split_variant(variant)
-            ]
             return
 
         if variant in constants.special_variants:
@@ -218,45 +1263,17 @@ class BaseProgram(metaclass=ABCMeta):
         if variant.silent:
             return
 
-        zero_based_pos = variant.position - int(self.one_based)
-        if zero_based_pos < 0:
-            raise IndexError(
-                (
-                    "Encountered a negative position in {}. "
-                    "Positions might not be one-based."
-                ).format(variant, self.one_based)
-            )
-
-        if zero_based_pos >= len(self.wt_sequence):
-            raise IndexError(
-                "Position {} (index {}) extends beyond the maximum index {} in "
-                "the wild-type sequence {} with length {}.".format(
-                    zero_based_pos + int(self.one_based),
-                    zero_based_pos,
-                    variant,
-                    len(self.wt_sequence) - 1,
-                    self.wt_sequence,
-                    len(self.wt_sequence),
-                )
-            )
-
-        wt_ref_nt = self.wt_sequence[zero_based_pos]
-        if variant.ref != wt_ref_nt:
-            raise ValueError(
-                "Reference base '{base}' at 1-based position {pos} in the "
-                "wild-type sequence does not match the reference base '{ref}' "
-                "suggested in variant '{variant}'.".format(
-                    pos=zero_based_pos + 1,
-                    base=wt_ref_nt,
-                    variant=variant,
-                    ref=variant.ref,
-                )
-            )
+        index = variant.position - int(self.one_based)
+        if not 0 <= index < len(self.wt_sequence):
+            raise self._wt_reference_error(variant, index, variant.ref)
+        if variant.ref != self.wt_sequence[index]:
+            raise self._wt_reference_error(variant, index, variant.ref)
 
     def validate_against_protein_sequence(self, variant):
         """
         Checks that the reference amino acid in a substitution variant matches
-        that in the translated wild-type sequence provided.
+        that in the translated wild-type sequence provided. Use
+        `protein_sequence_errors` to validate many variants.
 
         Parameters
         ----------
@@ -264,40 +1281,19 @@ class BaseProgram(metaclass=ABCMeta):
             A protein substitution variant with valid HGVS_ syntax.
         """
         if is_multi(variant):
-            _ = [
+            for v in utilities.split_variant(variant):
                 self.validate_against_protein_sequence(v)
-                for v in utilities.split_variant(variant)
-            ]
             return
 
         if variant in constants.special_variants or "p.=" in variant:
             return
 
         variant = utilities.ProteinSubstitutionEvent(variant)
+        if self.wt_index.protein_codes is None:
+            raise ValueError("A non-coding sequence has no protein sequence.")
 
-        if variant.position > len(self.protein_sequence):
-            raise IndexError(
-                "Position {} in {} "
-                "extends beyond the maximum index {} in the translated "
-                "wild-type sequence {} with length {}.".format(
-                    variant.position,
-                    variant,
-                    len(self.protein_sequence) - 1,
-                    self.protein_sequence,
-                    len(self.protein_sequence),
-                )
-            )
-
-        wt_aa = AA_CODES[self.protein_sequence[variant.position - 1]]
-        if variant.ref != wt_aa:
-            raise ValueError(
-                "Reference AA '{aa}' at 1-based position {pos} in the "
-                "translated protein sequence {seq} does not match the "
-                "reference AA '{ref}' suggested in variant '{variant}'.".format(
-                    pos=variant.position,
-                    aa=wt_aa,
-                    variant=variant,
-                    ref=variant.ref,
-                    seq=self.protein_sequence,
-                )
-            )
+        position = variant.position
+        if not 1 <= position <= self.wt_index.protein_length:
+            raise self._protein_reference_error(variant, position, variant.ref)
+        if variant.ref != self.wt_index.protein_codes[position - 1]:
+            raise self._protein_reference_error(variant, position, variant.ref)
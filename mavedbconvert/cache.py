@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+
+from . import LOGGER, HOMEDIR, __version__
+
+
+logger = logging.getLogger(LOGGER)
+
+
+__all__ = ["ResultCache", "cache_key", "file_digest", "cached_convert"]
+
+
+CACHE_DIR = os.path.join(HOMEDIR, "cache")
+
+# Total size of the cached outputs before the least recently used entries
+# are evicted.
+MAX_CACHE_SIZE = 1 << 30
+
+MANIFEST = "manifest.json"
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path):
+    """Returns the SHA-256 hex digest of the contents of the file `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(program, kwargs, version=__version__):
+    """
+    Returns the key of the outputs of converting `kwargs['src']` with
+    `program`. The key is a hash of the contents of the input file, the
+    converter keyword arguments returned by `parsers.parse_docopt` and the
+    version of mavedbconvert.
+
+    The input path and output directory are not part of the key so that
+    moved or copied inputs hit the cache. The input file name is, as the
+    output files are named after it.
+
+    Parameters
+    ----------
+    program : str
+        The program the input was generated from.
+
+    kwargs : dict
+        Converter keyword arguments.
+
+    version : str, optional.
+        Version of mavedbconvert.
+
+    Returns
+    -------
+    str
+    """
+    normalized = dict(kwargs)
+    src = normalized.pop("src")
+    normalized.pop("dst", None)
+    normalized["src_filename"] = os.path.basename(src)
+    payload = json.dumps(
+        {
+            "program": program,
+            "version": version,
+            "input": file_digest(src),
+            "kwargs": normalized,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache(object):
+    """
+    Content-addressed cache of conversion outputs. Each entry is a directory
+    named after its key holding the output files, by path relative to the
+    output directory, and a manifest listing them.
+
+    The modification time of the manifest records when an entry was last
+    used. Once the total size of the entries exceeds `max_size`, the least
+    recently used entries are evicted.
+
+    Parameters
+    ----------
+    directory : str, optional.
+        Directory to store entries in. Defaults to `~/.mavedb_convert/cache`.
+
+    max_size : int, optional.
+        Maximum total size of the cached files in bytes.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_size=MAX_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _read_manifest(self, key):
+        try:
+            with open(os.path.join(self.entry_path(key), MANIFEST)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key, output_directory):
+        """
+        Restores the outputs cached under `key` to `output_directory`.
+
+        Returns
+        -------
+        list[str], optional.
+            The restored output files, or `None` if `key` is not cached.
+        """
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return None
+        entry = self.entry_path(key)
+        restored = []
+        for name in manifest["files"]:
+            path = os.path.join(output_directory, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(os.path.join(entry, name), path)
+            restored.append(path)
+        os.utime(os.path.join(entry, MANIFEST))
+        return restored
+
+    def put(self, key, output_directory, files):
+        """
+        Caches the output `files`, written to `output_directory`, under
+        `key`. Outputs outside of `output_directory` or larger than the
+        cache are not cached.
+
+        Returns
+        -------
+        bool
+            `True` if the outputs were cached.
+        """
+        names = [os.path.relpath(f, output_directory) for f in files]
+        size = sum(os.path.getsize(f) for f in files)
+        if not files or size > self.max_size:
+            return False
+        if any(n.startswith(os.pardir) or os.path.isabs(n) for n in names):
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Build the entry in a temporary directory and move it into place
+        # so that an interrupted run never leaves a partial entry.
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=self.directory)
+        try:
+            for name, src in zip(names, files):
+                dst = os.path.join(tmp_dir, name)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copyfile(src, dst)
+            with open(os.path.join(tmp_dir, MANIFEST), "wt") as fh:
+                json.dump({"files": names, "created": time.time()}, fh)
+            try:
+                os.rename(tmp_dir, self.entry_path(key))
+            except OSError:
+                # Cached by a concurrent run.
+                return False
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+        return True
+
+    def entries(self):
+        """
+        Returns the key, last use time and size of each entry, least
+        recently used first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for key in os.listdir(self.directory):
+            entry = self.entry_path(key)
+            manifest = os.path.join(entry, MANIFEST)
+            if key.startswith(".") or not os.path.isfile(manifest):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(entry)
+                for name in names
+            )
+            entries.append((key, os.path.getmtime(manifest), size))
+        return sorted(entries, key=lambda e: e[1])
+
+    def size(self):
+        """Returns the total size of the cache entries in bytes."""
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self):
+        """Evicts least recently used entries until the cache fits `max_size`."""
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total <= self.max_size:
+                break
+            logger.info("Evicting cached outputs {}".format(key))
+            shutil.rmtree(self.entry_path(key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Removes every entry."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def cached_convert(converter, key, result_cache=None):
+    """
+    Restores the outputs of a previous conversion cached under `key`, or
+    runs `converter.convert` and caches its outputs.
+
+    Parameters
+    ----------
+    converter : `BaseProgram`
+        Converter to run on a cache miss.
+
+    key : str
+        Key returned by `cache_key`.
+
+    result_cache : `ResultCache`, optional.
+        Cache to use. Defaults to the cache in `~/.mavedb_convert/cache`.
+
+    Returns
+    -------
+    list[str]
+        The output files.
+    """
+    if result_cache is None:
+        result_cache = ResultCache()
+    restored = result_cache.get(key, converter.output_directory)
+    if restored is not None:
+        logger.info(
+            "Restored {} output file(s) of a previous conversion of {} "
+            "from the cache. Use --no-cache to convert again.".format(
+                len(restored), converter.src
+            )
+        )
+        return restored
+
+    converter.convert()
+    try:
+        result_cache.put(key, converter.output_directory, converter.output_files)
+    except OSError as e:
+        logger.warning("Could not cache outputs: {}".format(e))
+    return converter.output_files
@@ -0,0 +1,187 @@
+import io
+import os
+import bz2
+import gzip
+import lzma
+import shutil
+import tempfile
+
+
+__all__ = [
+    "detect_compression",
+    "split_compression_extension",
+    "open_input",
+    "open_output",
+    "decompress_to_file",
+    "output_suffix",
+    "COMPRESSIONS",
+    "OUTPUT_COMPRESSIONS",
+]
+
+
+# Leading bytes identifying each supported compression format.
+MAGIC_BYTES = (
+    ("gzip", b"\x1f\x8b"),
+    ("zstd", b"\x28\xb5\x2f\xfd"),
+    ("bz2", b"BZh"),
+    ("xz", b"\xfd7zXZ\x00"),
+)
+
+EXTENSIONS = {".gz": "gzip", ".zst": "zstd", ".bz2": "bz2", ".xz": "xz"}
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "bz2": ".bz2", "xz": ".xz"}
+
+COMPRESSIONS = tuple(SUFFIXES)
+OUTPUT_COMPRESSIONS = ("gzip", "zstd")
+
+# Compression level used for gzip outputs, the default of the gzip tool.
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Size of the write buffer of output files.
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def detect_compression(source):
+    """
+    Detects the compression format of a file from its leading magic bytes.
+
+    Parameters
+    ----------
+    source : Union[str, BinaryIO]
+        Path to a file or a binary stream supporting `peek`, such as
+        `sys.stdin.buffer`, which is not consumed.
+
+    Returns
+    -------
+    str, optional.
+        One of 'gzip', 'zstd', 'bz2' or 'xz', or `None` if the file is not
+        compressed or cannot be read.
+    """
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as fh:
+                head = fh.read(6)
+        else:
+            head = source.peek(6)[:6]
+    except (OSError, AttributeError):
+        return None
+
+    for name, magic in MAGIC_BYTES:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def split_compression_extension(filename):
+    """
+    Splits a compression extension such as '.gz' from a file name.
+
+    Returns
+    -------
+    tuple[str, str]
+        The file name without the compression extension and the compression
+        format implied by the extension, or `None`.
+    """
+    root, ext = os.path.splitext(filename)
+    compression = EXTENSIONS.get(ext.lower(), None)
+    if compression is None:
+        return filename, None
+    return root, compression
+
+
+def output_suffix(compression):
+    """Returns the file name suffix for outputs written with `compression`."""
+    if compression is None:
+        return ""
+    return SUFFIXES[compression]
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstd compression requires zstandard. Install it with "
+            "'pip install zstandard'."
+        )
+    return zstandard
+
+
+def open_input(source, compression):
+    """
+    Opens a binary stream decompressing `source` as it is read.
+
+    Parameters
+    ----------
+    source : Union[str, BinaryIO]
+        Path to a file or a binary stream.
+
+    compression : str, optional.
+        Compression format. The file is opened as is if `None`.
+
+    Returns
+    -------
+    BinaryIO
+    """
+    if compression is None:
+        if isinstance(source, (str, os.PathLike)):
+            return open(source, "rb")
+        return source
+    if compression == "gzip":
+        return gzip.open(source, "rb")
+    if compression == "bz2":
+        return bz2.open(source, "rb")
+    if compression == "xz":
+        return lzma.open(source, "rb")
+    if compression == "zstd":
+        fh = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+        return _zstandard().ZstdDecompressor().stream_reader(fh, closefd=True)
+    raise ValueError("Unsupported compression '{}'.".format(compression))
+
+
+def open_output(path, compression, threads=-1):
+    """
+    Opens a text stream writing to `path`, compressing the output if
+    `compression` is set. zstd outputs are compressed using `threads` worker
+    threads, where -1 uses one thread per CPU. Writes are buffered in
+    blocks of `OUTPUT_BUFFER_SIZE` bytes.
+
+    Returns
+    -------
+    TextIO
+    """
+    if compression is None:
+        return open(path, "wt", newline="", buffering=OUTPUT_BUFFER_SIZE)
+    if compression == "gzip":
+        binary = gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+    elif compression == "zstd":
+        compressor = _zstandard().ZstdCompressor(level=ZSTD_LEVEL, threads=threads)
+        binary = compressor.stream_writer(open(path, "wb"), closefd=True)
+    else:
+        raise ValueError(
+            "Outputs can only be compressed with {}.".format(
+                ", ".join(OUTPUT_COMPRESSIONS)
+            )
+        )
+    return io.TextIOWrapper(
+        io.BufferedWriter(binary, buffer_size=OUTPUT_BUFFER_SIZE),
+        encoding="utf-8",
+        newline="",
+    )
+
+
+def decompress_to_file(path, compression, suffix=None):
+    """
+    Decompresses `path` into a temporary file for readers that need random
+    access, such as PyTables and openpyxl. The caller is responsible for
+    removing the file.
+
+    Returns
+    -------
+    str
+        Path to the decompressed temporary file.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix, prefix="mavedbconvert_")
+    with os.fdopen(fd, "wb") as dst, open_input(path, compression) as src:
+        shutil.copyfileobj(src, dst, length=1 << 20)
+    return tmp_path
@@ -2,6 +2,24 @@ import re
 
 MAX_ERROR_VARIANTS = 5
 
+# CSV reading engines
+csv_engines = ("c", "pyarrow")
+default_csv_engine = "c"
+
+# Output formats
+output_formats = ("csv", "parquet", "feather")
+default_output_format = "csv"
+
+# Streaming constants
+STREAM_SRC = "-"
+STREAM_CHUNK_SIZE = 10000
+
+# Offset inferred from the input, see `offsets.infer_offset`.
+AUTO_OFFSET = "auto"
+
+# Coordinate base inferred from the input, see `offsets.infer_one_based`.
+AUTO_ONE_BASED = "auto"
+
 supported_programs = ("enrich", "enrich2", "empiric")
 extra_na = (
     "None",
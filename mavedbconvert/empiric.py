@@ -5,7 +5,19 @@ import numpy as np
 from fqfa.constants.translation.table import CODON_TABLE
 from fqfa.constants.iupac.protein import AA_CODES
 
-from . import base, utilities, constants, filters, validators, LOGGER
+from . import (
+    base,
+    utilities,
+    constants,
+    filters,
+    validators,
+    profiling,
+    report,
+    exceptions,
+    reference,
+    variant_table,
+    LOGGER,
+)
 
 
 logger = logging.getLogger(LOGGER)
@@ -99,6 +111,8 @@ def infer_pro_substitution(wt_aa, mut_aa, codon_pos):
 
 class Empiric(base.BaseProgram):
     __doc__ = base.BaseProgram.__doc__
+    INFERS_OFFSET = True
+    INFERS_ONE_BASED = True
 
     CODON_COLUMNS = ("Codon", "codon", "CODON")
     AA_COLUMNS = ("Amino Acid", "amino acid", "AMINO ACID")
@@ -118,6 +132,13 @@ class Empiric(base.BaseProgram):
         input_type=None,
         sheet_name=None,
         is_coding=True,
+        csv_engine=None,
+        output_compression=None,
+        output_formats=None,
+        incremental=False,
+        shard=None,
+        preflight=True,
+        error_policy=None,
     ):
         super().__init__(
             src=src,
@@ -132,8 +153,15 @@ class Empiric(base.BaseProgram):
             score_column=score_column,
             hgvs_column=hgvs_column,
             input_type=input_type,
+            csv_engine=csv_engine,
+            output_compression=output_compression,
+            output_formats=output_formats,
+            incremental=incremental,
+            shard=shard,
+            preflight=preflight,
+            error_policy=error_policy,
         )
-        if not abs(offset) % 3 == 0:
+        if not abs(self.offset) % 3 == 0:
             raise ValueError("EMPIRIC offset must be a multiple of 3.")
 
         if not is_coding:
@@ -148,13 +176,21 @@ class Empiric(base.BaseProgram):
                 "the input file is a scores file."
             )
 
+    @property
+    def required_columns(self):
+        return (
+            list(self.POSITION_COLUMNS + self.AA_COLUMNS + self.CODON_COLUMNS)
+            + super().required_columns
+        )
+
     def load_input_file(self):
         """
         Loads the input file specified at initialization into a dataframe.
 
         Returns
         -------
-        `pd.DataFrame`
+        Union[`pd.DataFrame`, Iterator[`pd.DataFrame`]]
+            An iterator over chunks of the input when streaming.
         """
         if self.skip_header_rows:
             logger.info("Skipping first {} row(s).".format(self.skip_footer_rows + 1))
@@ -162,45 +198,30 @@ class Empiric(base.BaseProgram):
             logger.info("Skipping last {} row(s).".format(self.skip_footer_rows + 1))
 
         if self.extension in (".xlsx", ".xls"):
-            try:
-                od = pd.read_excel(
-                    self.src,
-                    na_values=constants.extra_na,
-                    sheet_name=self.sheet_name,
-                    skiprows=self.skip_header_rows,
-                    skipfooter=self.skip_footer_rows,
-                    engine="openpyxl",
-                )
-            except KeyError:
-                raise KeyError(f"invalid Excel sheet name '{self.sheet_name}'")
-
-            if self.sheet_name is None:
-                self.sheet_name = list(od.keys())[0]
-                if len(od) > 1:
-                    logger.warning(
-                        "Multiple sheet names detected ({}). Parsing "
-                        "{} only. Re-run with the `sheet_name` argument "
-                        "to parse a specific sheet.".format(
-                            ", ".join(list(od.keys())), self.sheet_name
-                        )
-                    )
-                df = od[self.sheet_name]
-            else:
-                df = od
+            df = self.read_excel()
         else:
             sep = "\t"
             if self.ext.lower() == ".csv":
                 sep = ","
-            df = pd.read_csv(
-                self.src,
-                delimiter=sep,
-                na_values=constants.extra_na,
-                skipfooter=self.skip_footer_rows,
-                skiprows=self.skip_header_rows,
-            )
+            df = self.read_delimited(sep)
+            if self.streaming:
+                return map(self.prepare_input, df)
+
+        return self.prepare_input(df)
+
+    def prepare_input(self, df):
+        """
+        Validates the required columns of a loaded dataframe and applies the
+        codon adjusted offset to the position column.
 
+        Returns
+        -------
+        `pd.DataFrame`
+        """
         self.validate_columns(df)
+        self.resolve_offset(df)
         df[self.position_column] -= (1, -1)[self.offset < 3] * abs(self.offset) // 3
+        self.resolve_one_based(df)
         return df
 
     def validate_columns(self, df):
@@ -248,17 +269,23 @@ class Empiric(base.BaseProgram):
         codon_pos = int(row[self.position_column]) - int(self.one_based)
         mut_aa = str(row[self.aa_column]).strip().upper()
         if codon_pos < 0:
-            raise IndexError(
-                "Negative position encountered after adjusting for 1-based "
-                "coordinate input. Coordinates might not be one-based."
+            raise exceptions.NegativePositionError(
+                row=row.get("row_num"),
+                template=(
+                    "Negative position encountered after adjusting for 1-based "
+                    "coordinate input. Coordinates might not be one-based."
+                ),
             )
         if codon_pos > len(self.codons) - 1:
-            raise IndexError(
-                "Coordinate {pos} (1-based) is out of bounds. The maximum "
-                "index of the translated sequence is {idx} "
-                "(length {length}).".format(
-                    pos=codon_pos + 1, idx=len(self.codons), length=len(self.codons)
-                )
+            raise exceptions.PositionOutOfBoundsError(
+                row=row.get("row_num"),
+                template=(
+                    "Coordinate {position} (1-based) is out of bounds. The "
+                    "maximum index of the translated sequence is {length} "
+                    "(length {length})."
+                ),
+                position=codon_pos + 1,
+                length=len(self.codons),
             )
 
         if utilities.is_null(mut_aa) or not mut_aa:
@@ -288,6 +315,83 @@ class Empiric(base.BaseProgram):
         hgvs_pro = infer_pro_substitution(wt_aa, mut_aa, codon_pos)
         return hgvs_nt, hgvs_pro
 
+    def coordinate_residues(self, df):
+        """
+        Returns the positions of the rows of `df` after applying the offset,
+        which is 0 while it is being inferred, their residues and the
+        wild-type residue at each zero-based position, with residues encoded
+        alike. Used by `resolve_offset` and `resolve_one_based`.
+        """
+        positions = pd.to_numeric(df[self.position_column], errors="coerce")
+        if self.codon_column:
+            residues = df[self.codon_column].astype(str).str.strip().str.upper()
+            keep = positions.notna() & residues.isin(list(CODON_TABLE))
+            return (
+                positions[keep].to_numpy(dtype=np.int64),
+                reference.encode_codons(list(residues[keep])),
+                self.wt_index.codon_codes,
+            )
+        residues = df[self.aa_column].astype(str).str.strip().str.upper()
+        keep = positions.notna() & residues.isin(list(self.protein_sequence))
+        return (
+            positions[keep].to_numpy(dtype=np.int64),
+            reference.encode(list(residues[keep])),
+            self.wt_index.protein,
+        )
+
+    def preflight_positions(self, df):
+        return df[self.position_column]
+
+    def parse_rows(self, df):
+        """
+        Parses each row of `df`. Positions, amino acids and codons are read
+        into `VariantTable` arrays which are checked against the wild-type
+        sequence and formatted in bulk. Rows the tables cannot represent,
+        such as those with a missing value, an unknown amino acid or a
+        position out of bounds, are parsed with `parse_row` to report their
+        error.
+
+        Returns
+        -------
+        tuple[list, list]
+            The `hgvs_nt` and `hgvs_pro` variants of each row, `None` for rows
+            that could not be parsed.
+        """
+        positions = pd.to_numeric(df[self.position_column], errors="coerce")
+        positions = positions.to_numpy(dtype=float)
+        aa = df[self.aa_column].astype(str).str.strip().str.upper()
+        readable = np.isfinite(positions) & (positions == np.round(positions))
+        readable &= (aa.isin(list(AA_CODES)) | aa.isin(["?", "???"])).to_numpy()
+        if self.codon_column:
+            codons = df[self.codon_column].astype(str).str.strip().str.upper()
+            readable &= (codons.map(CODON_TABLE) == aa).to_numpy()
+
+        aa_codes = reference.encode(aa[readable].str[0])
+        aa_codes = np.where(
+            aa_codes == ord("?"), variant_table.UNKNOWN_AA, aa_codes
+        ).astype(np.uint8)
+        pro_table = variant_table.VariantTable.substitutions(
+            positions, aa_codes, prefix="p", parsed=readable
+        ).shift(int(self.one_based) - 1)
+        failed = pro_table.invalid_rows(pro_table.out_of_bounds(len(self.codons)))
+        pro_table = pro_table.fill_reference(self.wt_index.protein)
+        pro_variants = pro_table.to_hgvs(valid=~failed)
+        nt_variants = [None] * len(df)
+        if self.codon_column:
+            nt_table = variant_table.VariantTable.codon_substitutions(
+                positions - int(self.one_based) + 1,
+                list(codons[~failed]),
+                parsed=~failed,
+            )
+            nt_variants = nt_table.fill_reference(self.wt_index.bases).to_hgvs()
+        self.error_policy.record(rows=int((~failed).sum()))
+
+        rows = tqdm(np.flatnonzero(failed), desc="Parsing variants")
+        for i in rows:
+            nt, pro = self.try_parse_row(df.index[i], df.iloc[i]) or (None, None)
+            nt_variants[i], pro_variants[i] = nt, pro
+        return nt_variants, pro_variants
+
     def parse_input(self, df):
         """
         Formats an input `pd.DataFrame` loaded from an `EMPIRIC` formatted file
@@ -301,11 +405,20 @@ class Empiric(base.BaseProgram):
         self.validate_columns(df)
         df["row_num"] = range(0, len(df))
 
-        rows = tqdm(df.iterrows(), desc="Parsing variants", total=len(df))
-        tups = [self.parse_row(row) for _, row in rows]
-
-        df[constants.nt_variant_col] = [tup[0] for tup in tups]
-        df[constants.pro_variant_col] = [tup[1] for tup in tups]
+        columns = [self.position_column, self.aa_column]
+        if self.codon_column:
+            columns.append(self.codon_column)
+        with profiling.stage("parse_variants", rows=len(df)):
+            nt_variants, pro_variants = self.parse_variants(
+                df, columns, self.parse_rows
+            )
+        df[constants.nt_variant_col] = nt_variants
+        df[constants.pro_variant_col] = pro_variants
+        n_rows = len(df)
+        df = self.drop_invalid_rows(df)
+        report.record_dataset(
+            df_type=self.input_type, parsed=n_rows, invalid=n_rows - len(df)
+        )
         df.drop(columns=[self.position_column, self.aa_column, "row_num"], inplace=True)
         if self.codon_column:
             df.drop(columns=[self.codon_column], inplace=True)
@@ -341,9 +454,14 @@ class Empiric(base.BaseProgram):
                 mave_columns[:2] + [constants.mavedb_score_column] + mave_columns[2:]
             )
         mavedb_df = pd.DataFrame(data=data, columns=mave_columns)
-        filters.drop_na_rows(mavedb_df)
-        filters.drop_na_columns(mavedb_df)
+        with profiling.stage("filters", rows=len(mavedb_df)):
+            filters.drop_na_rows(mavedb_df)
+            # Streamed chunks and shards keep every column so that their
+            # outputs can be concatenated.
+            if not self.streaming and self.shard is None:
+                filters.drop_na_columns(mavedb_df)
 
         logger.info("Running MaveDB compliance validation.")
-        validators.validate_mavedb_compliance(mavedb_df, df_type=self.input_type)
+        with profiling.stage("validate_mavedb_compliance", rows=len(mavedb_df)):
+            validators.validate_mavedb_compliance(mavedb_df, df_type=self.input_type)
         return mavedb_df
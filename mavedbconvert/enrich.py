@@ -5,7 +5,19 @@ import pandas as pd
 import numpy as np
 from fqfa.constants.iupac.protein import AA_CODES
 
-from . import LOGGER, constants, base, utilities, filters, validators
+from . import (
+    LOGGER,
+    constants,
+    base,
+    utilities,
+    filters,
+    validators,
+    profiling,
+    report,
+    exceptions,
+    reference,
+    variant_table,
+)
 
 
 __all__ = ["Enrich"]
@@ -16,6 +28,8 @@ logger = logging.getLogger(LOGGER)
 
 class Enrich(base.BaseProgram):
     __doc__ = base.BaseProgram.__doc__
+    INFERS_OFFSET = True
+    INFERS_ONE_BASED = True
 
     def __init__(
         self,
@@ -31,6 +45,13 @@ class Enrich(base.BaseProgram):
         input_type=None,
         sheet_name=None,
         is_coding=True,
+        csv_engine=None,
+        output_compression=None,
+        output_formats=None,
+        incremental=False,
+        shard=None,
+        preflight=True,
+        error_policy=None,
     ):
         super().__init__(
             src=src,
@@ -45,20 +66,32 @@ class Enrich(base.BaseProgram):
             input_type=input_type,
             hgvs_column=hgvs_column,
             is_coding=is_coding,
+            csv_engine=csv_engine,
+            output_compression=output_compression,
+            output_formats=output_formats,
+            incremental=incremental,
+            shard=shard,
+            preflight=preflight,
+            error_policy=error_policy,
         )
-        if not abs(offset) % 3 == 0:
+        if not abs(self.offset) % 3 == 0:
             raise ValueError("Enrich offset must be a multiple of 3.")
 
         if not is_coding:
             raise ValueError("Enrich does not support non-coding datasets.")
 
+    @property
+    def required_columns(self):
+        return ["seqID"] + super().required_columns
+
     def load_input_file(self):
         """
         Loads the input file specified at initialization into a dataframe.
 
         Returns
         -------
-        `pd.DataFrame`
+        Union[`pd.DataFrame`, Iterator[`pd.DataFrame`]]
+            An iterator over chunks of the input when streaming.
         """
         if self.skip_header_rows:
             logger.info("Skipping first {} row(s).".format(self.skip_footer_rows + 1))
@@ -66,45 +99,29 @@ class Enrich(base.BaseProgram):
             logger.info("Skipping last {} row(s).".format(self.skip_footer_rows + 1))
 
         if self.extension in (".xlsx", ".xls"):
-            try:
-                od = pd.read_excel(
-                    self.src,
-                    na_values=constants.extra_na,
-                    sheet_name=self.sheet_name,
-                    skiprows=self.skip_header_rows,
-                    skipfooter=self.skip_footer_rows,
-                    engine="openpyxl",
-                )
-            except KeyError:
-                raise KeyError(f"invalid Excel sheet name '{self.sheet_name}'")
-
-            if self.sheet_name is None:
-                self.sheet_name = list(od.keys())[0]
-                if len(od) > 1:
-                    logger.warning(
-                        "Multiple sheet names detected ({}). Parsing "
-                        "{} only. Re-run with the `sheet_name` argument "
-                        "to parse a specific sheet.".format(
-                            ", ".join(list(od.keys())), self.sheet_name
-                        )
-                    )
-                df = od[self.sheet_name]
-            else:
-                df = od
+            df = self.read_excel()
         else:
             sep = "\t"
             if self.ext.lower() == ".csv":
                 sep = ","
-            df = pd.read_csv(
-                self.src,
-                delimiter=sep,
-                na_values=constants.extra_na,
-                skipfooter=self.skip_footer_rows,
-                skiprows=self.skip_header_rows,
-            )
+            df = self.read_delimited(sep)
+            if self.streaming:
+                return map(self.prepare_input, df)
+
+        return self.prepare_input(df)
+
+    def prepare_input(self, df):
+        """
+        Checks that a loaded dataframe defines the 'seqID' column.
 
+        Returns
+        -------
+        `pd.DataFrame`
+        """
         if "seqID" not in df.columns:
             raise ValueError("Input is missing the required column 'seqID'.")
+        self.resolve_offset(df)
+        self.resolve_one_based(df)
         return df
 
     def parse_row(self, row):
@@ -147,34 +164,36 @@ class Enrich(base.BaseProgram):
             offset = (1, -1)[self.offset < 0] * abs(self.offset) // 3
             aa_position = int(position) - int(self.one_based) + 1 - offset
             if aa_position < 1:
-                raise IndexError(
-                    "Position in SeqID '{pos}-{aa}' from row '{seqid}' must "
-                    "be 1 or greater after applying codon adjusted offset "
-                    "{offset} ({raw_offset} / 3). Computed position is "
-                    "{aa_pos}.".format(
-                        pos=position,
-                        aa=aa,
-                        seqid=seq_id,
-                        raw_offset=self.offset,
-                        offset=offset,
-                        aa_pos=aa_position,
-                    )
+                raise exceptions.NegativePositionError(
+                    variant="{}-{}".format(position, aa),
+                    row=seq_id,
+                    template=(
+                        "Position in SeqID '{variant}' from row '{row}' must "
+                        "be 1 or greater after applying codon adjusted offset "
+                        "{offset} ({raw_offset} / 3). Computed position is "
+                        "{position}."
+                    ),
+                    raw_offset=self.offset,
+                    offset=offset,
+                    position=aa_position,
                 )
             if aa_position > len(self.protein_sequence):
-                raise IndexError(
-                    "Position in SeqID '{pos}-{aa}' from row '{seqid}' is "
-                    "out of bounds after applying codon adjusted offset "
-                    "{offset} ({raw_offset} / 3). Computed position is "
-                    "{aa_pos} and the length of the translated sequence "
-                    "is {seqlen}.".format(
-                        pos=position,
-                        aa=aa,
-                        seqid=seq_id,
-                        raw_offset=self.offset,
-                        offset=offset,
-                        aa_pos=aa_position,
-                        seqlen=len(self.protein_sequence),
-                    )
+                raise exceptions.PositionOutOfBoundsError(
+                    variant="{}-{}".format(position, aa),
+                    row=seq_id,
+                    sequence=self.protein_sequence,
+                    index=aa_position - 1,
+                    template=(
+                        "Position in SeqID '{variant}' from row '{row}' is "
+                        "out of bounds after applying codon adjusted offset "
+                        "{offset} ({raw_offset} / 3). Computed position is "
+                        "{position} and the length of the translated sequence "
+                        "is {length}."
+                    ),
+                    raw_offset=self.offset,
+                    offset=offset,
+                    position=aa_position,
+                    length=len(self.protein_sequence),
                 )
 
             wt_aa = AA_CODES[self.protein_sequence[aa_position - 1].upper()]
@@ -194,6 +213,66 @@ class Enrich(base.BaseProgram):
 
         return utilities.hgvs_pro_from_event_list(events)
 
+    def parse_seq_ids(self, df):
+        """
+        Parses the 'seqID' column of `df`. SeqIDs are read into a
+        `VariantTable` and offset, checked and formatted as arrays. SeqIDs
+        the table cannot read or which fall outside the translated sequence
+        are parsed with `parse_row` to report their error.
+
+        Returns
+        -------
+        tuple[list, list]
+            The `hgvs_nt` variants, which are all `None`, and the `hgvs_pro`
+            variants of each row, `None` for rows that could not be parsed.
+        """
+        seq_ids = df["seqID"]
+        offset = (1, -1)[self.offset < 0] * abs(self.offset) // 3
+        table = variant_table.VariantTable.from_seq_ids(seq_ids)
+        table = table.shift(offset + int(self.one_based) - 1)
+        failed = table.invalid_rows(table.out_of_bounds(len(self.protein_sequence)))
+        table = table.fill_reference(self.wt_index.protein)
+        pro_variants = table.to_hgvs(valid=~failed)
+        self.error_policy.record(rows=int((~failed).sum()))
+
+        # output the conversion progress with a progress bar
+        rows = tqdm(np.flatnonzero(failed), desc="Parsing seqIDs")
+        for i in rows:
+            pro_variants[i] = self.try_parse_row(seq_ids.index[i], seq_ids.iloc[i])
+        return [None] * len(pro_variants), pro_variants
+
+    def coordinate_residues(self, df):
+        """
+        Returns the positions of the rows of `df` after applying the offset,
+        which is 0 while it is being inferred, their residues and the
+        wild-type residue at each zero-based position, with residues encoded
+        alike. Used by `resolve_offset` and `resolve_one_based`.
+        """
+        ids = df["seqID"].astype(str).str.split("-", n=1, expand=True)
+        if ids.shape[1] < 2:
+            ids[1] = None
+        events = pd.DataFrame(
+            {"position": ids[0].str.split(","), "aa": ids[1].str.split(",")}
+        ).dropna()
+        events = events[events["position"].str.len() == events["aa"].str.len()]
+        # Both lists of a row have the same length so exploding each column
+        # on its own keeps them aligned.
+        positions = pd.to_numeric(events["position"].explode(), errors="coerce")
+        aa = events["aa"].explode().str.strip().str.upper()
+        keep = positions.notna() & aa.isin(list(self.protein_sequence))
+        offset = (1, -1)[self.offset < 0] * abs(self.offset) // 3
+        return (
+            positions[keep].to_numpy(dtype=np.int64) - offset,
+            reference.encode(list(aa[keep])),
+            self.wt_index.protein,
+        )
+
+    def preflight_positions(self, df):
+        return df["seqID"]
+
+    def preflight_rows(self, df):
+        return list(df["seqID"])
+
     def parse_input(self, df):
         """
         Parse a list of Enrich seq_id values in the format:
@@ -218,10 +297,13 @@ class Enrich(base.BaseProgram):
         """
         data_columns = [c for c in df.columns if c != "seqID"]
 
-        # output the conversion progress with a progress bar
-        tqdm.pandas(desc="Parsing seqIDs")
-        df.loc[:, constants.pro_variant_col] = df.loc[:, "seqID"].progress_apply(
-            self.parse_row
+        with profiling.stage("parse_variants", rows=len(df)):
+            _, pro_variants = self.parse_variants(df, ["seqID"], self.parse_seq_ids)
+        df.loc[:, constants.pro_variant_col] = pro_variants
+        n_rows = len(df)
+        df = self.drop_invalid_rows(df)
+        report.record_dataset(
+            df_type=self.input_type, parsed=n_rows, invalid=n_rows - len(df)
         )
 
         # enrich output has no nucleotide data
@@ -259,9 +341,14 @@ class Enrich(base.BaseProgram):
             mave_columns[:2] + [constants.mavedb_score_column] + mave_columns[2:]
         )
         mavedb_df = pd.DataFrame(data=data, columns=mave_columns)
-        filters.drop_na_rows(mavedb_df)
-        filters.drop_na_columns(mavedb_df)
+        with profiling.stage("filters", rows=len(mavedb_df)):
+            filters.drop_na_rows(mavedb_df)
+            # Streamed chunks and shards keep every column so that their
+            # outputs can be concatenated.
+            if not self.streaming and self.shard is None:
+                filters.drop_na_columns(mavedb_df)
 
         logger.info("Running MaveDB compliance validation.")
-        validators.validate_mavedb_compliance(mavedb_df, df_type=self.input_type)
+        with profiling.stage("validate_mavedb_compliance", rows=len(mavedb_df)):
+            validators.validate_mavedb_compliance(mavedb_df, df_type=self.input_type)
         return mavedb_df
@@ -1,5 +1,6 @@
 import re
 import os
+from functools import partial
 from itertools import groupby
 import logging
 from operator import itemgetter
@@ -13,7 +14,23 @@ import pandas as pd
 import numpy as np
 from pandas.testing import assert_index_equal
 
-from . import LOGGER, constants, filters, utilities, validators, base
+from . import (
+    LOGGER,
+    constants,
+    filters,
+    utilities,
+    validators,
+    base,
+    profiling,
+    report,
+    compression,
+    variant_cache as vcache,
+    exceptions,
+    policy,
+    preflight,
+    reference,
+    offsets,
+)
 
 
 __all__ = [
@@ -28,12 +45,16 @@ __all__ = [
 logger = logging.getLogger(LOGGER)
 
 
-def apply_offset(variant, offset, enrich2=None):
+def apply_offset(
+    variant, offset, enrich2=None, validate_nt=True, validate_protein=True
+):
     """
     Applies offset to the base position of a HGVS point mutation by
     subtraction. If `enrich2` is not None, then additional validation
     against a wild-type NT and Protein sequence are performed after applicaiton
-    of the offset.
+    of the offset. Nucleotide or protein validation is skipped if
+    `validate_nt` or `validate_protein` is `False`, for callers validating
+    variants in bulk.
     """
     variants = []
     for v in variant.split(","):
@@ -54,7 +75,7 @@ def apply_offset(variant, offset, enrich2=None):
                     "Position after offset {} "
                     "applied to {} is negative.".format(offset, nt.variant)
                 )
-            if enrich2:
+            if enrich2 and validate_nt:
                 enrich2.validate_against_wt_sequence(nt.format)
             nt = nt.format
 
@@ -71,7 +92,7 @@ def apply_offset(variant, offset, enrich2=None):
                 pro_offset = (1, -1)[offset < 0] * (abs(offset) // 3)
                 pro.position -= pro_offset
 
-            if enrich2:
+            if enrich2 and validate_protein:
                 enrich2.validate_against_protein_sequence(pro.format)
             pro = pro.format
             if use_brackets:
@@ -84,11 +105,11 @@ def apply_offset(variant, offset, enrich2=None):
     return ", ".join(variants)
 
 
-def drop_null(scores_df, counts_df=None):
+def drop_null(scores_df, counts_df=None, drop_columns=True):
     """
-    Drops null rows and columns. If `counts_df` is not None, then they
-    must contain the same index and same variants under the HGVS columns
-    `hgvs_nt` and `hgvs_pro`.
+    Drops null rows and, if `drop_columns` is set, null columns. If
+    `counts_df` is not None, then they must contain the same index and same
+    variants under the HGVS columns `hgvs_nt` and `hgvs_pro`.
 
     Modification is inplace when `counts_df` is `None`
 
@@ -121,7 +142,8 @@ def drop_null(scores_df, counts_df=None):
             sort=False,
         )
         assert len(joint_df) == len(counts_df)
-        filters.drop_na_columns(joint_df)
+        if drop_columns:
+            filters.drop_na_columns(joint_df)
         filters.drop_na_rows(joint_df)
 
         score_columns = list(utilities.hgvs_columns(joint_df.columns)) + list(
@@ -138,7 +160,8 @@ def drop_null(scores_df, counts_df=None):
 
         assert_index_equal(scores_df.index, counts_df.index)
     else:
-        filters.drop_na_columns(scores_df)
+        if drop_columns:
+            filters.drop_na_columns(scores_df)
         filters.drop_na_rows(scores_df)
 
     return scores_df, counts_df
@@ -246,6 +269,8 @@ def get_count_dataframe_by_condition(
 class Enrich2(base.BaseProgram):
     __doc__ = base.BaseProgram.__doc__
     LOG_MSG = "Writing {elem} {df_type} for condition '{cnd}' to '{path}'."
+    DEFAULT_ERROR_POLICY = policy.COLLECT
+    INFERS_OFFSET = True
 
     def __init__(
         self,
@@ -261,6 +286,13 @@ class Enrich2(base.BaseProgram):
         input_type=None,
         sheet_name=None,
         is_coding=True,
+        csv_engine=None,
+        output_compression=None,
+        output_formats=None,
+        variant_cache=None,
+        shard=None,
+        preflight=True,
+        error_policy=None,
     ):
         super().__init__(
             src=src,
@@ -275,21 +307,57 @@ class Enrich2(base.BaseProgram):
             score_column=score_column,
             hgvs_column=hgvs_column,
             input_type=input_type,
+            csv_engine=csv_engine,
+            output_compression=output_compression,
+            output_formats=output_formats,
+            shard=shard,
+            preflight=preflight,
+            error_policy=error_policy,
         )
-        if is_coding and not abs(offset) % 3 == 0:
+        if is_coding and not abs(self.offset) % 3 == 0:
             raise ValueError(
                 "Enrich2 offset for a coding " "dataset must be a multiple of 3."
             )
+        self._decompressed_src = None
+        # Set while `convert_h5_df` validates variants in bulk.
+        self._bulk_validation = False
+
+        if variant_cache is True:
+            variant_cache = vcache.VariantCache()
+        elif variant_cache is False:
+            variant_cache = None
+        self.variant_cache = variant_cache
+
+    @property
+    def variant_context(self):
+        """Key of the settings variants are parsed with in the variant cache."""
+        return vcache.parse_context(self.wt_sequence, self.offset, self.is_coding)
 
     def convert(self):
         logger.info("Processing file {}".format(self.src))
         if self.input_is_h5:
-            input_file = self.load_input_file()
-            result = self.parse_input(input_file)
-            input_file.close()
-            return result
+            with profiling.stage("load_input_file"):
+                input_file = self.load_input_file()
+            try:
+                result = self.parse_input(input_file)
+            finally:
+                input_file.close()
+                if self._decompressed_src is not None:
+                    os.remove(self._decompressed_src)
+                    self._decompressed_src = None
+        elif self.streaming:
+            return self.convert_stream(
+                partial(self.convert_h5_df, element=None, df_type=self.input_type)
+            )
         else:
-            return self.parse_tsv_input(self.load_input_file())
+            with profiling.stage("load_input_file") as stage:
+                df = self.select_shard(self.load_input_file())
+                stage.rows = len(df)
+            self.resolve_offset(df)
+            self.run_preflight(df)
+            result = self.parse_tsv_input(df)
+        self.write_shard_metadata()
+        return result
 
     def load_input_file(self):
         """
@@ -297,7 +365,8 @@ class Enrich2(base.BaseProgram):
 
         Returns
         -------
-        `pd.HDFStore`
+        Union[`pd.HDFStore`, `pd.DataFrame`, Iterator[`pd.DataFrame`]]
+            An iterator over chunks of the input when streaming.
         """
         if not (self.input_is_h5 or self.input_is_tsv):
             raise TypeError(
@@ -307,31 +376,44 @@ class Enrich2(base.BaseProgram):
             )
 
         if self.input_is_h5:
-            return pd.HDFStore(self.src, mode="r")
-        else:
-            df = pd.read_csv(
-                self.src,
-                delimiter="\t",
-                na_values=constants.extra_na,
-                skipfooter=self.skip_footer_rows,
-                skiprows=self.skip_header_rows,
+            if self.input_compression is None:
+                return pd.HDFStore(self.src, mode="r")
+            # PyTables needs random access so decompress to a temporary file.
+            self._decompressed_src = compression.decompress_to_file(
+                self.src, self.input_compression, suffix=".h5"
             )
-            if self.input_is_scores_based and self.score_column not in df.columns:
-                raise KeyError(
-                    "Input is missing the required score column '{}'.".format(
-                        self.score_column
-                    )
+            return pd.HDFStore(self._decompressed_src, mode="r")
+        else:
+            df = self.read_delimited("\t")
+            if self.streaming:
+                return map(self.prepare_input, df)
+            return self.prepare_input(df)
+
+    def prepare_input(self, df):
+        """
+        Validates the score and hgvs columns of a loaded TSV dataframe and
+        indexes it by the hgvs column.
+
+        Returns
+        -------
+        `pd.DataFrame`
+        """
+        if self.input_is_scores_based and self.score_column not in df.columns:
+            raise KeyError(
+                "Input is missing the required score column '{}'.".format(
+                    self.score_column
                 )
+            )
 
-            if self.hgvs_column not in df.columns:
-                raise KeyError(
-                    "Input is missing the required hgvs column '{}'.".format(
-                        self.hgvs_column
-                    )
+        if self.hgvs_column not in df.columns:
+            raise KeyError(
+                "Input is missing the required hgvs column '{}'.".format(
+                    self.hgvs_column
                 )
+            )
 
-            df.index = df[self.hgvs_column]
-            return df
+        df.index = df[self.hgvs_column]
+        return df
 
     def parse_row(self, row):
         """
@@ -359,7 +441,13 @@ class Enrich2(base.BaseProgram):
             else:
                 return variant, variant
 
-        variant = apply_offset(variant, self.offset, enrich2=self)
+        variant = apply_offset(
+            variant,
+            self.offset,
+            enrich2=self,
+            validate_nt=not self._bulk_validation,
+            validate_protein=not (self._bulk_validation and self.is_coding),
+        )
 
         is_mixed = any([len(v.strip().split(" ")) == 2 for v in variant.split(",")])
         is_nt_only = all([v.strip()[0] in "cngmo" for v in variant.split(",")])
@@ -378,6 +466,81 @@ class Enrich2(base.BaseProgram):
                 "Could not infer type of HGVS string from '{}'.".format(variant)
             )  # pragma: no cover
 
+    def reference_errors(self, nt_protein_tups):
+        """
+        Validates the offset variants of a data frame parsed by `parse_row`
+        against the wild-type sequence, making one call for the nucleotide
+        variants and, for coding datasets, one for the protein variants.
+
+        Parameters
+        ----------
+        nt_protein_tups : list[tuple[str, str]]
+            Nucleotide and protein variant of each row.
+
+        Returns
+        -------
+        `pd.Series`
+            The first error of each failing row, indexed by the position of
+            the row in `nt_protein_tups`.
+        """
+        nt_rows = [i for i, (nt, _) in enumerate(nt_protein_tups) if nt is not None]
+        nt_errors = self.wt_sequence_errors([nt_protein_tups[i][0] for i in nt_rows])
+        errors = {i: e for i, e in zip(nt_rows, nt_errors) if e is not None}
+
+        if self.is_coding:
+            hgvs_pro = pd.Series([pro for _, pro in nt_protein_tups], dtype=object)
+            for i, error in self.protein_reference_errors(hgvs_pro).items():
+                errors.setdefault(i, error)
+        return pd.Series(
+            [errors[i] for i in sorted(errors)], index=sorted(errors), dtype=object
+        )
+
+    def preflight_rows(self, df):
+        return list(df.index)
+
+    def resolve_offset(self, df):
+        """
+        Infers the offset from the reference bases of a sample of the
+        variants indexing `df` if the offset is 'auto', scoring every
+        candidate offset against the wild-type sequence. Reference amino
+        acids of protein only variants are compared when coding.
+
+        Raises
+        ------
+        ValueError
+            If no offset matches the sampled references with confidence.
+        """
+        if not self.offset_pending:
+            return
+        with profiling.stage("infer_offset") as stage:
+            variants = np.asarray(df.index, dtype=object)
+            sample, _ = preflight.sample_rows(variants)
+            stage.rows = len(sample)
+            variants = variants[sample]
+            nt_rows, nt_positions, nt_refs = reference.extract_nucleotide_events(
+                variants
+            )
+            # Protein positions of mixed variants are inferred from their
+            # nucleotide events so only protein only variants are compared.
+            protein_only = np.ones(len(variants), dtype=bool)
+            protein_only[nt_rows] = False
+            _, aa_positions, aa_refs = reference.extract_protein_events(
+                variants[protein_only]
+            )
+            estimate = offsets.infer_offset(
+                self.wt_index,
+                nt_positions,
+                nt_refs,
+                aa_positions,
+                aa_refs,
+                is_coding=self.is_coding,
+            )
+        estimate.check()
+        logger.info("Inferred the offset from the input. {}".format(estimate.summary()))
+        self.offset = estimate.offset
+        self.offset_pending = False
+        return estimate
+
     def parse_tsv_input(self, df):
         """
         Convert all score and count data frames in the Enrich2 TSV file
@@ -385,9 +548,7 @@ class Enrich2(base.BaseProgram):
         """
         mave_df = self.convert_h5_df(df, element=None, df_type=self.input_type)
         fname = "mavedb_{}.csv".format(self.src_filename)
-        filepath = os.path.normpath(os.path.join(self.output_directory, fname))
-        logger.info("Writting file to {}.".format(filepath))
-        mave_df.to_csv(filepath, sep=",", index=None, na_rep=np.NaN)
+        self.write_output(mave_df, self.output_path(fname), df_type=self.input_type)
         return mave_df
 
     def parse_input(self, store):
@@ -413,28 +574,50 @@ class Enrich2(base.BaseProgram):
         else:
             raise ValueError("unable to find variants data in HDF5")
 
+        preflighted = False
         for element in elements:
-            rep_condition_dfs = get_replicate_score_dataframes(store, element)
+            with profiling.stage("load_input_file"):
+                rep_condition_dfs = get_replicate_score_dataframes(store, element)
             for cnd, score_df in rep_condition_dfs.items():
-                count_df = get_count_dataframe_by_condition(
-                    store, cnd, element, score_df.index
-                )
+                score_df = self.select_shard(score_df)
+                # Every table is parsed with the same settings so sampling the
+                # first is enough to check the configuration.
+                if not preflighted:
+                    self.resolve_offset(score_df)
+                    self.run_preflight(score_df)
+                    preflighted = True
+                with profiling.stage("load_input_file", rows=len(score_df)):
+                    count_df = get_count_dataframe_by_condition(
+                        store, cnd, element, score_df.index
+                    )
 
                 mave_scores_df = self.convert_h5_df(
                     df=score_df, element=element, df_type=constants.score_type, cnd=cnd
                 )
                 assert_index_equal(score_df.index, count_df.index)
+                # Counts define the same variants as the scores so both frames
+                # share one dictionary of HGVS strings.
                 mave_counts_df = self.convert_h5_df(
-                    df=count_df, element=element, df_type=constants.count_type, cnd=cnd
+                    df=count_df,
+                    element=element,
+                    df_type=constants.count_type,
+                    cnd=cnd,
+                    hgvs_dtypes=utilities.hgvs_dtypes(mave_scores_df),
                 )
 
                 # This step checks both df define the same variants
-                mave_scores_df, mave_counts_df = drop_null(
-                    mave_scores_df, mave_counts_df
-                )
-                validators.validate_datasets_define_same_variants(
-                    mave_scores_df, mave_counts_df
-                )
+                with profiling.stage("filters", rows=len(mave_scores_df)):
+                    mave_scores_df, mave_counts_df = drop_null(
+                        mave_scores_df,
+                        mave_counts_df,
+                        drop_columns=self.shard is None,
+                    )
+                with profiling.stage(
+                    "validate_mavedb_compliance", rows=len(mave_scores_df)
+                ):
+                    validators.validate_datasets_define_same_variants(
+                        mave_scores_df, mave_counts_df
+                    )
 
                 # If we have reached this point, all validators have passed.
                 # Write to file if so.
@@ -444,8 +627,12 @@ class Enrich2(base.BaseProgram):
                     df_type=constants.score_type,
                     cnd=cnd,
                 )
-                mave_scores_df.to_csv(
-                    score_filepath, sep=",", index=None, na_rep=np.NaN
+                group = "{}/{}".format(element, cnd)
+                self.write_output(
+                    mave_scores_df,
+                    score_filepath,
+                    df_type=constants.score_type,
+                    group=group,
                 )
 
                 count_filepath = self.convert_h5_filepath(
@@ -454,8 +641,11 @@ class Enrich2(base.BaseProgram):
                     df_type=constants.count_type,
                     cnd=cnd,
                 )
-                mave_counts_df.to_csv(
-                    count_filepath, sep=",", index=None, na_rep=np.NaN
+                self.write_output(
+                    mave_counts_df,
+                    count_filepath,
+                    df_type=constants.count_type,
+                    group=group,
                 )
         store.close()
 
@@ -469,35 +659,109 @@ class Enrich2(base.BaseProgram):
 
             `<dst>/mavedb_<basename>_<counts|scores>_<element>_<condition>.csv`
 
-        All spaces in the file name (but NOT the destination path name) are
+        followed by '.gz' or '.zst' if outputs are compressed. All spaces in the file name (but NOT the destination path name) are
         replaced by underscores.
         """
         filename = "mavedb_{}_{}_{}_{}.csv".format(basename, element, df_type, cnd)
         filename = re.sub(r"\s+", "_", filename)
-        filepath = os.path.normpath(os.path.join(self.output_directory, filename))
+        filepath = self.output_path(filename)
         logger.info(
             self.LOG_MSG.format(elem=element, df_type="scores", cnd=cnd, path=filepath)
         )
         return filepath
 
-    def convert_h5_df(self, df, element, df_type, cnd=None):
+    def convert_h5_df(self, df, element, df_type, cnd=None, hgvs_dtypes=None):
         """
         Creates and outputs a mavedb data frame based on the data frame `df`
-        that was extracted from an Enrich2 HDF5 file.
+        that was extracted from an Enrich2 HDF5 file. The hgvs columns are
+        categorical, reusing the categories in `hgvs_dtypes` if given, see
+        `utilities.hgvs_categorical`.
         """
+        self.resolve_offset(df)
+        cached = {}
+        if self.variant_cache is not None:
+            context = self.variant_context
+            with profiling.stage("variant_cache_lookup", rows=len(df.index)):
+                cached = self.variant_cache.lookup(
+                    context, element, map(str, df.index)
+                )
+            logger.info(
+                "Found {} of {} variants in the variant cache.".format(
+                    len(cached), len(df.index)
+                )
+            )
+
         variants = tqdm(df.index, desc="Parsing variants", total=len(df.index))
         nt_protein_tups = []
         invalid_rows = []
         invalid_reasons = []
         valid_rows = []
-        for v in variants:
-            try:
-                nt_protein_tups.append(self.parse_row((v, element)))
-                valid_rows.append(v)
-            except Exception as e:
-                invalid_rows.append(v)
-                invalid_reasons.append(str(e))
-                logger.warning("Could not parse row '{}'. Reason: {}".format(v, str(e)))
+        parsed = {}
+        # Variants are validated against the wild-type sequence in bulk
+        # below rather than per row.
+        self._bulk_validation = True
+        try:
+            with profiling.stage("parse_variants", rows=len(df.index)):
+                for v in variants:
+                    key = str(v)
+                    if key in cached:
+                        nt, pro, error = cached[key]
+                    else:
+                        try:
+                            (nt, pro), error = self.parse_row((v, element)), None
+                        except exceptions.VariantError as e:
+                            e.row = key
+                            nt, pro, error = None, None, e
+                        except Exception as e:
+                            nt, pro, error = None, None, str(e)
+                        cached[key] = parsed[key] = (nt, pro, error)
+                    if error is None:
+                        nt_protein_tups.append((nt, pro))
+                        valid_rows.append(v)
+                        self.error_policy.record()
+                    else:
+                        invalid_rows.append(v)
+                        invalid_reasons.append(error)
+                        self.error_policy.record(errors=1, error=error)
+        finally:
+            self._bulk_validation = False
+        if nt_protein_tups:
+            with profiling.stage("validate_variants", rows=len(nt_protein_tups)):
+                reference_errors = self.reference_errors(nt_protein_tups)
+            for i, error in reference_errors.items():
+                error.row = key = str(valid_rows[i])
+                invalid_rows.append(valid_rows[i])
+                invalid_reasons.append(error)
+                if key in parsed:
+                    parsed[key] = (None, None, error)
+            if len(reference_errors):
+                self.error_policy.record(
+                    rows=0,
+                    errors=len(reference_errors),
+                    error=reference_errors.iloc[-1],
+                )
+                failing = set(reference_errors.index)
+                keep = [i for i in range(len(valid_rows)) if i not in failing]
+                valid_rows = [valid_rows[i] for i in keep]
+                nt_protein_tups = [nt_protein_tups[i] for i in keep]
+        if self.variant_cache is not None:
+            with profiling.stage("variant_cache_store", rows=len(parsed)):
+                self.variant_cache.store(
+                    context,
+                    element,
+                    {
+                        key: (nt, pro, None if error is None else str(error))
+                        for key, (nt, pro, error) in parsed.items()
+                    },
+                )
+
+        report.record_dataset(
+            element=element,
+            condition=cnd,
+            df_type=df_type,
+            parsed=len(df.index),
+            invalid=len(invalid_rows),
+        )
 
         if invalid_rows:
             # open bin file
@@ -513,20 +777,25 @@ class Enrich2(base.BaseProgram):
                 # TODO: this filename should also be formatted in an informative way
                 fname = "{}_invalid_rows.csv".format(self.src_filename)
 
-            fpath = os.path.join(self.output_directory, fname)
-            logger.info("Writing invalid rows to {}".format(fpath))
-            invalid = df.loc[invalid_rows, :]
-            invalid["error_description"] = invalid_reasons
-            invalid.to_csv(fpath, sep=",", na_rep=np.NaN)
+            self.write_invalid_rows(df.loc[invalid_rows, :], invalid_reasons, fname)
 
+        # Streamed input is checked once after the last chunk by
+        # `convert_stream`, so a chunk without valid rows is skipped.
+        if not self.streaming:
+            self.error_policy.check(final=True)
         if not nt_protein_tups:
+            if self.streaming:
+                return pd.DataFrame(columns=constants.variant_columns)
             raise ValueError("Could not parse any variants. Aborting.")
 
         # TODO: refactor this bit
         df = df.loc[valid_rows, :]
+        hgvs_dtypes = hgvs_dtypes or {}
         data = {
-            constants.nt_variant_col: [tup[0] for tup in nt_protein_tups],
-            constants.pro_variant_col: [tup[1] for tup in nt_protein_tups],
+            column: utilities.hgvs_categorical(
+                [tup[i] for tup in nt_protein_tups], hgvs_dtypes.get(column)
+            )
+            for i, column in enumerate(constants.variant_columns)
         }
         columns = list(constants.variant_columns)
         for column in df.columns:
@@ -548,7 +817,8 @@ class Enrich2(base.BaseProgram):
 
         mave_df = pd.DataFrame(data=data, columns=columns, index=df.index)
         logger.info("Running MaveDB compliance validation.")
-        validators.validate_mavedb_compliance(mave_df, df_type)
+        with profiling.stage("validate_mavedb_compliance", rows=len(mave_df)):
+            validators.validate_mavedb_compliance(mave_df, df_type)
         return mave_df
 
     def parse_mixed_variant(self, variant, element=None):
@@ -649,35 +919,41 @@ class Enrich2(base.BaseProgram):
         # Enrich2 uses 1-based positions
         for v in codon_variants:
             if v.position > len(self.wt_sequence):
-                raise IndexError(
-                    "Error inferring corrected synonymous syntax. Coordinate "
-                    "{pos} (1-based) is out of bounds in {hgvs}. The maximum "
-                    "1-based index of the wild-type sequence "
-                    "(offset {offset}) is {idx} (length {len_}).".format(
-                        hgvs=str(v),
-                        pos=v.position,
-                        offset=self.offset,
-                        idx=len(self.wt_sequence),
-                        len_=len(self.wt_sequence),
-                    )
+                raise exceptions.PositionOutOfBoundsError(
+                    variant=str(v),
+                    row=variant,
+                    sequence=self.wt_sequence,
+                    index=v.position - 1,
+                    template=(
+                        "Error inferring corrected synonymous syntax. Coordinate "
+                        "{position} (1-based) is out of bounds in {variant}. The "
+                        "maximum 1-based index of the wild-type sequence "
+                        "(offset {offset}) is {length} (length {length})."
+                    ),
+                    position=v.position,
+                    offset=self.offset,
+                    length=len(self.wt_sequence),
                 )
 
             if v.silent:
                 v.ref = self.wt_sequence[v.position - 1]
                 v.alt = self.wt_sequence[v.position - 1]
             elif not v.silent and self.wt_sequence[v.position - 1] != v.ref:
-                raise ValueError(
-                    "Error inferring corrected synonymous syntax. "
-                    "Base '{base}' at position {pos} (1-based) "
-                    "in the wild-type sequence (offset {offset}) does not "
-                    "match the base suggested by variant '{variant}' in "
-                    "row '{row}'.".format(
-                        pos=v.position,
-                        base=self.wt_sequence[v.position - 1],
-                        offset=self.offset,
-                        variant=str(v),
-                        row=variant,
-                    )
+                raise exceptions.ReferenceMismatchError(
+                    variant=str(v),
+                    row=variant,
+                    sequence=self.wt_sequence,
+                    index=v.position - 1,
+                    template=(
+                        "Error inferring corrected synonymous syntax. "
+                        "Base '{wt}' at position {position} (1-based) "
+                        "in the wild-type sequence (offset {offset}) does not "
+                        "match the base suggested by variant '{variant}' in "
+                        "row '{row}'."
+                    ),
+                    wt=self.wt_sequence[v.position - 1],
+                    position=v.position,
+                    offset=self.offset,
                 )
 
         # aa_pos is returned as 1-based.
@@ -43,3 +43,166 @@ class InvalidVariantType(Exception):
     Throw exception when a specific type of event is expected (sub, del, etc)
     but not found.
     """
+
+
+# Number of sequence characters shown either side of the offending position
+# when an error message includes wild-type context.
+CONTEXT_WIDTH = 10
+
+
+def sequence_context(sequence, index, width=CONTEXT_WIDTH):
+    """
+    Returns the characters of `sequence` within `width` of the zero-based
+    `index`, with the character at `index` in brackets and elided ends
+    marked with '...'. Out of bounds indices show the nearest end.
+    """
+    index = min(max(index, -1), len(sequence))
+    start = max(index - width, 0)
+    stop = min(index + width + 1, len(sequence))
+    context = "{}[{}]{}".format(
+        sequence[start : max(index, 0)],
+        sequence[index] if 0 <= index < len(sequence) else "",
+        sequence[index + 1 : stop],
+    )
+    return "{}{}{}".format(
+        "..." if start > 0 else "", context, "..." if stop < len(sequence) else ""
+    )
+
+
+class VariantError(Exception):
+    """
+    Structured error for a variant that could not be converted. The error
+    stores a `code` identifying its kind, the `row` and `variant` it was
+    raised for and a few small `fields`. The message is only rendered from
+    `template` when the error is converted to a string, and wild-type
+    context is limited to a window around the offending position.
+
+    Parameters
+    ----------
+    variant : str, optional.
+        The offending variant or event.
+
+    row : str, optional.
+        The input row the variant was parsed from.
+
+    sequence : str, optional.
+        Wild-type sequence the variant was validated against. Only a
+        reference is kept.
+
+    index : int, optional.
+        Zero-based offending position in `sequence`.
+
+    template : str, optional.
+        Overrides the class `template` for errors raised in a specific
+        context.
+
+    fields : dict
+        Values used to render `template`.
+    """
+
+    code = "invalid_variant"
+    template = "Variant '{variant}' is invalid."
+
+    def __init__(
+        self, variant=None, row=None, sequence=None, index=None, template=None, **fields
+    ):
+        super().__init__()
+        if template is not None:
+            self.template = template
+        self.variant = variant
+        self.row = row
+        self.sequence = sequence
+        self.index = index
+        self.fields = fields
+
+    def render(self, width=CONTEXT_WIDTH):
+        message = self.template.format(
+            variant=self.variant, row=self.row, **self.fields
+        )
+        if self.sequence is not None and self.index is not None:
+            message = "{} Wild-type context: '{}'.".format(
+                message, sequence_context(self.sequence, self.index, width)
+            )
+        return message
+
+    def to_record(self):
+        """Returns the error as a flat dictionary without the sequence."""
+        record = {"code": self.code, "row": self.row, "variant": self.variant}
+        record.update(self.fields)
+        return record
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join("{}={!r}".format(k, v) for k, v in self.to_record().items()),
+        )
+
+
+class ReferenceMismatchError(VariantError, ValueError):
+    """
+    Thrown when the reference base or amino acid of a variant does not
+    match the wild-type sequence.
+    """
+
+    code = "reference_mismatch"
+    template = (
+        "Reference {unit} '{wt}' at 1-based position {position} in the "
+        "{sequence_name} does not match the reference {unit} '{ref}' "
+        "suggested in variant '{variant}'."
+    )
+
+
+class PositionOutOfBoundsError(VariantError, IndexError):
+    """
+    Thrown when the position of a variant lies beyond the end of the
+    wild-type sequence.
+    """
+
+    code = "position_out_of_bounds"
+    template = (
+        "Position {position} in {variant} extends beyond the maximum index "
+        "{max_index} in the {sequence_name} with length {length}."
+    )
+
+
+class NegativePositionError(VariantError, IndexError):
+    """
+    Thrown when the position of a variant is negative, usually because
+    positions are not one-based or the offset is wrong.
+    """
+
+    code = "negative_position"
+    template = (
+        "Encountered a negative position in {variant}. "
+        "Positions might not be one-based."
+    )
+
+
+class InvalidPositionError(VariantError, ValueError):
+    """
+    Thrown when the position of a protein variant is less than 1.
+    """
+
+    code = "invalid_position"
+    template = "Position {position} in {variant} must be 1 or greater."
+
+
+class ErrorBudgetExceeded(ValueError):
+    """
+    Thrown when more rows fail to parse than the error policy of a
+    conversion allows.
+    """
+
+    pass
+
+
+class PreflightError(ValueError):
+    """
+    Thrown when the rows sampled before a conversion suggest the wild-type
+    sequence, offset or coordinate base do not match the input.
+    """
+
+    pass
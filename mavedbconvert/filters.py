@@ -2,7 +2,7 @@ import logging
 
 import numpy as np
 
-from . import LOGGER, constants, utilities
+from . import LOGGER, constants, utilities, report
 
 
 logger = logging.getLogger(LOGGER)
@@ -16,15 +16,11 @@ def drop_na_columns(df):
     has_pro_col = constants.pro_variant_col in df.columns
 
     if has_nt_col:
-        nt_all_null = np.all(
-            df.loc[:, constants.nt_variant_col].apply(utilities.is_null)
-        )
+        nt_all_null = np.all(utilities.null_mask(df.loc[:, constants.nt_variant_col]))
         if nt_all_null:
             df.drop(columns=[constants.nt_variant_col], inplace=True)
     if has_pro_col:
-        pro_all_null = np.all(
-            df.loc[:, constants.pro_variant_col].apply(utilities.is_null)
-        )
+        pro_all_null = np.all(utilities.null_mask(df.loc[:, constants.pro_variant_col]))
         if pro_all_null:
             df.drop(columns=[constants.pro_variant_col], inplace=True)
 
@@ -39,6 +35,7 @@ def drop_na_columns(df):
             to_drop.append(cname)
     if len(to_drop) > 0:
         df.drop(columns=to_drop, inplace=True)
+        report.count("columns_dropped_na", len(to_drop))
 
     return df
 
@@ -54,5 +51,6 @@ def drop_na_rows(df):
             "Dropping {} rows that contain all null values".format(sum(null_rows))
         )
         df.drop(index=df.index[null_rows], inplace=True)
+        report.count("rows_dropped_na", int(sum(null_rows)))
 
     return df
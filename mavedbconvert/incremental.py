@@ -0,0 +1,150 @@
+import os
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from . import LOGGER, __version__, constants, report
+
+
+logger = logging.getLogger(LOGGER)
+
+
+__all__ = ["row_hashes", "load_rows", "save_rows", "parse_rows", "rows_path"]
+
+
+# Extension of the file storing the parsed rows next to an output file.
+ROWS_EXTENSION = ".rows"
+
+HASH_COLUMN = "row_hash"
+
+
+def rows_path(output_file):
+    """Returns the path of the parsed rows stored for `output_file`."""
+    return output_file + ROWS_EXTENSION
+
+
+def row_hashes(df, columns, context):
+    """
+    Hashes the values of `columns` in each row of `df` together with
+    `context`, a string describing the settings rows are parsed with.
+
+    Returns
+    -------
+    `np.ndarray`
+        A 64-bit hash for each row.
+    """
+    hash_key = hashlib.md5(
+        "{}:{}:{}".format(context, __version__, list(columns)).encode()
+    ).hexdigest()[:16]
+    return pd.util.hash_pandas_object(
+        df.loc[:, list(columns)], index=False, hash_key=hash_key
+    ).to_numpy()
+
+
+def load_rows(path):
+    """
+    Loads rows stored by `save_rows`.
+
+    Returns
+    -------
+    `pd.DataFrame`, optional.
+        The `hgvs_nt` and `hgvs_pro` columns indexed by row hash, or `None`
+        if `path` does not exist or cannot be read.
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        rows = pd.read_csv(
+            path,
+            dtype={
+                HASH_COLUMN: np.uint64,
+                constants.nt_variant_col: object,
+                constants.pro_variant_col: object,
+            },
+            keep_default_na=False,
+            na_values=[""],
+        )
+    except (ValueError, pd.errors.ParserError) as e:
+        logger.warning("Ignoring unreadable parsed rows file {}: {}".format(path, e))
+        return None
+    rows = rows.drop_duplicates(HASH_COLUMN).set_index(HASH_COLUMN)
+    return rows.where(rows.notna(), None)
+
+
+def save_rows(path, hashes, nt_variants, pro_variants):
+    """
+    Stores the parsed `nt_variants` and `pro_variants` of the rows with
+    `hashes`. Rows without either variant could not be parsed and are not
+    stored, so they are parsed again by the next conversion.
+    """
+    rows = pd.DataFrame(
+        {
+            HASH_COLUMN: hashes,
+            constants.nt_variant_col: nt_variants,
+            constants.pro_variant_col: pro_variants,
+        }
+    )
+    parsed = rows[[constants.nt_variant_col, constants.pro_variant_col]].notna()
+    rows[parsed.any(axis=1)].to_csv(path, index=False, na_rep="")
+
+
+def parse_rows(df, columns, parse, path, context):
+    """
+    Parses the variants of each row of `df` with `parse`, reusing the results
+    stored at `path` by a previous conversion for rows whose `columns` are
+    unchanged. The results of the conversion are then stored at `path`.
+
+    Parameters
+    ----------
+    df : `pd.DataFrame`
+        Input rows.
+
+    columns : list[str]
+        Columns of `df` the variants are parsed from.
+
+    parse : Callable[[`pd.DataFrame`], tuple[list, list]]
+        Parses the rows of a dataframe, returning the `hgvs_nt` and
+        `hgvs_pro` variants of each row.
+
+    path : str
+        File storing the parsed rows.
+
+    context : str
+        Settings the rows are parsed with, eg the wild-type sequence and
+        offset. Stored rows parsed with other settings are not reused.
+
+    Returns
+    -------
+    tuple[list, list]
+        The `hgvs_nt` and `hgvs_pro` variants of each row.
+    """
+    hashes = row_hashes(df, columns, context)
+    stored = load_rows(path)
+    if stored is None:
+        reused = np.zeros(len(df), dtype=bool)
+    else:
+        reused = np.isin(hashes, stored.index.to_numpy())
+
+    nt_variants = np.empty(len(df), dtype=object)
+    pro_variants = np.empty(len(df), dtype=object)
+    if reused.any():
+        known = stored.loc[hashes[reused]]
+        nt_variants[reused] = known[constants.nt_variant_col].to_numpy()
+        pro_variants[reused] = known[constants.pro_variant_col].to_numpy()
+
+    n_reused = int(reused.sum())
+    logger.info(
+        "Reusing {} of {} previously parsed rows. Parsing {} new or "
+        "changed rows.".format(n_reused, len(df), len(df) - n_reused)
+    )
+    report.count("rows_reused", n_reused)
+    if n_reused < len(df):
+        parsed_nt, parsed_pro = parse(df.loc[~reused])
+        nt_variants[~reused] = list(parsed_nt)
+        pro_variants[~reused] = list(parsed_pro)
+
+    nt_variants, pro_variants = list(nt_variants), list(pro_variants)
+    save_rows(path, hashes, nt_variants, pro_variants)
+    return nt_variants, pro_variants
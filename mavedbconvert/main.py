@@ -11,10 +11,28 @@ numeric where NaN values must be encoded using 'NaN', 'Na', 'None', 'N/A',
 
 All outputs are in 1-based coordinates.
 
+Large inputs can be converted in parallel, eg on the nodes of a cluster, by
+running each of N shards with '--shard=i/N'. Each shard writes partial outputs
+named 'mavedb_*.shard-i-of-N.*' and a 'mavedb_*.shard-i-of-N.json' metadata
+file. Once every shard has finished, 'mavedbconvert merge' combines the
+partial outputs listed by the metadata files and validates the merged result.
+
+Use '-' as <src> to read a TSV file from stdin and write the converted rows to
+stdout in chunks, for example in a pipeline with gzip. Compressed input files
+and streams are decompressed automatically. Log messages are written
+to stderr when streaming.
+
 Usage:
   mavedbconvert enrich2 <src> [--dst=D] [--wtseq=W] [--offset=O] [--hgvs-column=A] [--input-type=T] [--skip-header=H] [--skip-footer=H] [--non-coding]
-  mavedbconvert enrich <src> [--dst=D] [--wtseq=W] [--offset=O]  [--score-column=C] [--input-type=T] [--sheet-name=S] [--skip-header=H] [--skip-footer=H]
-  mavedbconvert empiric <src> [--dst=D] [--wtseq=W] [--offset=O] [--zero-based] [--score-column=C] [--input-type=T] [--sheet-name=S] [--skip-header=H] [--skip-footer=H]
+        [--csv-engine=E] [--compress=Z] [--output-format=F] [--no-cache] [--variant-cache]
+        [--shard=S] [--errors=E] [--no-preflight] [--profile] [--profile-stats=P] [--report=R]
+  mavedbconvert enrich <src> [--dst=D] [--wtseq=W] [--offset=O] [--detect-base] [--score-column=C] [--input-type=T] [--sheet-name=S] [--skip-header=H] [--skip-footer=H]
+        [--csv-engine=E] [--compress=Z] [--output-format=F] [--no-cache] [--incremental]
+        [--shard=S] [--errors=E] [--no-preflight] [--all-sheets] [--n-jobs=J] [--profile] [--profile-stats=P] [--report=R]
+  mavedbconvert empiric <src> [--dst=D] [--wtseq=W] [--offset=O] [--zero-based | --detect-base] [--score-column=C] [--input-type=T] [--sheet-name=S] [--skip-header=H] [--skip-footer=H]
+        [--csv-engine=E] [--compress=Z] [--output-format=F] [--no-cache] [--incremental]
+        [--shard=S] [--errors=E] [--no-preflight] [--all-sheets] [--n-jobs=J] [--profile] [--profile-stats=P] [--report=R]
+  mavedbconvert merge <metadata>... [--dst=D]
   mavedbconvert -h | --help
   mavedbconvert --version
   
@@ -27,7 +45,11 @@ Options:
   <program>         The program the input was generated from.
                     Currently supports enrich, enrich2 and empiric.
 
-  <src>             Path to input file to convert to MaveDB format.
+  <metadata>        Metadata files written by every shard of a sharded
+                    conversion, eg 'out/mavedb_scores.shard-*.json'.
+
+  <src>             Path to input file to convert to MaveDB format. Use '-'
+                    to stream a TSV file from stdin to stdout.
 
   -d --dst=D        Directory to save the output file to. An attempt will be
                     made to create the directory tree and check write access.
@@ -45,6 +67,15 @@ Options:
   --offset=O        Value to subtract from reported Enrich2 nucleotide positions.
                     For Enrich/EMPIRIC this value should be a multiple of 3 so
                     it can be subtracted from the reported codon positions.
+                    Use 'auto' to infer the offset from a sample of rows.
+                    Enrich2 reference bases are matched against the
+                    wild-type sequence for every candidate offset. Enrich
+                    and EMPIRIC inputs only list mutant residues, so each
+                    candidate codon offset is scored by how far their
+                    agreement with the wild-type deviates from chance; this
+                    needs several hundred rows, assumes the base set by
+                    --zero-based and cannot be combined with --detect-base.
+                    The conversion stops if no offset is clearly favoured.
                     [default: 0]
                     
   --input-type=T    Type of input. Can be either 'counts' or 'scores'.
@@ -68,41 +99,192 @@ Options:
                     one-based coordinates. Ignored for Enrich and Enrich2
                     [default: False]
                     
+  --detect-base     Infer whether the positions of an Enrich or EMPIRIC
+                    input are zero-based or one-based. A sample of rows is
+                    compared against the translated wild-type sequence with
+                    positions read in both bases, and the conversion stops
+                    if neither base is clearly favoured. Cannot be combined
+                    with --offset auto. [default: False]
+
   --non-coding      Set Enrich2 input file specifies non-coding HGVS syntax.
                     [default: False]
+
+  --csv-engine=E    Engine used to read TSV/CSV files. Either 'c' for the
+                    pandas parser or 'pyarrow' for the multithreaded pyarrow
+                    reader, which skips footer rows without falling back to
+                    the slower python parser. Requires pyarrow.
+                    [default: c]
+
+  --compress=Z      Compress output files with 'gzip' or 'zstd', writing
+                    mavedb_*.csv.gz or mavedb_*.csv.zst files. zstd uses one
+                    compression thread per CPU and requires zstandard.
+                    Compressed inputs (gzip, zstd, bz2, xz) are detected
+                    automatically. [default: None]
+
+  --output-format=F Comma separated formats to write outputs in. Any of csv,
+                    parquet and feather. Parquet and Feather outputs keep
+                    column dtypes, dictionary encode the hgvs columns and
+                    require pyarrow. [default: csv]
+
+  --shard=S         Convert the i-th of N slices of the input, given as
+                    'i/N' with i from 1 to N. Shards convert contiguous row
+                    ranges of TSV and Excel inputs, or of each Enrich2 HDF5
+                    dataset. Not supported when streaming or with
+                    --all-sheets. [default: None]
+
+  --errors=E        What to do with rows that cannot be parsed. 'fail'
+                    aborts at the first invalid row and 'collect' writes
+                    every invalid row to an invalid rows file. A number
+                    such as 100 aborts once more rows are invalid and a
+                    percentage such as 5% aborts once a larger fraction of
+                    rows is invalid, checked after the first 1000 rows and
+                    at the end of the input. Defaults to 'collect' for
+                    Enrich2 and 'fail' otherwise. [default: None]
+
+  --no-preflight    Skip parsing a sample of rows spread across positions
+                    before converting the whole input. The preflight logs
+                    the expected invalid rate and the most common errors,
+                    and refuses to continue when most sampled rows do not
+                    match the wild-type sequence, offset or coordinate
+                    base. Inputs of 2000 rows or fewer are not sampled.
+                    [default: False]
+
+  --incremental     Reuse the variants parsed by the previous conversion to
+                    the same output file. A hash of the variant columns of
+                    each row is stored next to the output, in a file ending
+                    in '.rows', and only new or changed rows are parsed on
+                    later runs. Scores, filters and MaveDB validation are
+                    always recomputed from the whole input. Enrich and
+                    EMPIRIC only. [default: False]
+
+  --all-sheets      Convert every sheet of an Excel file in parallel, writing
+                    one output file per sheet named after the input file and
+                    the sheet. Sheets that fail are reported once the others
+                    have been converted. Enrich and EMPIRIC only.
+                    [default: False]
+
+  --n-jobs=J        Number of workers used by --all-sheets. Use -1 for one
+                    worker per CPU. [default: -1]
+
+  --no-cache        Convert the input even if it was converted before with
+                    the same options. Outputs are otherwise cached in
+                    ~/.mavedb_convert/cache, keyed on the contents of the
+                    input file, the options and the mavedbconvert version,
+                    and restored on later runs. The least recently used
+                    outputs are evicted once the cache exceeds 1 GiB.
+                    Streamed and --all-sheets conversions are not cached.
+                    [default: False]
+
+  --variant-cache   Look up parsed Enrich2 variants in a cache shared across
+                    runs, ~/.mavedb_convert/variants.sqlite, and add newly
+                    parsed variants to it. Variants are cached by wild-type
+                    sequence, offset, coding flag and element table, so
+                    experiments sharing a wild-type reuse each other's
+                    results. Enrich2 only. [default: False]
+
+  --profile         Print wall time, CPU time, rows/second and peak memory
+                    for each conversion stage to stderr. [default: False]
+
+  --profile-stats=P Also write cProfile statistics to this path. The pstats
+                    format can be read by flamegraph tools such as flameprof
+                    or snakeviz. Implies --profile. [default: None]
+
+  --report=R        Write a JSON run report to this path with the input size,
+                    rows parsed, valid, invalid and dropped, the Enrich2
+                    element/condition breakdown, stage timings, throughput
+                    and peak memory. Use '-' to write to stderr.
+                    [default: None]
 """
 import sys
 import docopt
 import logging
+from contextlib import ExitStack
 
-from . import enrich, enrich2, empiric, constants, LOGGER, parsers
+from . import (
+    enrich,
+    enrich2,
+    empiric,
+    constants,
+    LOGGER,
+    LOG_LISTENER,
+    __version__,
+    cache,
+    parsers,
+    profiling,
+    report,
+    sharding,
+)
 
 
 logger = logging.getLogger(LOGGER)
 
 
+PROGRAMS = {
+    "enrich": enrich.Enrich,
+    "enrich2": enrich2.Enrich2,
+    "empiric": empiric.Empiric,
+}
+
+
 def parse_args(docopt_args=None):
     if docopt_args is None:
-        docopt_args = docopt.docopt(__doc__, version="0.4.0-alpha")
-    return parsers.parse_docopt(docopt_args)
+        docopt_args = docopt.docopt(__doc__, version=__version__)
+    program, kwargs = parsers.parse_docopt(docopt_args)
+    return program, kwargs, parsers.parse_run_options(docopt_args)
+
+
+def log_to_stderr():
+    """Moves console log output off stdout so it can carry streamed rows."""
+    handlers = logging.getLogger(LOGGER).handlers + list(LOG_LISTENER.handlers)
+    for handler in handlers:
+        if getattr(handler, "stream", None) is sys.stdout:
+            handler.setStream(sys.stderr)
+
+
+def merge(docopt_args):
+    """Merges the outputs of a sharded conversion."""
+    sharding.merge(
+        docopt_args["<metadata>"], dst=parsers.parse_dst(docopt_args.get("--dst"))
+    )
 
 
 def main():
     try:
-        program, kwargs = parse_args()
-        if program == "enrich":
-            enrich.Enrich(**kwargs).convert()
-        elif program == "enrich2":
-            enrich2.Enrich2(**kwargs).convert()
-        elif program == "empiric":
-            empiric.Empiric(**kwargs).convert()
-        else:
-            logger.error(
-                "Supported programs are {}".format(
-                    ", ".join(constants.supported_programs)
+        docopt_args = docopt.docopt(__doc__, version=__version__)
+        if docopt_args.get("merge"):
+            return merge(docopt_args)
+        program, kwargs, options = parse_args(docopt_args)
+        if kwargs["src"] == constants.STREAM_SRC:
+            log_to_stderr()
+        with ExitStack() as stack:
+            profiler = None
+            if options["profile"]:
+                profiler = stack.enter_context(
+                    profiling.profile(stats_path=options["profile_stats"])
+                )
+            if options["report"]:
+                stack.enter_context(
+                    report.run_report(
+                        options["report"], program=program, src=kwargs["src"]
+                    )
+                )
+            if options["all_sheets"] and program in ("enrich", "empiric"):
+                PROGRAMS[program](**kwargs).convert_all_sheets(n_jobs=options["n_jobs"])
+            elif program in PROGRAMS:
+                converter = PROGRAMS[program](**kwargs)
+                if options["cache"] and not converter.streaming:
+                    cache.cached_convert(converter, cache.cache_key(program, kwargs))
+                else:
+                    converter.convert()
+            else:
+                logger.error(
+                    "Supported programs are {}".format(
+                        ", ".join(constants.supported_programs)
+                    )
                 )
-            )
-            sys.exit()
+                sys.exit()
+        if profiler is not None:
+            print(profiler.summary(), file=sys.stderr)
     except Exception as e:
         logger.exception("A critical error has occurred during conversion.")
         sys.exit(getattr(e, "errno", 0))
@@ -0,0 +1,452 @@
+import numpy as np
+
+from . import reference
+
+
+__all__ = [
+    "OffsetEstimate",
+    "CodonOffsetEstimate",
+    "BaseEstimate",
+    "candidate_offsets",
+    "infer_offset",
+    "infer_codon_offset",
+    "infer_one_based",
+]
+
+
+# Fraction of the sampled references the best offset must match.
+MIN_MATCH_FRACTION = 0.9
+
+# Number of standard deviations by which the agreement with the wild-type
+# under one coordinate base, or codon offset, must differ from chance, and
+# exceed that of the other candidates, for it to be inferred.
+MIN_AGREEMENT_SCORE = 4.0
+
+
+def candidate_offsets(lower, upper, step=1):
+    """
+    Returns the multiples of `step` between `lower` and `upper` inclusive.
+    """
+    start = -((-lower) // step) * step
+    return np.arange(start, upper + 1, step, dtype=np.int64)
+
+
+def chance_agreement(residues, wild_type):
+    """
+    Returns the probability of a residue matching the residue at a random
+    wild-type position, given the composition of `residues` and `wild_type`.
+    """
+    if not len(residues) or not len(wild_type):
+        return 0.0
+    values, counts = np.unique(residues, return_counts=True)
+    wt_values, wt_counts = np.unique(wild_type, return_counts=True)
+    _, i, j = np.intersect1d(values, wt_values, return_indices=True)
+    return float((counts[i] / len(residues) * wt_counts[j] / len(wild_type)).sum())
+
+
+def agreement_score(matches, n, background):
+    """
+    Number of standard deviations by which `matches` of `n` residues differ
+    from the matches expected by chance. Residues of a dataset either omit
+    or favour the wild-type residue of each position, so only the correct
+    coordinates deviate from chance.
+    """
+    expected = n * background
+    variance = expected * (1 - background)
+    if not n:
+        return 0.0
+    if variance <= 0:
+        return 0.0 if matches == expected else np.inf
+    return abs(matches - expected) / np.sqrt(variance)
+
+
+class OffsetEstimate(object):
+    """
+    Number of sampled references matching the wild-type sequence for each
+    candidate offset, and the best of the candidates.
+
+    Parameters
+    ----------
+    offsets : `np.ndarray`
+        Candidate offsets.
+
+    matches : `np.ndarray`
+        Number of matching references for each offset.
+
+    n_references : int
+        Number of references compared for each offset.
+    """
+
+    def __init__(self, offsets, matches, n_references):
+        self.offsets = offsets
+        self.matches = matches
+        self.n_references = n_references
+        self.offset = None
+        self.runner_up = None
+        if len(offsets):
+            order = np.argsort(-matches, kind="stable")
+            self.offset = int(offsets[order[0]])
+            if len(order) > 1:
+                self.runner_up = int(offsets[order[1]])
+
+    def fraction(self, offset):
+        """Fraction of the references matching with `offset`."""
+        if not self.n_references or offset is None:
+            return 0.0
+        matched = self.matches[np.flatnonzero(self.offsets == offset)[0]]
+        return matched / self.n_references
+
+    @property
+    def is_ambiguous(self):
+        return self.runner_up is not None and self.fraction(
+            self.runner_up
+        ) == self.fraction(self.offset)
+
+    def summary(self):
+        message = (
+            "Offset {} matches {:.1%} of {} sampled reference bases and "
+            "amino acids against the wild-type sequence.".format(
+                self.offset, self.fraction(self.offset), self.n_references
+            )
+        )
+        if self.runner_up is not None:
+            message += " The next best offset {} matches {:.1%}.".format(
+                self.runner_up, self.fraction(self.runner_up)
+            )
+        return message
+
+    def check(self):
+        """
+        Raises a `ValueError` if the best offset is not a confident match.
+        """
+        if not self.n_references or self.offset is None:
+            raise ValueError(
+                "Could not infer the offset. No reference bases or amino "
+                "acids were found in the sampled variants."
+            )
+        if self.is_ambiguous or self.fraction(self.offset) < MIN_MATCH_FRACTION:
+            raise ValueError(
+                "Could not infer the offset with confidence. {} Specify the "
+                "offset or check the wild-type sequence.".format(self.summary())
+            )
+
+
+def infer_offset(
+    index, nt_positions, nt_refs, aa_positions=None, aa_refs=None, is_coding=True
+):
+    """
+    Scores every offset placing the sampled variants within the wild-type
+    sequence and returns the offset matching the most references.
+
+    Parameters
+    ----------
+    index : `reference.WildTypeIndex`
+        Wild-type sequence.
+
+    nt_positions, nt_refs : `np.ndarray`
+        1-based positions and reference bases, as ASCII codes, of the sampled
+        nucleotide events before applying an offset.
+
+    aa_positions, aa_refs : `np.ndarray`, optional.
+        1-based positions and three-letter reference amino acids of sampled
+        protein events which have no nucleotide event.
+
+    is_coding : bool, optional.
+        Only consider offsets which are multiples of 3. Required to compare
+        amino acids.
+
+    Returns
+    -------
+    `OffsetEstimate`
+    """
+    nt_positions = np.asarray(nt_positions, dtype=np.int64)
+    if aa_positions is None or not is_coding:
+        aa_positions, aa_refs = np.array([], dtype=np.int64), np.array([], "U3")
+    aa_positions = np.asarray(aa_positions, dtype=np.int64)
+
+    # An offset is a candidate if it places a position within the sequence.
+    lower, upper = [], []
+    if len(nt_positions):
+        lower.append(nt_positions.min() - len(index))
+        upper.append(nt_positions.max() - 1)
+    if len(aa_positions):
+        lower.append(3 * (aa_positions.min() - index.protein_length))
+        upper.append(3 * (aa_positions.max() - 1))
+    if not lower:
+        return OffsetEstimate(np.array([], dtype=np.int64), np.array([]), 0)
+
+    offsets = candidate_offsets(min(lower), max(upper), step=3 if is_coding else 1)
+    matches = index.offset_matches(nt_positions, nt_refs, offsets)
+    if len(aa_positions):
+        matches += index.offset_matches(
+            aa_positions, aa_refs, offsets // 3, protein=True
+        )
+    return OffsetEstimate(offsets, matches, len(nt_positions) + len(aa_positions))
+
+
+class CodonOffsetEstimate(object):
+    """
+    Agreement between the residues of the sampled rows of an Enrich or
+    EMPIRIC input and the wild-type sequence for each candidate offset.
+    These inputs only list the mutant residue of each row, so offsets are
+    scored like coordinate bases, see `BaseEstimate`, rather than by the
+    fraction of matching references.
+
+    Parameters
+    ----------
+    offsets : `np.ndarray`
+        Candidate offsets in bases, each a multiple of 3, placing every
+        sampled position within the wild-type sequence.
+
+    matches : `np.ndarray`
+        Number of residues equal to the wild-type residue at their position
+        for each offset.
+
+    n_rows : int
+        Number of residues compared for each offset.
+
+    background : float
+        Probability of a residue matching the wild-type by chance.
+    """
+
+    def __init__(self, offsets, matches, n_rows, background):
+        self.offsets = offsets
+        self.matches = matches
+        self.n_rows = n_rows
+        self.background = background
+        self.scores = np.array(
+            [agreement_score(m, n_rows, background) for m in matches], dtype=float
+        )
+        self.offset = None
+        self.runner_up = None
+        if len(offsets):
+            order = np.argsort(-self.scores, kind="stable")
+            self.offset = int(offsets[order[0]])
+            if len(order) > 1:
+                self.runner_up = int(offsets[order[1]])
+
+    def score(self, offset):
+        """Agreement score of `offset`, see `agreement_score`."""
+        if offset is None:
+            return 0.0
+        return float(self.scores[np.flatnonzero(self.offsets == offset)[0]])
+
+    @property
+    def is_confident(self):
+        """
+        `True` if the agreement of the best offset, and of no other offset,
+        deviates from chance by `MIN_AGREEMENT_SCORE`.
+        """
+        # A handful of chance matches among a few rows already scores highly,
+        # so as many matches must be expected by chance as it takes a scan
+        # omitting the wild-type to reach the threshold.
+        if self.n_rows * self.background < MIN_AGREEMENT_SCORE ** 2:
+            return False
+        if self.score(self.offset) < MIN_AGREEMENT_SCORE:
+            return False
+        return self.score(self.runner_up) < MIN_AGREEMENT_SCORE
+
+    def summary(self):
+        message = (
+            "Offset {} of {} candidates: {} of {} sampled residues match the "
+            "wild-type (agreement score {:.1f}).".format(
+                self.offset,
+                len(self.offsets),
+                self.matches[np.flatnonzero(self.offsets == self.offset)[0]],
+                self.n_rows,
+                self.score(self.offset),
+            )
+        )
+        if self.runner_up is not None:
+            message += " The next best offset {} scores {:.1f}.".format(
+                self.runner_up, self.score(self.runner_up)
+            )
+        return message
+
+    def check(self):
+        """
+        Raises a `ValueError` if the best offset is not a confident match.
+        """
+        if not self.n_rows or self.offset is None:
+            raise ValueError(
+                "Could not infer the offset. No offset places every sampled "
+                "position within the wild-type sequence."
+            )
+        if not self.is_confident:
+            raise ValueError(
+                "Could not infer the offset with confidence. {} Specify the "
+                "offset or check the wild-type sequence.".format(self.summary())
+            )
+
+
+def infer_codon_offset(positions, residues, wild_type, one_based=True):
+    """
+    Scores every offset placing the sampled codon positions of an Enrich or
+    EMPIRIC input within the wild-type sequence by how far the agreement of
+    their residues with the wild-type deviates from chance.
+
+    Parameters
+    ----------
+    positions : array-like
+        Codon positions as written in the input.
+
+    residues : `np.ndarray`
+        Amino acid or codon of each position, encoded like `wild_type`.
+
+    wild_type : `np.ndarray`
+        Wild-type residue at each zero-based codon position, eg
+        `WildTypeIndex.protein`.
+
+    one_based : bool, optional.
+        Whether `positions` are one-based.
+
+    Returns
+    -------
+    `CodonOffsetEstimate`
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    residues = np.asarray(residues)
+    if len(residues) != len(positions):
+        raise ValueError("Expected one residue per position.")
+    background = chance_agreement(residues, wild_type)
+    if not len(positions) or not len(wild_type):
+        return CodonOffsetEstimate(
+            np.array([], dtype=np.int64), np.array([]), 0, background
+        )
+
+    # Only offsets placing every position within the sequence are candidates.
+    positions = positions + int(not one_based)
+    codon_offsets = candidate_offsets(
+        positions.max() - len(wild_type), positions.min() - 1
+    )
+    matches = reference.offset_matches(
+        wild_type, positions, residues, codon_offsets
+    )
+    return CodonOffsetEstimate(
+        3 * codon_offsets, matches, len(positions), background
+    )
+
+
+class BaseEstimate(object):
+    """
+    Agreement between the residues of the sampled rows and the wild-type
+    sequence when positions are read as zero-based and as one-based.
+
+    Parameters
+    ----------
+    out_of_bounds : dict[bool, int]
+        Number of positions outside the wild-type sequence for each base,
+        keyed by `one_based`.
+
+    matches : dict[bool, int]
+        Number of residues equal to the wild-type residue at their position.
+
+    n_rows : dict[bool, int]
+        Number of positions within the wild-type sequence.
+
+    background : float
+        Probability of a residue matching the wild-type by chance, given the
+        composition of the residues and the wild-type sequence.
+    """
+
+    def __init__(self, out_of_bounds, matches, n_rows, background):
+        self.out_of_bounds = out_of_bounds
+        self.matches = matches
+        self.n_rows = n_rows
+        self.background = background
+
+    def score(self, one_based):
+        """
+        Agreement score of the base, see `agreement_score`.
+        """
+        return agreement_score(
+            self.matches[one_based], self.n_rows[one_based], self.background
+        )
+
+    @property
+    def one_based(self):
+        """
+        The inferred base, or `None` if the evidence is ambiguous. If only
+        one base places every position within the wild-type sequence, it is
+        chosen provided its agreement with the wild-type deviates from
+        chance; otherwise the base whose agreement deviates from chance, by
+        that margin over the other base, is chosen.
+        """
+        in_bounds = [b for b in (False, True) if not self.out_of_bounds[b]]
+        if len(in_bounds) == 1:
+            if self.score(in_bounds[0]) >= MIN_AGREEMENT_SCORE:
+                return in_bounds[0]
+            return None
+        if not in_bounds:
+            return None
+        one, zero = self.score(True), self.score(False)
+        if one >= MIN_AGREEMENT_SCORE and one - zero >= MIN_AGREEMENT_SCORE:
+            return True
+        if zero >= MIN_AGREEMENT_SCORE and zero - one >= MIN_AGREEMENT_SCORE:
+            return False
+        return None
+
+    def summary(self):
+        return " ".join(
+            "{}: {} position(s) out of bounds, {} of {} residues match the "
+            "wild-type (agreement score {:.1f}).".format(
+                "One-based" if one_based else "Zero-based",
+                self.out_of_bounds[one_based],
+                self.matches[one_based],
+                self.n_rows[one_based],
+                self.score(one_based),
+            )
+            for one_based in (False, True)
+        )
+
+    def check(self):
+        """
+        Raises a `ValueError` if neither base is a confident match.
+        """
+        if self.one_based is None:
+            raise ValueError(
+                "Could not infer whether positions are zero-based or "
+                "one-based. {} Specify the coordinate base or check the "
+                "wild-type sequence and offset.".format(self.summary())
+            )
+
+
+def infer_one_based(positions, residues, wild_type):
+    """
+    Scores the agreement between residues and the wild-type sequence when
+    their positions are read as zero-based and as one-based.
+
+    Parameters
+    ----------
+    positions : array-like
+        Positions as written in the input, after applying the offset.
+
+    residues : `np.ndarray`
+        Amino acid or codon of each position, encoded like `wild_type`.
+
+    wild_type : `np.ndarray`
+        Wild-type residue at each zero-based position, eg
+        `WildTypeIndex.protein`.
+
+    Returns
+    -------
+    `BaseEstimate`
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    residues = np.asarray(residues)
+    if len(residues) != len(positions):
+        raise ValueError("Expected one residue per position.")
+
+    out_of_bounds, matches, n_rows = {}, {}, {}
+    for one_based in (False, True):
+        index = positions - int(one_based)
+        in_bounds = (index >= 0) & (index < len(wild_type))
+        out_of_bounds[one_based] = int((~in_bounds).sum())
+        n_rows[one_based] = int(in_bounds.sum())
+        matches[one_based] = int(
+            (wild_type[index[in_bounds]] == residues[in_bounds]).sum()
+        )
+
+    return BaseEstimate(
+        out_of_bounds, matches, n_rows, chance_agreement(residues, wild_type)
+    )
@@ -3,7 +3,7 @@ import logging
 from fqfa.fasta.fasta import parse_fasta_records
 from fqfa.validator.validator import dna_bases_validator
 
-from . import LOGGER, constants, exceptions
+from . import LOGGER, constants, exceptions, compression, policy
 
 
 logger = logging.getLogger(LOGGER)
@@ -34,6 +34,8 @@ def parse_src(src):
     src = parse_string(src)
     if not src:
         raise ValueError("<src> argument is required.")
+    if src == constants.STREAM_SRC:
+        return src
     path = os.path.normpath(os.path.expanduser(src))
     try:
         open(path, "rt").close()
@@ -125,7 +127,94 @@ def parse_score_column(value, input_type, program):
     return value
 
 
-def parse_offset(offset, coding=True):
+def parse_csv_engine(value):
+    value = parse_string(value)
+    if value is None:
+        return constants.default_csv_engine
+    if value.lower() not in constants.csv_engines:
+        raise ValueError(
+            "Supported CSV engines are {}.".format(", ".join(constants.csv_engines))
+        )
+    return value.lower()
+
+
+def parse_compression(value):
+    value = parse_string(value)
+    if value is None:
+        return None
+    value = {"gz": "gzip", "zst": "zstd"}.get(value.lower(), value.lower())
+    if value not in compression.OUTPUT_COMPRESSIONS:
+        raise ValueError(
+            "Outputs can only be compressed with {}.".format(
+                ", ".join(compression.OUTPUT_COMPRESSIONS)
+            )
+        )
+    return value
+
+
+def parse_shard(value):
+    value = parse_string(value)
+    if value is None:
+        return None
+    try:
+        index, count = (int(v) for v in value.split("/"))
+    except ValueError:
+        raise ValueError(
+            "Shard must be given as 'i/N', eg '2/4' for the second of four "
+            "shards. Found '{}'.".format(value)
+        )
+    if not 1 <= index <= count:
+        raise ValueError(
+            "Shard number must be between 1 and the number of shards. "
+            "Found '{}'.".format(value)
+        )
+    return index, count
+
+
+def parse_error_policy(value):
+    value = parse_string(value)
+    if value is None:
+        return None
+    policy.ErrorPolicy.parse(value)
+    return value.strip().lower()
+
+
+def parse_output_formats(value):
+    value = parse_string(value)
+    if value is None:
+        return [constants.default_output_format]
+    formats = []
+    for output_format in value.split(","):
+        output_format = output_format.strip().lower()
+        if output_format not in constants.output_formats:
+            raise ValueError(
+                "Supported output formats are {}.".format(
+                    ", ".join(constants.output_formats)
+                )
+            )
+        if output_format not in formats:
+            formats.append(output_format)
+    return formats
+
+
+def parse_one_based(zero_based=False, detect_base=False, program=None):
+    if not parse_boolean(detect_base):
+        return not parse_boolean(zero_based)
+    if parse_boolean(zero_based):
+        raise ValueError("--zero-based and --detect-base cannot be used together.")
+    if program not in (None, "enrich", "empiric"):
+        raise ValueError(
+            "The coordinate base can only be inferred for Enrich and EMPIRIC "
+            "inputs."
+        )
+    return constants.AUTO_ONE_BASED
+
+
+def parse_offset(offset, coding=True, one_based=True):
+    if str(offset).strip().lower() == constants.AUTO_OFFSET:
+        if one_based == constants.AUTO_ONE_BASED:
+            raise ValueError("--offset auto and --detect-base cannot be used together.")
+        return constants.AUTO_OFFSET
     offset = parse_numeric(offset, name="offset", dtype=int)
     mult_of_three = abs(offset) % 3 == 0
     if coding and not mult_of_three:
@@ -134,6 +223,26 @@ def parse_offset(offset, coding=True):
     return offset
 
 
+def parse_run_options(docopt_args):
+    """
+    Parses the options controlling how a conversion is run rather than the
+    converter itself.
+    """
+    options = {}
+    options["profile_stats"] = parse_string(docopt_args.get("--profile-stats", None))
+    options["profile"] = (
+        parse_boolean(docopt_args.get("--profile", False))
+        or options["profile_stats"] is not None
+    )
+    options["report"] = parse_string(docopt_args.get("--report", None))
+    options["all_sheets"] = parse_boolean(docopt_args.get("--all-sheets", False))
+    options["n_jobs"] = parse_numeric(
+        docopt_args.get("--n-jobs", -1), name="n_jobs", dtype=int
+    )
+    options["cache"] = not parse_boolean(docopt_args.get("--no-cache", False))
+    return options
+
+
 def parse_docopt(docopt_args):
     parsed_kwargs = {}
 
@@ -145,8 +254,10 @@ def parse_docopt(docopt_args):
     parsed_kwargs["is_coding"] = not parse_boolean(
         docopt_args.get("--non-coding", False)
     )
-    parsed_kwargs["one_based"] = not parse_boolean(
-        docopt_args.get("--zero-based", False)
+    parsed_kwargs["one_based"] = parse_one_based(
+        zero_based=docopt_args.get("--zero-based", False),
+        detect_base=docopt_args.get("--detect-base", False),
+        program=program,
     )
 
     # Parse WT and Offset fields
@@ -154,7 +265,9 @@ def parse_docopt(docopt_args):
         docopt_args.get("--wtseq", None), coding=parsed_kwargs["is_coding"]
     )
     parsed_kwargs["offset"] = parse_offset(
-        docopt_args.get("--offset", 0), coding=parsed_kwargs["is_coding"]
+        docopt_args.get("--offset", 0),
+        coding=parsed_kwargs["is_coding"],
+        one_based=parsed_kwargs["one_based"],
     )
 
     # Parse Input related fields
@@ -167,6 +280,30 @@ def parse_docopt(docopt_args):
         input_type=parsed_kwargs["input_type"],
     )
     parsed_kwargs["hgvs_column"] = parse_string(docopt_args.get("--hgvs-column", None))
+    parsed_kwargs["csv_engine"] = parse_csv_engine(docopt_args.get("--csv-engine", None))
+    parsed_kwargs["output_compression"] = parse_compression(
+        docopt_args.get("--compress", None)
+    )
+    parsed_kwargs["output_formats"] = parse_output_formats(
+        docopt_args.get("--output-format", None)
+    )
+    parsed_kwargs["shard"] = parse_shard(docopt_args.get("--shard", None))
+    parsed_kwargs["preflight"] = not parse_boolean(
+        docopt_args.get("--no-preflight", False)
+    )
+    parsed_kwargs["error_policy"] = parse_error_policy(
+        docopt_args.get("--errors", None)
+    )
+
+    if program == "enrich2":
+        parsed_kwargs["variant_cache"] = parse_boolean(
+            docopt_args.get("--variant-cache", False)
+        )
+
+    if program in ("enrich", "empiric"):
+        parsed_kwargs["incremental"] = parse_boolean(
+            docopt_args.get("--incremental", False)
+        )
 
     # Parse Excel related fields
     parsed_kwargs["sheet_name"] = parse_string(docopt_args.get("--sheet_name", None))
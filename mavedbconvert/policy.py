@@ -0,0 +1,130 @@
+from . import exceptions
+
+
+__all__ = ["ErrorPolicy", "FAIL", "COLLECT"]
+
+
+# Abort at the first row that cannot be parsed.
+FAIL = "fail"
+
+# Collect every row that cannot be parsed into an invalid rows file.
+COLLECT = "collect"
+
+# Number of rows parsed before a fractional error budget is checked. Checking
+# earlier would abort runs on the chance clustering of a few bad rows.
+MIN_ROWS = 1000
+
+
+class ErrorPolicy(object):
+    """
+    Decides whether a conversion continues after rows fail to parse. The
+    policy counts parsed rows and errors as they are recorded and raises
+    `ErrorBudgetExceeded` as soon as the budget is spent, so misconfigured
+    runs, eg with a wrong offset or wild-type sequence, stop early instead
+    of after parsing every row.
+
+    Parameters
+    ----------
+    max_errors : int, optional.
+        Abort once more than `max_errors` rows have failed. `0` aborts at the
+        first failing row.
+
+    max_fraction : float, optional.
+        Abort once more than this fraction of the rows parsed has failed.
+        Checked after `min_rows` rows and at the end of the input.
+
+    min_rows : int, optional.
+        Number of rows parsed before `max_fraction` is checked.
+    """
+
+    def __init__(self, max_errors=None, max_fraction=None, min_rows=MIN_ROWS):
+        self.max_errors = max_errors
+        self.max_fraction = max_fraction
+        self.min_rows = min_rows
+        self.rows = 0
+        self.errors = 0
+        self.last_error = None
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Creates a policy from 'fail', 'collect', a maximum number of errors
+        such as '100' or a maximum percentage of invalid rows such as '5%'.
+        """
+        value = str(value).strip().lower()
+        if value == FAIL:
+            return cls(max_errors=0)
+        if value == COLLECT:
+            return cls()
+        try:
+            if value.endswith("%"):
+                percent = float(value[:-1])
+                if not 0 <= percent <= 100:
+                    raise ValueError()
+                return cls(max_fraction=percent / 100)
+            max_errors = int(value)
+            if max_errors < 0:
+                raise ValueError()
+            return cls(max_errors=max_errors)
+        except ValueError:
+            raise ValueError(
+                "Error policy must be '{}', '{}', a maximum number of errors "
+                "or a maximum percentage of invalid rows such as '5%'. "
+                "Found '{}'.".format(FAIL, COLLECT, value)
+            )
+
+    @property
+    def fail_fast(self):
+        """`True` if the first failing row aborts the conversion."""
+        return self.max_errors == 0
+
+    def reset(self):
+        self.rows = 0
+        self.errors = 0
+        self.last_error = None
+
+    def record(self, rows=1, errors=0, error=None):
+        """
+        Records `rows` parsed rows of which `errors` failed, with `error` the
+        last of the errors, and checks the budget.
+        """
+        self.rows += rows
+        self.errors += errors
+        if errors:
+            self.last_error = error
+            self.check()
+
+    def _abort(self, message):
+        if self.last_error is not None:
+            message = "{} Last error: {}".format(message, self.last_error)
+        return exceptions.ErrorBudgetExceeded(message)
+
+    def check(self, final=False):
+        """
+        Raises `ErrorBudgetExceeded` if the recorded errors exceed the budget.
+        The fractional budget is only checked after `min_rows` rows unless
+        `final` is set.
+        """
+        if self.max_errors is not None and self.errors > self.max_errors:
+            raise self._abort(
+                "Aborting after {} invalid row(s) in the first {} row(s), "
+                "exceeding the maximum of {} invalid row(s).".format(
+                    self.errors, self.rows, self.max_errors
+                )
+            )
+        if self.max_fraction is None or not self.rows:
+            return
+        if not final and self.rows < self.min_rows:
+            return
+        if self.errors / self.rows > self.max_fraction:
+            raise self._abort(
+                "Aborting after {} of the first {} row(s) ({:.1%}) were "
+                "invalid, exceeding the maximum of {:.1%}. Check that the "
+                "wild-type sequence, offset and coordinates are "
+                "correct.".format(
+                    self.errors,
+                    self.rows,
+                    self.errors / self.rows,
+                    self.max_fraction,
+                )
+            )
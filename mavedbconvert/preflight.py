@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+from . import exceptions, report
+
+
+__all__ = [
+    "Preflight",
+    "variant_positions",
+    "stratified_sample",
+    "sample_rows",
+    "run",
+]
+
+
+# Number of rows parsed by the preflight. Inputs with fewer rows are not
+# sampled since the full conversion is about as fast.
+SAMPLE_SIZE = 2000
+
+# Number of rows drawn uniformly at random whose positions are read to
+# stratify the sample. Reading the positions of every row of a large input
+# would cost more than parsing the sample.
+POOL_SIZE = 10 * SAMPLE_SIZE
+
+# Fraction of sampled rows failing with a configuration error above which
+# the conversion is refused.
+MAX_INVALID_FRACTION = 0.5
+
+# Number of error codes reported.
+N_ERROR_CODES = 3
+
+# Error codes raised when the wild-type sequence, offset or coordinate base
+# do not match the input, with the setting most likely at fault.
+CONFIGURATION_ERRORS = {
+    exceptions.ReferenceMismatchError.code: "wild-type sequence and offset",
+    exceptions.PositionOutOfBoundsError.code: "offset and coordinate base",
+    exceptions.NegativePositionError.code: "offset and coordinate base",
+    exceptions.InvalidPositionError.code: "offset and coordinate base",
+}
+
+# First number in a variant, eg the position of 'c.12A>G' or '3,4-L,Y'.
+POSITION_RE = r"(\d+)"
+
+
+def variant_positions(values):
+    """
+    Extracts the first position of each variant in `values`, which may be
+    HGVS strings, Enrich seqIDs or numeric positions.
+
+    Returns
+    -------
+    `np.ndarray`
+        Float positions, NaN where a value has no position.
+    """
+    values = pd.Series(np.asarray(values, dtype=object)).infer_objects()
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    extracted = values.astype(str).str.extract(POSITION_RE)[0]
+    return pd.to_numeric(extracted, errors="coerce").to_numpy(dtype=float)
+
+
+def stratified_sample(positions, size=SAMPLE_SIZE, seed=0):
+    """
+    Draws a sample of `size` rows spread evenly across `positions`. Rows are
+    ordered by position and split into `size` strata of consecutive rows,
+    one row being drawn from each, so every region of the sequence is
+    represented in proportion to its number of rows. Rows without a position
+    form the last strata.
+
+    Returns
+    -------
+    `np.ndarray`
+        Positional indices of the sampled rows in ascending order.
+    """
+    n = len(positions)
+    if n <= size:
+        return np.arange(n)
+    order = np.argsort(positions, kind="stable")
+    edges = np.linspace(0, n, size + 1).astype(np.int64)
+    widths = edges[1:] - edges[:-1]
+    rng = np.random.default_rng(seed)
+    picks = edges[:-1] + (rng.random(size) * widths).astype(np.int64)
+    return np.sort(order[picks])
+
+
+class Preflight(object):
+    """
+    Outcome of parsing a sample of the input rows before a conversion.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of rows in the input.
+
+    positions : `np.ndarray`
+        Positions of the sampled rows.
+
+    errors : list
+        Error of each sampled row that could not be parsed, with its label.
+    """
+
+    def __init__(self, n_rows, positions, errors):
+        self.n_rows = n_rows
+        self.sample_size = len(positions)
+        self.positions = positions
+        self.errors = report.ErrorSummary()
+        for label, error in errors:
+            self.errors.add(label, error)
+
+    @property
+    def n_invalid(self):
+        return len(self.errors)
+
+    @property
+    def invalid_fraction(self):
+        if not self.sample_size:
+            return 0.0
+        return self.n_invalid / self.sample_size
+
+    def most_common(self, n=N_ERROR_CODES):
+        """Returns the `n` most common error codes and their counts."""
+        counts = sorted(self.errors.counts.items(), key=lambda item: -item[1])
+        return counts[:n]
+
+    @property
+    def cause(self):
+        """
+        The setting most likely at fault if most sampled rows failed with a
+        configuration error, otherwise `None`.
+        """
+        if self.invalid_fraction <= MAX_INVALID_FRACTION:
+            return None
+        code, _ = self.most_common(1)[0]
+        return CONFIGURATION_ERRORS.get(code, None)
+
+    def summary(self):
+        positions = self.positions[~np.isnan(self.positions)]
+        span = (
+            " at positions {:.0f}-{:.0f}".format(positions.min(), positions.max())
+            if len(positions)
+            else ""
+        )
+        message = (
+            "Preflight parsed {} of {} row(s){}. Expected invalid rate "
+            "{:.1%}.".format(self.sample_size, self.n_rows, span, self.invalid_fraction)
+        )
+        if self.n_invalid:
+            message += " Most common errors: {}.".format(
+                ", ".join("'{}' ({})".format(code, n) for code, n in self.most_common())
+            )
+        return message
+
+    def log(self, logger):
+        """
+        Logs the summary and sample errors, and adds the sample counts to the
+        active report.
+        """
+        if self.n_invalid:
+            logger.warning(self.summary())
+            for line in self.errors.lines():
+                logger.warning(line)
+        else:
+            logger.info(self.summary())
+        report.count("preflight_rows", self.sample_size)
+        report.count("preflight_invalid", self.n_invalid)
+
+    def check(self):
+        """
+        Raises `PreflightError` if the sample suggests the conversion is
+        misconfigured.
+        """
+        cause = self.cause
+        if cause is None:
+            return
+        raise exceptions.PreflightError(
+            "{} Refusing to convert the whole input. Check the {}.".format(
+                self.summary(), cause
+            )
+        )
+
+
+def sample_rows(values, size=SAMPLE_SIZE, pool_size=POOL_SIZE, seed=0):
+    """
+    Draws a sample of `size` rows stratified by the positions of a pool of
+    `pool_size` rows drawn uniformly at random, see `stratified_sample`.
+
+    Parameters
+    ----------
+    values : Sequence
+        Variant or position of each row, see `variant_positions`.
+
+    Returns
+    -------
+    tuple[`np.ndarray`, `np.ndarray`]
+        Positional indices of the sampled rows in ascending order and their
+        positions.
+    """
+    n = len(values)
+    pool = np.arange(n)
+    if n > pool_size:
+        rng = np.random.default_rng(seed)
+        pool = np.sort(rng.choice(n, size=pool_size, replace=False))
+    positions = variant_positions(np.asarray(values, dtype=object)[pool])
+    picks = stratified_sample(positions, size=size, seed=seed)
+    return pool[picks], positions[picks]
+
+
+def run(parse, rows, labels, values, size=SAMPLE_SIZE, pool_size=POOL_SIZE, seed=0):
+    """
+    Parses a sample of `size` rows with `parse`, catching the errors. The
+    sample is stratified by the positions of a pool of `pool_size` rows
+    drawn uniformly at random.
+
+    Parameters
+    ----------
+    parse : Callable
+        Parses a single row, raising an exception if it is invalid.
+
+    rows : Callable[[`np.ndarray`], list]
+        Returns the rows passed to `parse` given their positional indices.
+
+    labels : Sequence
+        Label of each row used when reporting errors.
+
+    values : Sequence
+        Variant or position of each row, see `variant_positions`.
+
+    size : int, optional.
+        Number of rows sampled.
+
+    pool_size : int, optional.
+        Number of rows the sample is drawn from.
+
+    Returns
+    -------
+    `Preflight`
+    """
+    sample, positions = sample_rows(values, size, pool_size=pool_size, seed=seed)
+    errors = []
+    for i, row in zip(sample, rows(sample)):
+        try:
+            parse(row)
+        except Exception as e:
+            errors.append((labels[i], e))
+    return Preflight(len(values), positions, errors)
@@ -0,0 +1,290 @@
+import sys
+import time
+import cProfile
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+__all__ = ["Profiler", "StageStats", "profile", "stage", "active_profiler", "peak_rss"]
+
+
+# Profiler receiving stage timings. Stages are no-ops while this is None.
+_active = None
+
+
+def active_profiler():
+    """Returns the `Profiler` currently recording stages or `None`."""
+    return _active
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of the current process in bytes or
+    `None` if it cannot be determined on this platform.
+    """
+    if resource is None:
+        return None  # pragma: no cover
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS reports bytes.
+    if sys.platform == "darwin":
+        return peak  # pragma: no cover
+    return peak * 1024
+
+
+class StageStats(object):
+    """
+    Accumulated timings for all calls of a named conversion stage.
+
+    Attributes
+    ----------
+    name : str
+        Name of the stage.
+
+    calls : int
+        Number of times the stage was entered.
+
+    wall_time : float
+        Total elapsed wall-clock time in seconds.
+
+    cpu_time : float
+        Total CPU time of the process in seconds.
+
+    rows : int
+        Total number of rows processed by the stage.
+
+    peak_rss : int, optional.
+        Peak resident set size of the process in bytes when the stage last
+        exited.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.rows = 0
+        self.peak_rss = None
+
+    @property
+    def rows_per_second(self):
+        if not self.rows or not self.wall_time:
+            return None
+        return self.rows / self.wall_time
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "rows": self.rows,
+            "rows_per_second": self.rows_per_second,
+            "peak_rss": self.peak_rss,
+        }
+
+
+class _Stage(object):
+    """Context manager timing a single call of a stage."""
+
+    __slots__ = ("profiler", "name", "rows", "_wall", "_cpu")
+
+    def __init__(self, profiler, name, rows=None):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self._wall = None
+        self._cpu = None
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(
+            self.name,
+            wall_time=time.perf_counter() - self._wall,
+            cpu_time=time.process_time() - self._cpu,
+            rows=self.rows,
+        )
+        return False
+
+
+class _NullStage(object):
+    """Shared stage returned while profiling is off. Discards everything."""
+
+    __slots__ = ()
+
+    @property
+    def rows(self):
+        return None
+
+    @rows.setter
+    def rows(self, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+def stage(name, rows=None):
+    """
+    Returns a context manager timing the stage `name` in the active profiler.
+    The number of rows processed can be passed here or set on the returned
+    object as `rows` before the block exits.
+
+    When no profiler is active a shared no-op context manager is returned, so
+    instrumented code costs a global lookup when profiling is off.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage, eg 'load_input_file' or 'filters'.
+
+    rows : int, optional.
+        Number of rows processed by the stage.
+    """
+    if _active is None:
+        return NULL_STAGE
+    return _active.stage(name, rows)
+
+
+class Profiler(object):
+    """
+    Records wall time, CPU time, rows processed and peak memory for each
+    stage of a conversion. Stages entered more than once, such as the
+    per-condition stages of Enrich2, are accumulated under the same name.
+
+    Parameters
+    ----------
+    cprofile : bool, optional.
+        Also collect function level statistics with `cProfile`.
+    """
+
+    def __init__(self, cprofile=False):
+        self.stages = OrderedDict()
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self._wall = None
+        self._cpu = None
+        self._previous = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        """Makes this the active profiler and starts the run clock."""
+        global _active
+        self._previous = _active
+        _active = self
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self):
+        """Stops the run clock and restores the previously active profiler."""
+        global _active
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.wall_time += time.perf_counter() - self._wall
+        self.cpu_time += time.process_time() - self._cpu
+        _active = self._previous
+        self._previous = None
+
+    def stage(self, name, rows=None):
+        return _Stage(self, name, rows)
+
+    def record(self, name, wall_time, cpu_time, rows=None):
+        """Adds a single call of stage `name` to the accumulated timings."""
+        stats = self.stages.get(name, None)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        stats.calls += 1
+        stats.wall_time += wall_time
+        stats.cpu_time += cpu_time
+        stats.rows += rows or 0
+        stats.peak_rss = peak_rss()
+
+    def summary(self):
+        """
+        Formats the recorded stages as a plain text table.
+
+        Returns
+        -------
+        str
+        """
+        header = "{:<28} {:>6} {:>10} {:>10} {:>10} {:>12} {:>14}".format(
+            "stage", "calls", "wall (s)", "cpu (s)", "rows", "rows/s", "peak RSS (MB)"
+        )
+        lines = [header, "-" * len(header)]
+        for stats in self.stages.values():
+            rate = stats.rows_per_second
+            rss = stats.peak_rss
+            lines.append(
+                "{:<28} {:>6} {:>10.3f} {:>10.3f} {:>10} {:>12} {:>14}".format(
+                    stats.name,
+                    stats.calls,
+                    stats.wall_time,
+                    stats.cpu_time,
+                    stats.rows,
+                    "-" if rate is None else "{:.1f}".format(rate),
+                    "-" if rss is None else "{:.1f}".format(rss / 2 ** 20),
+                )
+            )
+        lines.append("-" * len(header))
+        lines.append(
+            "{:<28} {:>6} {:>10.3f} {:>10.3f}".format(
+                "total", "", self.wall_time, self.cpu_time
+            )
+        )
+        return "\n".join(lines)
+
+    def dump_stats(self, path):
+        """
+        Writes the `cProfile` statistics to `path` in the binary `pstats`
+        format read by `flameprof`, `snakeviz` and similar tools.
+        """
+        if self.cprofile is None:
+            raise ValueError("Profiler was created without cProfile enabled.")
+        self.cprofile.dump_stats(path)
+
+
+@contextmanager
+def profile(stats_path=None):
+    """
+    Profiles the conversions run inside the context.
+
+    Parameters
+    ----------
+    stats_path : str, optional.
+        If provided, function level `cProfile` statistics are collected and
+        written to this path on exit, including when the context raises.
+
+    Yields
+    ------
+    `Profiler`
+    """
+    profiler = Profiler(cprofile=stats_path is not None)
+    try:
+        with profiler:
+            yield profiler
+    finally:
+        if stats_path is not None:
+            profiler.dump_stats(stats_path)
@@ -0,0 +1,203 @@
+import os
+import logging
+from contextlib import ExitStack
+
+import numpy as np
+
+from . import LOGGER, compression as compression_
+
+
+__all__ = ["read_csv_arrow", "footer_offset", "arrow_available"]
+
+
+logger = logging.getLogger(LOGGER)
+
+
+def arrow_available():
+    """Returns `True` if `pyarrow` is installed."""
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def footer_offset(source, n_lines, block_size=1 << 16):
+    """
+    Returns the byte offset at which the last `n_lines` lines of a file
+    begin. Trailing newlines at the end of the file are not counted as lines.
+    The file is scanned backwards from the end so only the footer is read.
+
+    Parameters
+    ----------
+    source : Union[str, BinaryIO]
+        Path to the file or a seekable binary stream.
+
+    n_lines : int
+        Number of lines in the footer.
+
+    block_size : int, optional.
+        Number of bytes read at a time.
+
+    Returns
+    -------
+    int
+    """
+    with ExitStack() as stack:
+        if isinstance(source, (str, os.PathLike)):
+            fh = stack.enter_context(open(source, "rb"))
+        else:
+            fh = source
+        pos = fh.seek(0, os.SEEK_END)
+        found = 0
+        end = None
+        while pos > 0:
+            start = max(0, pos - block_size)
+            fh.seek(start)
+            block = fh.read(pos - start)
+            idx = len(block)
+            if end is None:
+                stripped = block.rstrip(b"\r\n")
+                if not stripped:
+                    pos = start
+                    continue
+                idx = len(stripped)
+                end = start + idx
+            while True:
+                idx = block.rfind(b"\n", 0, idx)
+                if idx < 0:
+                    break
+                found += 1
+                if found == n_lines:
+                    return start + idx + 1
+            pos = start
+    return 0
+
+
+def _open_compressed(path, compression):
+    """
+    Opens a decompressing stream, using the native Arrow codec when one is
+    available so decompression does not hold the GIL.
+    """
+    import pyarrow as pa
+
+    if compression in ("gzip", "bz2", "zstd") and pa.Codec.is_available(compression):
+        return pa.input_stream(path, compression=compression)
+    return compression_.open_input(path, compression)
+
+
+def _is_numeric(data_type):
+    import pyarrow as pa
+
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_null(data_type)
+    )
+
+
+def read_csv_arrow(
+    path,
+    sep="\t",
+    skip_header_rows=0,
+    skip_footer_rows=0,
+    na_values=(),
+    required_columns=(),
+    compression=None,
+):
+    """
+    Reads a delimited file into a dataframe with the multithreaded `pyarrow`
+    CSV reader.
+
+    Footer rows are skipped by locating the start of the footer from the end
+    of the file and parsing only the bytes before it from a memory map, so no
+    fallback to the slow python engine is needed.
+
+    Columns that are not in `required_columns` and are not numeric are
+    dropped before conversion to `pandas`, as the converters would drop them
+    anyway, which avoids materializing python strings for them.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    sep : str, optional.
+        Column delimiter.
+
+    skip_header_rows : int, optional.
+        Number of lines to skip before the header.
+
+    skip_footer_rows : int, optional.
+        Number of lines to skip at the end of the file.
+
+    na_values : Iterable[str], optional.
+        Values read as null in addition to the `pyarrow` defaults, which match
+        the `pandas` defaults.
+
+    required_columns : Iterable[str], optional.
+        Columns kept regardless of their type.
+
+    compression : str, optional.
+        Compression format of the file, decompressed while it is read.
+
+    Returns
+    -------
+    `pd.DataFrame`
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv
+    except ImportError:
+        raise ImportError(
+            "The 'pyarrow' engine requires pyarrow. Install it with "
+            "'pip install pyarrow'."
+        )
+
+    read_options = csv.ReadOptions(skip_rows=skip_header_rows, use_threads=True)
+    parse_options = csv.ParseOptions(delimiter=sep)
+    convert_options = csv.ConvertOptions(
+        null_values=list(csv.ConvertOptions().null_values) + list(na_values),
+        strings_can_be_null=True,
+    )
+
+    with ExitStack() as stack:
+        if compression is not None:
+            source = stack.enter_context(_open_compressed(path, compression))
+            if skip_footer_rows:
+                data = pa.py_buffer(source.read())
+                end = footer_offset(pa.BufferReader(data), skip_footer_rows)
+                source = pa.BufferReader(data.slice(0, end))
+        elif skip_footer_rows:
+            mapped = stack.enter_context(pa.memory_map(path, "r"))
+            source = pa.BufferReader(
+                mapped.read_buffer(footer_offset(path, skip_footer_rows))
+            )
+        else:
+            source = path
+        table = csv.read_csv(
+            source,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+
+    required_columns = set(required_columns)
+    keep = []
+    for field in table.schema:
+        if field.name in required_columns or _is_numeric(field.type):
+            keep.append(field.name)
+        else:
+            logger.warning("Dropping non-numeric column '{}'".format(field.name))
+    table = table.select(keep)
+
+    # Columns of nulls are read as float by pandas.
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+
+    df = table.to_pandas()
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].where(df[column].notna(), np.NaN)
+    return df
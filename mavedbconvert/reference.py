@@ -0,0 +1,335 @@
+import numpy as np
+import pandas as pd
+from fqfa.constants.iupac.protein import AA_CODES
+from fqfa.constants.translation.table import CODON_TABLE
+
+from . import constants
+
+
+__all__ = [
+    "WildTypeIndex",
+    "encode",
+    "extract_protein_events",
+    "extract_nucleotide_events",
+    "encode_codons",
+    "offset_matches",
+]
+
+
+# Reference amino acid and position of each substitution event in a protein
+# HGVS string, eg 'p.[Met1Lys;Lys2=]'.
+PROTEIN_EVENT_RE = (
+    r"(?P<ref>[A-Z][a-z]{2})(?P<position>\d+)(?:[A-Z][a-z]{2}|=|\?)"
+)
+
+# Position and reference base of each substitution event in a nucleotide
+# HGVS string, eg 'c.[1A>G;2T>C]'.
+NUCLEOTIDE_EVENT_RE = r"(?P<position>\d+)(?P<ref>[ACGTacgt])>"
+
+# Weights packing the ASCII codes of a codon into a single integer.
+CODON_WEIGHTS = np.array([1 << 16, 1 << 8, 1], dtype=np.int64)
+
+# Number of elements compared per block by `offset_matches`.
+MAX_BLOCK_SIZE = 1 << 22
+
+
+def encode(sequence):
+    """
+    Encodes a string, or a sequence of single character strings, as an
+    array of ASCII codes.
+
+    Returns
+    -------
+    `np.ndarray`
+        Array of dtype uint8 with one element per character.
+    """
+    if not isinstance(sequence, str):
+        sequence = "".join(sequence)
+    return np.frombuffer(sequence.encode("ascii"), dtype=np.uint8)
+
+
+def encode_codons(codons):
+    """
+    Encodes codons as integers so arrays of codons compare element-wise.
+
+    Parameters
+    ----------
+    codons : Union[Sequence[str], `np.ndarray`]
+        Three letter codons, or their ASCII codes with shape (n_codons, 3).
+
+    Returns
+    -------
+    `np.ndarray`
+        Array of dtype int64 with one element per codon.
+    """
+    if not (isinstance(codons, np.ndarray) and codons.dtype == np.uint8):
+        codons = encode(codons).reshape(-1, 3)
+    return codons.astype(np.int64) @ CODON_WEIGHTS
+
+
+def extract_protein_events(hgvs_pro):
+    """
+    Extracts the position and reference amino acid of every substitution
+    event in a column of protein HGVS strings using a single
+    `str.extractall`. Missing values, special variants and `p.=` are skipped.
+
+    Parameters
+    ----------
+    hgvs_pro : Union[`pd.Series`, Sequence[str]]
+        Protein HGVS strings.
+
+    Returns
+    -------
+    tuple[`np.ndarray`, `np.ndarray`, `np.ndarray`]
+        The positional row of each event in `hgvs_pro`, its 1-based position
+        and its three-letter reference amino acid, in row order.
+    """
+    values = pd.Series(np.asarray(hgvs_pro, dtype=object))
+    keep = values.notna()
+    keep &= ~values.isin(constants.special_variants)
+    keep &= ~values.str.contains("p.=", regex=False).fillna(False).astype(bool)
+    return _extract_events(values[keep], PROTEIN_EVENT_RE, "U3")
+
+
+def extract_nucleotide_events(variants):
+    """
+    Extracts the position and reference base of every substitution event in
+    a column of variants containing nucleotide HGVS strings, such as Enrich2
+    variants. Missing values and special variants are skipped.
+
+    Parameters
+    ----------
+    variants : Union[`pd.Series`, Sequence[str]]
+        Variant strings.
+
+    Returns
+    -------
+    tuple[`np.ndarray`, `np.ndarray`, `np.ndarray`]
+        The positional row of each event in `variants`, its position and
+        its upper-case reference base as an ASCII code, in row order.
+    """
+    values = pd.Series(np.asarray(variants, dtype=object))
+    keep = values.notna() & ~values.isin(constants.special_variants)
+    rows, positions, refs = _extract_events(values[keep], NUCLEOTIDE_EVENT_RE, "U1")
+    return rows, positions, encode(np.char.upper(refs))
+
+
+def _extract_events(values, pattern, ref_dtype):
+    values = values.astype(str)
+    if values.empty:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=ref_dtype)
+    events = values.str.extractall(pattern)
+    rows = events.index.get_level_values(0).to_numpy(dtype=np.int64)
+    positions = events["position"].to_numpy(dtype=np.int64)
+    refs = events["ref"].to_numpy(dtype=ref_dtype)
+    return rows, positions, refs
+
+
+class WildTypeIndex(object):
+    """
+    Array representation of a wild-type sequence supporting vectorized
+    reference checks. Built once per wild-type sequence so validating a
+    batch of variants is a single indexing operation and comparison instead
+    of a string lookup per variant.
+
+    Parameters
+    ----------
+    sequence : str
+        Upper-case DNA wild-type sequence.
+
+    is_coding : bool, optional.
+        Build the codon and protein arrays. The sequence length must be a
+        multiple of 3.
+
+    Attributes
+    ----------
+    bases : `np.ndarray`
+        ASCII codes of the bases, dtype uint8.
+
+    codons : `np.ndarray`, optional.
+        View of `bases` with shape (n_codons, 3).
+
+    codon_codes : `np.ndarray`, optional.
+        Codons encoded by `encode_codons`.
+
+    protein : `np.ndarray`, optional.
+        ASCII codes of the one-letter amino acids, dtype uint8.
+
+    protein_codes : `np.ndarray`, optional.
+        Three-letter amino acid codes, dtype U3.
+    """
+
+    def __init__(self, sequence, is_coding=True):
+        self.sequence = sequence
+        self.bases = encode(sequence)
+        self.codons = None
+        self.codon_codes = None
+        self.protein = None
+        self.protein_codes = None
+        if is_coding:
+            if len(self.bases) % 3 != 0:
+                raise ValueError("Length of a coding sequence must be a multiple of 3.")
+            self.codons = self.bases.reshape(-1, 3)
+            self.codon_codes = encode_codons(self.codons)
+            protein = "".join(
+                CODON_TABLE[sequence[i : i + 3]] for i in range(0, len(sequence), 3)
+            )
+            self.protein = encode(protein)
+            self.protein_codes = np.array([AA_CODES[aa] for aa in protein], dtype="U3")
+
+    def __len__(self):
+        return len(self.bases)
+
+    @property
+    def protein_length(self):
+        return 0 if self.protein is None else len(self.protein)
+
+    @staticmethod
+    def _mismatches(reference, positions, refs):
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(refs) != len(positions):
+            raise ValueError("Expected one reference per position.")
+        in_bounds = (positions >= 0) & (positions < len(reference))
+        mismatched = np.ones(len(positions), dtype=bool)
+        mismatched[in_bounds] = reference[positions[in_bounds]] != refs[in_bounds]
+        return mismatched
+
+    def base_mismatches(self, positions, refs):
+        """
+        Compares reference bases against the wild-type sequence.
+
+        Parameters
+        ----------
+        positions : array-like
+            Zero-based positions in the wild-type sequence.
+
+        refs : Union[str, Sequence[str], np.ndarray]
+            Reference base of each position, as a string with one base per
+            position or an array of ASCII codes.
+
+        Returns
+        -------
+        `np.ndarray`
+            Boolean mask which is `True` where the reference base does not
+            match the wild-type base or the position is out of bounds.
+        """
+        if not isinstance(refs, np.ndarray):
+            refs = encode(refs)
+        return self._mismatches(self.bases, positions, refs)
+
+    def aa_mismatches(self, positions, refs):
+        """
+        Compares reference amino acids against the translated wild-type
+        sequence.
+
+        Parameters
+        ----------
+        positions : array-like
+            Zero-based positions in the protein sequence.
+
+        refs : Sequence[str]
+            Three-letter code of the reference amino acid of each position.
+
+        Returns
+        -------
+        `np.ndarray`
+            Boolean mask which is `True` where the reference amino acid does
+            not match the wild-type amino acid or the position is out of
+            bounds.
+        """
+        if self.protein_codes is None:
+            raise ValueError("A non-coding sequence has no protein sequence.")
+        return self._mismatches(
+            self.protein_codes, positions, np.asarray(refs, dtype="U3")
+        )
+
+    def offset_matches(self, positions, refs, offsets, protein=False):
+        """
+        Counts the references matching the wild-type sequence for every
+        candidate offset at once, see `offset_matches`.
+
+        Parameters
+        ----------
+        positions : array-like
+            1-based positions before applying an offset.
+
+        refs : `np.ndarray`
+            Reference base of each position as ASCII codes, or three-letter
+            amino acid codes if `protein` is set.
+
+        offsets : array-like
+            Candidate offsets, in bases or codons if `protein` is set.
+
+        protein : bool, optional.
+            Compare against the translated wild-type sequence.
+
+        Returns
+        -------
+        `np.ndarray`
+            Number of matching references for each offset.
+        """
+        if protein:
+            if self.protein_codes is None:
+                raise ValueError("A non-coding sequence has no protein sequence.")
+            reference = self.protein_codes
+            refs = np.asarray(refs, dtype="U3")
+        else:
+            reference = self.bases
+            refs = np.asarray(refs, dtype=np.uint8)
+        return offset_matches(reference, positions, refs, offsets)
+        step = max(1, MAX_BLOCK_SIZE // len(positions))
+        for start in range(0, len(offsets), step):
+            block = offsets[start : start + step]
+            index = positions[np.newaxis, :] - block[:, np.newaxis] - 1
+            in_bounds = (index >= 0) & (index < len(reference))
+            np.clip(index, 0, len(reference) - 1, out=index)
+            matched = (reference[index] == refs[np.newaxis, :]) & in_bounds
+            matches[start : start + step] = matched.sum(axis=1)
+        return matches
+
+
+def offset_matches(wild_type, positions, refs, offsets):
+    """
+    Counts the references matching `wild_type` for every candidate offset at
+    once. Each offset is subtracted from the 1-based `positions` and the
+    shifted positions are compared against the wild-type array in blocks of
+    at most `MAX_BLOCK_SIZE` elements. Positions shifted out of bounds do
+    not match.
+
+    Parameters
+    ----------
+    wild_type : `np.ndarray`
+        Wild-type residue at each zero-based position.
+
+    positions : array-like
+        1-based positions before applying an offset.
+
+    refs : `np.ndarray`
+        Residue of each position, encoded like `wild_type`.
+
+    offsets : array-like
+        Candidate offsets, in units of `wild_type` residues.
+
+    Returns
+    -------
+    `np.ndarray`
+        Number of matching references for each offset.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if len(refs) != len(positions):
+        raise ValueError("Expected one reference per position.")
+
+    matches = np.zeros(len(offsets), dtype=np.int64)
+    if not len(positions) or not len(wild_type):
+        return matches
+    step = max(1, MAX_BLOCK_SIZE // len(positions))
+    for start in range(0, len(offsets), step):
+        block = offsets[start : start + step]
+        index = positions[np.newaxis, :] - block[:, np.newaxis] - 1
+        in_bounds = (index >= 0) & (index < len(wild_type))
+        np.clip(index, 0, len(wild_type) - 1, out=index)
+        matched = (wild_type[index] == refs[np.newaxis, :]) & in_bounds
+        matches[start : start + step] = matched.sum(axis=1)
+    return matches
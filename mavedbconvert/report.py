@@ -0,0 +1,309 @@
+import os
+import sys
+import json
+import time
+import platform
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from . import constants, profiling, exceptions
+
+
+__all__ = [
+    "RunReport",
+    "ErrorSummary",
+    "run_report",
+    "count",
+    "record_dataset",
+    "active_report",
+]
+
+
+# Report receiving counts. Recording is a no-op while this is None.
+_active = None
+
+
+def active_report():
+    """Returns the `RunReport` currently collecting metrics or `None`."""
+    return _active
+
+
+def count(name, n=1):
+    """
+    Adds `n` to the counter `name` of the active report, eg the number of rows
+    dropped by `filters.drop_na_rows`. Does nothing if no report is active.
+    """
+    if _active is not None:
+        _active.count(name, n)
+
+
+def record_dataset(element=None, condition=None, df_type=None, parsed=0, invalid=0):
+    """
+    Records the number of rows parsed and the number of invalid rows for a
+    converted dataset in the active report. Does nothing if no report is
+    active.
+
+    Parameters
+    ----------
+    element : str, optional.
+        Enrich2 element table, eg 'variants' or 'synonymous'.
+
+    condition : str, optional.
+        Enrich2 condition name.
+
+    df_type : str, optional.
+        Either 'scores' or 'counts'.
+
+    parsed : int
+        Number of input rows parsed.
+
+    invalid : int
+        Number of input rows that could not be parsed.
+    """
+    if _active is not None:
+        _active.record_dataset(element, condition, df_type, parsed, invalid)
+
+
+class RunReport(object):
+    """
+    Collects metrics for a single run of a converter and writes them as a
+    machine-readable JSON document.
+
+    Stage timings are taken from the active `profiling.Profiler`. If no
+    profiler is active when the report starts, one is started for the
+    duration of the report.
+
+    Parameters
+    ----------
+    path : str
+        JSON file to write the report to.
+
+    program : str, optional.
+        Name of the program the input was generated from.
+
+    src : str, optional.
+        Source file being converted.
+    """
+
+    def __init__(self, path, program=None, src=None):
+        self.path = path
+        self.program = program
+        self.src = src
+        self.counters = OrderedDict()
+        self.datasets = []
+        self.status = None
+        self.error = None
+        self.profiler = None
+        self._owns_profiler = False
+        self.elapsed = None
+        self._previous = None
+        self._started = None
+        self._wall = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.status = "failed"
+            self.error = "{}: {}".format(exc_type.__name__, exc_value)
+        self.stop()
+        self.write()
+        return False
+
+    def start(self):
+        """Makes this the active report and starts collecting stage timings."""
+        global _active
+        self._previous = _active
+        _active = self
+        self._started = time.time()
+        self._wall = time.perf_counter()
+        self.profiler = profiling.active_profiler()
+        self._owns_profiler = self.profiler is None
+        if self._owns_profiler:
+            self.profiler = profiling.Profiler()
+            self.profiler.start()
+
+    def stop(self):
+        """Stops collecting and restores the previously active report."""
+        global _active
+        self.elapsed = time.perf_counter() - self._wall
+        if self._owns_profiler:
+            self.profiler.stop()
+        if self.status is None:
+            self.status = "ok"
+        _active = self._previous
+        self._previous = None
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_dataset(
+        self, element=None, condition=None, df_type=None, parsed=0, invalid=0
+    ):
+        self.datasets.append(
+            OrderedDict(
+                [
+                    ("element", element),
+                    ("condition", condition),
+                    ("df_type", df_type),
+                    ("rows_parsed", parsed),
+                    ("rows_valid", parsed - invalid),
+                    ("rows_invalid", invalid),
+                ]
+            )
+        )
+
+    @property
+    def input_size(self):
+        if self.src is None or self.src == constants.STREAM_SRC:
+            return None
+        try:
+            return os.path.getsize(self.src)
+        except OSError:
+            return None
+
+    def to_dict(self):
+        """
+        Returns the report as a dictionary of JSON serializable values.
+
+        Returns
+        -------
+        `OrderedDict`
+        """
+        stages = OrderedDict(
+            (name, stats.to_dict()) for name, stats in self.profiler.stages.items()
+        )
+        rows_parsed = sum(d["rows_parsed"] for d in self.datasets)
+        rows_invalid = sum(d["rows_invalid"] for d in self.datasets)
+        elapsed = self.elapsed
+        if elapsed is None:
+            elapsed = time.perf_counter() - self._wall
+
+        input_size = self.input_size
+        return OrderedDict(
+            [
+                ("program", self.program),
+                ("src", self.src),
+                ("input_size", input_size),
+                ("status", self.status),
+                ("error", self.error),
+                ("started", self._started),
+                ("python", platform.python_version()),
+                ("rows_parsed", rows_parsed),
+                ("rows_valid", rows_parsed - rows_invalid),
+                ("rows_invalid", rows_invalid),
+                ("counters", self.counters),
+                ("datasets", self.datasets),
+                ("stages", stages),
+                ("elapsed", elapsed),
+                (
+                    "rows_per_second",
+                    rows_parsed / elapsed if rows_parsed and elapsed else None,
+                ),
+                (
+                    "bytes_per_second",
+                    input_size / elapsed if input_size and elapsed else None,
+                ),
+                ("peak_rss", profiling.peak_rss()),
+            ]
+        )
+
+    def write(self):
+        """Writes the report to `path` as JSON, or to stderr if `path` is '-'."""
+        if self.path == constants.STREAM_SRC:
+            json.dump(self.to_dict(), sys.stderr, indent=2)
+            sys.stderr.write("\n")
+            return
+        with open(self.path, "wt") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+
+
+class ErrorSummary(object):
+    """
+    Aggregates the errors of rows that could not be converted by error code,
+    keeping a count per code and the first few rows as samples. Logging the
+    summary emits one bounded line per code instead of a line per row; the
+    full details of every row belong in the invalid rows file.
+
+    Parameters
+    ----------
+    max_samples : int, optional.
+        Number of sample rows kept per error code.
+    """
+
+    def __init__(self, max_samples=constants.MAX_ERROR_VARIANTS):
+        self.max_samples = max_samples
+        self.counts = OrderedDict()
+        self.samples = OrderedDict()
+
+    @staticmethod
+    def error_code(error):
+        """
+        Returns the code of a `VariantError`. Errors without a code, such as
+        messages read from the variant cache, share the generic code.
+        """
+        return getattr(error, "code", exceptions.VariantError.code)
+
+    def add(self, row, error):
+        code = self.error_code(error)
+        self.counts[code] = self.counts.get(code, 0) + 1
+        samples = self.samples.setdefault(code, [])
+        if len(samples) < self.max_samples:
+            samples.append((row, error))
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def lines(self):
+        """
+        Renders one line per error code with its count and the messages of
+        the sample rows. Only sample errors are rendered.
+
+        Returns
+        -------
+        list[str]
+        """
+        lines = []
+        for code, n in self.counts.items():
+            examples = "; ".join(
+                "row '{}': {}".format(row, error) for row, error in self.samples[code]
+            )
+            if n > len(self.samples[code]):
+                examples += "; ..."
+            lines.append("{} row(s) failed with '{}'. {}".format(n, code, examples))
+        return lines
+
+    def log(self, logger, path=None):
+        """
+        Logs the summary as warnings and adds the counts per error code to
+        the active report as 'invalid_<code>' counters. `path` is the invalid
+        rows file listing every row.
+        """
+        if not self.counts:
+            return
+        logger.warning(
+            "Could not parse {} row(s). Invalid rows are listed with the "
+            "reason in {}.".format(
+                len(self), "the invalid rows file" if path is None else path
+            )
+        )
+        for line in self.lines():
+            logger.warning(line)
+        for code, n in self.counts.items():
+            count("invalid_{}".format(code), n)
+
+
+@contextmanager
+def run_report(path, program=None, src=None):
+    """
+    Collects metrics for the conversion run inside the context and writes
+    them to `path` as JSON on exit, including when the conversion fails.
+
+    Yields
+    ------
+    `RunReport`
+    """
+    with RunReport(path, program=program, src=src) as report:
+        yield report
@@ -0,0 +1,271 @@
+import os
+import re
+import json
+import logging
+from collections import OrderedDict
+
+import pandas as pd
+
+from . import (
+    LOGGER,
+    __version__,
+    constants,
+    compression,
+    filters,
+    validators,
+    writers,
+)
+
+
+logger = logging.getLogger(LOGGER)
+
+
+__all__ = [
+    "shard_bounds",
+    "shard_filename",
+    "unshard_filename",
+    "metadata_path",
+    "write_metadata",
+    "load_metadata",
+    "merge",
+]
+
+
+SHARD_SUFFIX = ".shard-{}-of-{}"
+SHARD_SUFFIX_RE = re.compile(r"\.shard-\d+-of-\d+")
+
+
+def shard_bounds(n_rows, shard):
+    """
+    Returns the first and one past the last row of the slice of `n_rows`
+    rows converted by `shard`, a tuple of the one-based shard number and the
+    number of shards. Slices are contiguous and differ in size by at most
+    one row.
+    """
+    index, count = shard
+    return n_rows * (index - 1) // count, n_rows * index // count
+
+
+def shard_filename(filename, shard):
+    """
+    Inserts the shard number into an output file name, eg
+    'mavedb_enrich.shard-1-of-4.csv' for 'mavedb_enrich.csv'.
+    """
+    root, ext = os.path.splitext(filename)
+    return root + SHARD_SUFFIX.format(*shard) + ext
+
+
+def unshard_filename(filename):
+    """Returns the name of the merged output of a shard output file."""
+    return SHARD_SUFFIX_RE.sub("", filename)
+
+
+def metadata_path(output_directory, dst_filename, shard):
+    """Returns the path of the metadata file written by a shard."""
+    root, _ = os.path.splitext(dst_filename)
+    return os.path.join(output_directory, root + SHARD_SUFFIX.format(*shard) + ".json")
+
+
+def write_metadata(program):
+    """
+    Writes the metadata of a sharded conversion by `program`, a
+    `BaseProgram`, listing the datasets and invalid rows files written by
+    the shard. The metadata is read by `merge`.
+
+    Returns
+    -------
+    str
+        Path to the metadata file.
+    """
+    path = metadata_path(program.output_directory, program.dst_filename, program.shard)
+    metadata = OrderedDict(
+        [
+            ("program", type(program).__name__.lower()),
+            ("version", __version__),
+            ("src", os.path.basename(program.src)),
+            ("shard", list(program.shard)),
+            ("slices", program.shard_slices),
+            ("output_compression", program.output_compression),
+            ("output_formats", program.output_formats),
+            ("datasets", program.datasets),
+            ("invalid_rows_files", program.invalid_rows_files),
+        ]
+    )
+    with open(path, "wt") as fh:
+        json.dump(metadata, fh, indent=2)
+    logger.info("Wrote shard metadata to {}".format(path))
+    return path
+
+
+def load_metadata(paths):
+    """
+    Loads the metadata files of every shard of a conversion, checking that
+    no shard is missing and that the shards were converted with the same
+    settings.
+
+    Returns
+    -------
+    list[dict]
+        The metadata of each shard in shard order. The directory each
+        metadata file was found in is stored under 'directory'.
+    """
+    shards = []
+    for path in paths:
+        with open(path) as fh:
+            metadata = json.load(fh)
+        metadata["directory"] = os.path.dirname(os.path.abspath(path))
+        shards.append(metadata)
+    if not shards:
+        raise ValueError("No shard metadata files to merge.")
+
+    shards.sort(key=lambda m: m["shard"][0])
+    first = shards[0]
+    keys = ("program", "version", "src", "output_compression", "output_formats")
+    for metadata in shards[1:]:
+        for key in keys:
+            if metadata[key] != first[key]:
+                raise ValueError(
+                    "Shards {} and {} were converted with different '{}' "
+                    "settings.".format(first["shard"], metadata["shard"], key)
+                )
+
+    count = first["shard"][1]
+    numbers = [m["shard"][0] for m in shards]
+    if any(m["shard"][1] != count for m in shards) or numbers != list(
+        range(1, count + 1)
+    ):
+        missing = sorted(set(range(1, count + 1)) - set(numbers))
+        raise ValueError(
+            "Expected one metadata file for each of {} shards, found shards "
+            "{}. Missing shards: {}.".format(
+                count,
+                ", ".join(map(str, numbers)),
+                ", ".join(map(str, missing)) or "none",
+            )
+        )
+
+    names = [[d["name"] for d in m["datasets"]] for m in shards]
+    if any(n != names[0] for n in names[1:]):
+        raise ValueError("Shards do not define the same output datasets.")
+    return shards
+
+
+def _read_csv(path, index_col=None):
+    with compression.open_input(path, compression.detect_compression(path)) as fh:
+        return pd.read_csv(
+            fh,
+            index_col=index_col,
+            keep_default_na=False,
+            na_values=[writers.NA_REP],
+            float_precision="round_trip",
+        )
+
+
+def _read_output(directory, files):
+    """
+    Reads a shard output, preferring the csv file and otherwise the first
+    columnar file.
+    """
+    if "csv" in files:
+        return _read_csv(os.path.join(directory, files["csv"]))
+    output_format, filename = next(iter(files.items()))
+    path = os.path.join(directory, filename)
+    if output_format == "parquet":
+        from pyarrow import parquet
+
+        table = parquet.read_table(path)
+    else:
+        from pyarrow import feather
+
+        table = feather.read_table(path)
+    # Dictionary encoded hgvs columns are read as categoricals.
+    return table.to_pandas(strings_to_categorical=False).apply(
+        lambda c: c.astype(object) if isinstance(c.dtype, pd.CategoricalDtype) else c
+    )
+
+
+def _output_path(dst, name, output_format, output_compression):
+    if output_format == "csv":
+        return os.path.join(dst, name) + compression.output_suffix(output_compression)
+    return "{}.{}".format(os.path.join(dst, os.path.splitext(name)[0]), output_format)
+
+
+def merge(paths, dst=None):
+    """
+    Merges the outputs of a sharded conversion. The outputs of each dataset
+    are concatenated in shard order, null columns are dropped and the
+    MaveDB validators are run over the merged datasets, including HGVS
+    uniqueness and, for Enrich2 HDF5 inputs, that the scores and counts of
+    each condition define the same variants. Nothing is written unless
+    every dataset passes validation.
+
+    Parameters
+    ----------
+    paths : list[str]
+        Metadata files written by each shard.
+
+    dst : str, optional.
+        Directory to write the merged outputs to. Defaults to the directory
+        of the first shard.
+
+    Returns
+    -------
+    list[str]
+        The merged output files.
+    """
+    shards = load_metadata(paths)
+    first = shards[0]
+    dst = dst or first["directory"]
+    os.makedirs(dst, exist_ok=True)
+    logger.info(
+        "Merging {} shards of {} into {}".format(len(shards), first["src"], dst)
+    )
+
+    merged = OrderedDict()
+    for i, dataset in enumerate(first["datasets"]):
+        frames = [
+            _read_output(m["directory"], m["datasets"][i]["files"]) for m in shards
+        ]
+        df = pd.concat(frames, ignore_index=True, sort=False)
+        filters.drop_na_columns(df)
+        logger.info("Validating merged dataset {}".format(dataset["name"]))
+        validators.validate_mavedb_compliance(df, df_type=dataset["df_type"])
+        merged[dataset["name"]] = (dataset, df)
+
+    groups = OrderedDict()
+    for dataset, df in merged.values():
+        if dataset.get("group") is not None:
+            groups.setdefault(dataset["group"], {})[dataset["df_type"]] = df
+    for group, dfs in groups.items():
+        if constants.score_type in dfs and constants.count_type in dfs:
+            validators.validate_datasets_define_same_variants(
+                dfs[constants.score_type], dfs[constants.count_type]
+            )
+
+    written = []
+    for name, (dataset, df) in merged.items():
+        for output_format in first["output_formats"]:
+            path = _output_path(dst, name, output_format, first["output_compression"])
+            logger.info("Writing to {}".format(path))
+            if output_format == "csv":
+                with compression.open_output(path, first["output_compression"]) as fh:
+                    writers.write_csv(df, fh)
+            else:
+                writers.write_columnar(
+                    df, path, output_format, compression=first["output_compression"]
+                )
+            written.append(path)
+
+    names = OrderedDict()
+    for metadata in shards:
+        for entry in metadata["invalid_rows_files"]:
+            path = os.path.join(metadata["directory"], entry["file"])
+            names.setdefault(entry["name"], []).append(path)
+    for name, shard_paths in names.items():
+        path = os.path.join(dst, name)
+        invalid = pd.concat([_read_csv(p, index_col=0) for p in shard_paths])
+        logger.info("Writing invalid rows to {}".format(path))
+        with open(path, "wt", newline="") as fh:
+            writers.write_csv(invalid, fh, index=True)
+        written.append(path)
+    return written
@@ -58,6 +58,30 @@ def is_null(value):
     return (not value) or constants.null_value_re.fullmatch(value) is not None
 
 
+def null_mask(values, progress=False):
+    """
+    Returns a boolean array which is `True` where `values` is null, see
+    `is_null`. Categorical columns test each category once.
+
+    Parameters
+    ----------
+    values : `pd.Series`
+        Column to test.
+
+    progress : bool, optional.
+        Show a progress bar while testing a non-categorical column. Requires
+        `tqdm.pandas` to have been called.
+    """
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        null_categories = [is_null(c) for c in values.cat.categories]
+        # Missing values have code -1, which indexes the appended `True`.
+        null_categories = np.array(null_categories + [True], dtype=bool)
+        return null_categories[values.cat.codes.to_numpy()]
+    if progress:
+        return np.asarray(values.progress_apply(is_null))
+    return np.asarray(values.apply(is_null))
+
+
 def format_column(values, astype=float):
     """
     Formats a list of values by replacing null float/int values with
@@ -83,6 +107,27 @@ def format_column(values, astype=float):
     return [none_type if is_null(v) else astype(v) for v in values]
 
 
+def excel_engine():
+    """
+    Returns the `pandas` engine used to read Excel files. The Rust based
+    `calamine` reader is used when `python-calamine` is installed and the
+    installed `pandas` supports it, otherwise `openpyxl` which `pandas` opens
+    in read-only streaming mode.
+
+    Returns
+    -------
+    str
+    """
+    try:
+        import python_calamine  # noqa: F401
+        from pandas.io.excel._base import ExcelFile
+    except ImportError:
+        return "openpyxl"
+    if "calamine" in getattr(ExcelFile, "_engines", {}):
+        return "calamine"
+    return "openpyxl"
+
+
 def is_numeric(dtype):
     """
     Returns `True` if a dtype is a subtype of a `float` or `int`.
@@ -440,3 +485,47 @@ def hgvs_columns(columns):
         if x == constants.nt_variant_col or x == constants.pro_variant_col
     ]
     return pd.Index(data_columns)
+
+
+def hgvs_categorical(values, dtype=None):
+    """
+    Stores a column of HGVS strings as a `pd.Categorical` so that each
+    distinct variant is held once and rows hold integer codes.
+
+    Parameters
+    ----------
+    values : Sequence[str]
+        HGVS strings. Missing values are stored as NaN.
+
+    dtype : `pd.CategoricalDtype`, optional.
+        Categories of a column defining the same variants, such as the
+        scores of the condition whose counts are being converted. Reusing
+        the dtype shares one dictionary of strings between both columns.
+        Variants missing from `dtype` are appended to its categories.
+
+    Returns
+    -------
+    `pd.Categorical`
+    """
+    values = pd.Series(np.asarray(values, dtype=object))
+    if dtype is None:
+        return pd.Categorical(values)
+    column = pd.Categorical(values, dtype=dtype)
+    missing = (column.codes == -1) & values.notna().to_numpy()
+    if missing.any():
+        categories = dtype.categories.append(pd.Index(values[missing].unique()))
+        column = pd.Categorical(values, categories=categories)
+    return column
+
+
+def hgvs_dtypes(df):
+    """
+    Returns the dtype of each categorical HGVS column of `df`, to pass to
+    `hgvs_categorical` when converting a dataframe defining the same
+    variants.
+    """
+    return {
+        column: df[column].dtype
+        for column in hgvs_columns(df.columns)
+        if isinstance(df[column].dtype, pd.CategoricalDtype)
+    }
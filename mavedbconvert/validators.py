@@ -1,5 +1,6 @@
 import logging
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 
 import hgvsp
 
@@ -154,6 +155,86 @@ def validate_hgvs_uniqueness(df: pd.DataFrame, cname: str) -> None:
             )
 
 
+class StreamingUniquenessValidator(object):
+    """
+    Validates HGVS uniqueness over a dataset that is converted in chunks.
+
+    Only 64-bit hashes of the primary column values seen so far are kept, so
+    memory grows by 8 bytes per variant rather than holding every HGVS
+    string. The hashes are held in sorted runs of decreasing length and a
+    run is only merged into the previous one once it is as long, so each
+    hash is merged a logarithmic number of times instead of the whole
+    history being re-sorted for every chunk.
+
+    Parameters
+    ----------
+    columns : list[str]
+        Output columns. The primary column is `hgvs_nt` if present, otherwise
+        `hgvs_pro`.
+    """
+
+    def __init__(self, columns):
+        if constants.nt_variant_col in columns:
+            self.primary_col = constants.nt_variant_col
+        else:
+            self.primary_col = constants.pro_variant_col
+        self.runs = []
+
+    def seen(self, hashes):
+        """
+        Returns a boolean mask of the `hashes` in previous chunks. Sorted
+        `hashes` are looked up fastest.
+        """
+        mask = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            index = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            mask |= run[index] == hashes
+        return mask
+
+    def add(self, unique):
+        """Adds the sorted array of distinct hashes `unique`."""
+        if not len(unique):
+            return
+        while self.runs and len(self.runs[-1]) <= len(unique):
+            unique = np.union1d(self.runs.pop(), unique)
+        self.runs.append(unique)
+
+    def validate(self, df):
+        """
+        Checks the primary column entries in `df` are unique within `df` and
+        against all previously validated chunks. Duplicate protein variants
+        are logged as a warning as in `validate_mavedb_compliance`.
+
+        Raises
+        ------
+        ValueError
+            If duplicate nucleotide variants are found.
+        """
+        values = df[self.primary_col]
+        values = values[~utilities.null_mask(values)]
+        hashes = pd.util.hash_array(values.astype(str).values)
+
+        unique, counts = np.unique(hashes, return_counts=True)
+        repeated = (counts > 1) | self.seen(unique)
+        is_dup = np.isin(hashes, unique[repeated])
+        if np.any(is_dup):
+            dups = list(OrderedDict.fromkeys(values.values[is_dup]).keys())
+            dup_error_string = ", ".join(dups[: constants.MAX_ERROR_VARIANTS])
+            if len(dups) > constants.MAX_ERROR_VARIANTS:
+                dup_error_string += ", ..."
+            error = ValueError(
+                f"found {len(dups)} duplicate HGVS strings in "
+                f"'{self.primary_col}': {dup_error_string}"
+            )
+            if self.primary_col == constants.pro_variant_col:
+                logger.warning(error)
+            else:
+                raise error
+
+        self.add(unique)
+        return df
+
+
 def validate_datasets_define_same_variants(scores_df, counts_df):
     """
     Checks if two `pd.DataFrame` objects parsed from uploaded files
@@ -178,8 +259,12 @@ def validate_datasets_define_same_variants(scores_df, counts_df):
         )
 
     if constants.nt_variant_col in scores_columns:
-        scores_nt = scores_df[constants.nt_variant_col].values
-        counts_nt = counts_df[constants.nt_variant_col].values
+        scores_nt = scores_df[constants.nt_variant_col].to_numpy(
+            dtype=object, na_value=None
+        )
+        counts_nt = counts_df[constants.nt_variant_col].to_numpy(
+            dtype=object, na_value=None
+        )
         try:
             assert_array_equal(scores_nt, counts_nt)  # Treats np.NaN as equal
         except AssertionError:
@@ -197,8 +282,12 @@ def validate_datasets_define_same_variants(scores_df, counts_df):
             )
 
     if constants.pro_variant_col in scores_columns:
-        scores_pro = scores_df[constants.pro_variant_col].values
-        counts_pro = counts_df[constants.pro_variant_col].values
+        scores_pro = scores_df[constants.pro_variant_col].to_numpy(
+            dtype=object, na_value=None
+        )
+        counts_pro = counts_df[constants.pro_variant_col].to_numpy(
+            dtype=object, na_value=None
+        )
         try:
             assert_array_equal(scores_pro, counts_pro)  # Treats np.NaN as equal
         except AssertionError:
@@ -232,14 +321,14 @@ def validate_mavedb_compliance(df, df_type):
     primary_col = None
     if has_nt_col:
         defines_nt = not all(
-            df.loc[:, constants.nt_variant_col].progress_apply(utilities.is_null)
+            utilities.null_mask(df.loc[:, constants.nt_variant_col], progress=True)
         )
         if defines_nt:
             primary_col = constants.nt_variant_col
 
     if has_pro_col and primary_col is None:
         defines_pro = not all(
-            df.loc[:, constants.pro_variant_col].progress_apply(utilities.is_null)
+            utilities.null_mask(df.loc[:, constants.pro_variant_col], progress=True)
         )
         if defines_pro:
             primary_col = constants.pro_variant_col
@@ -251,7 +340,7 @@ def validate_mavedb_compliance(df, df_type):
             )
         )
 
-    null_primary = df.loc[:, primary_col].progress_apply(utilities.is_null)
+    null_primary = utilities.null_mask(df.loc[:, primary_col], progress=True)
     if any(null_primary):
         raise ValueError(
             "Primary column (inferred as '{}') cannot "
@@ -0,0 +1,143 @@
+import os
+import hashlib
+import logging
+import sqlite3
+
+from . import LOGGER, HOMEDIR, __version__
+
+
+logger = logging.getLogger(LOGGER)
+
+
+__all__ = ["VariantCache", "parse_context"]
+
+
+DB_PATH = os.path.join(HOMEDIR, "variants.sqlite")
+
+# Number of variants inserted into the lookup table per statement.
+BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS variants (
+    context TEXT NOT NULL,
+    element TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    hgvs_nt TEXT,
+    hgvs_pro TEXT,
+    error TEXT,
+    PRIMARY KEY (context, element, variant)
+) WITHOUT ROWID
+"""
+
+
+def parse_context(wt_sequence, offset, is_coding, version=__version__):
+    """
+    Returns a key identifying the settings a variant is parsed with: a hash
+    of the wild-type sequence, the offset, whether the variants are coding
+    and the version of mavedbconvert, so that parser changes invalidate the
+    cached results.
+    """
+    wt_hash = hashlib.sha256(str(wt_sequence).upper().encode()).hexdigest()
+    return "{}:{}:{}:{}".format(wt_hash, int(offset), int(bool(is_coding)), version)
+
+
+class VariantCache(object):
+    """
+    SQLite-backed cache of parsed Enrich2 variants shared across runs. Maps
+    the parse context, element table and raw variant string to the parsed
+    `(hgvs_nt, hgvs_pro)` tuple, or the error message if the variant could
+    not be parsed.
+
+    Parameters
+    ----------
+    path : str, optional.
+        Database file. Defaults to `~/.mavedb_convert/variants.sqlite`.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        # Concurrent runs wait for each other's writes rather than failing.
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(SCHEMA)
+
+    def lookup(self, context, element, variants):
+        """
+        Looks up the cached results of `variants` in bulk.
+
+        Parameters
+        ----------
+        context : str
+            Key returned by `parse_context`.
+
+        element : str, optional.
+            Enrich2 element table, eg 'synonymous', or `None`.
+
+        variants : Iterable[str]
+            Raw variant strings.
+
+        Returns
+        -------
+        dict
+            Maps each cached variant to a tuple of `hgvs_nt`, `hgvs_pro` and
+            the error message, which is `None` for parsed variants.
+        """
+        variants = list(set(variants))
+        if not variants:
+            return {}
+        cursor = self.connection.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (variant TEXT)")
+        cursor.execute("DELETE FROM lookup")
+        for start in range(0, len(variants), BATCH_SIZE):
+            cursor.executemany(
+                "INSERT INTO lookup (variant) VALUES (?)",
+                ((v,) for v in variants[start : start + BATCH_SIZE]),
+            )
+        rows = cursor.execute(
+            "SELECT v.variant, v.hgvs_nt, v.hgvs_pro, v.error "
+            "FROM lookup AS l JOIN variants AS v ON v.variant = l.variant "
+            "WHERE v.context = ? AND v.element = ?",
+            (context, element or ""),
+        )
+        cached = {variant: (nt, pro, error) for variant, nt, pro, error in rows}
+        cursor.execute("DELETE FROM lookup")
+        self.connection.commit()
+        return cached
+
+    def store(self, context, element, results):
+        """
+        Stores parse results.
+
+        Parameters
+        ----------
+        context : str
+            Key returned by `parse_context`.
+
+        element : str, optional.
+            Enrich2 element table, eg 'synonymous', or `None`.
+
+        results : dict
+            Maps raw variants to a tuple of `hgvs_nt`, `hgvs_pro` and the
+            error message, as returned by `lookup`.
+        """
+        if not results:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO variants "
+                "(context, element, variant, hgvs_nt, hgvs_pro, error) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (context, element or "", variant, nt, pro, error)
+                    for variant, (nt, pro, error) in results.items()
+                ),
+            )
+        logger.info("Cached {} parsed variant(s) in {}".format(len(results), self.path))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM variants").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,344 @@
+import re
+
+import numpy as np
+import pandas as pd
+from fqfa.constants.iupac.protein import AA_CODES
+
+from . import reference
+
+
+__all__ = ["VariantTable"]
+
+
+# ASCII code of the unknown amino acid, written as 'Xaa'.
+UNKNOWN_AA = ord("X")
+
+# Protein prefix. Events with any other prefix are nucleotide events.
+PROTEIN_PREFIX = ord("p")
+
+# Three-letter code of each one-letter amino acid indexed by ASCII code.
+THREE_LETTER_CODES = np.full(256, "", dtype=object)
+for _aa, _code in AA_CODES.items():
+    THREE_LETTER_CODES[ord(_aa)] = _code
+THREE_LETTER_CODES[UNKNOWN_AA] = "Xaa"
+
+# Single character string of each ASCII code.
+CHARACTERS = np.array([chr(i) for i in range(256)], dtype=object)
+
+# Enrich seqID such as '3,4-L,Y' with one known amino acid, or '?', per
+# position. Positions are limited to 9 digits so they fit in an int64.
+_AA_CHARS = re.escape("".join(AA_CODES) + "".join(AA_CODES).lower() + "?")
+SEQ_ID_RE = r"\d{{1,9}}(?:,\d{{1,9}})*-[{aa}](?:,[{aa}])*".format(aa=_AA_CHARS)
+
+
+class VariantTable(object):
+    """
+    Columnar representation of a column of variants. Each substitution
+    event is a row of parallel arrays, events of the same variant being
+    contiguous, so offsets and validation apply to every event at once and
+    HGVS strings are only built by `to_hgvs` when writing the output.
+
+    Parameters
+    ----------
+    row : array-like
+        Positional index of the variant each event belongs to, in ascending
+        order.
+
+    position : array-like
+        1-based position of each event.
+
+    ref, alt : array-like
+        ASCII code of the reference and alternate base, or one-letter amino
+        acid, of each event. `0` if unknown.
+
+    prefix : array-like
+        ASCII code of the HGVS prefix of each event, eg 'c' or 'p'.
+
+    n_rows : int
+        Number of variants.
+
+    silent : array-like, optional.
+        Events which do not change the reference. Defaults to events whose
+        known reference equals the alternate.
+
+    parsed : array-like, optional.
+        Variants that could be read. Variants that could not be read have no
+        events. Defaults to every variant.
+
+    Attributes
+    ----------
+    row_offsets : `np.ndarray`
+        Events of variant `i` are `row_offsets[i]` to `row_offsets[i + 1]`.
+
+    event : `np.ndarray`
+        Index of each event within its variant.
+    """
+
+    def __init__(
+        self, row, position, ref, alt, prefix, n_rows, silent=None, parsed=None
+    ):
+        self.row = np.asarray(row, dtype=np.int64)
+        self.position = np.asarray(position, dtype=np.int64)
+        self.ref = np.asarray(ref, dtype=np.uint8)
+        self.alt = np.asarray(alt, dtype=np.uint8)
+        self.prefix = np.asarray(prefix, dtype=np.uint8)
+        self.n_rows = n_rows
+        if np.any(np.diff(self.row) < 0):
+            raise ValueError("Events must be ordered by row.")
+        if silent is None:
+            silent = (self.ref == self.alt) & (self.ref != 0)
+        self.silent = np.asarray(silent, dtype=bool)
+        if parsed is None:
+            parsed = np.ones(n_rows, dtype=bool)
+        self.parsed = np.asarray(parsed, dtype=bool)
+
+        counts = np.bincount(self.row, minlength=n_rows)
+        self.row_offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.row_offsets[1:])
+        self.event = np.arange(len(self.row)) - self.row_offsets[self.row]
+
+    def __len__(self):
+        return len(self.row)
+
+    def _replace(self, **columns):
+        values = dict(
+            row=self.row,
+            position=self.position,
+            ref=self.ref,
+            alt=self.alt,
+            prefix=self.prefix,
+            silent=self.silent,
+        )
+        values.update(columns)
+        return VariantTable(n_rows=self.n_rows, parsed=self.parsed, **values)
+
+    @classmethod
+    def substitutions(cls, positions, alt, prefix, parsed=None):
+        """
+        Creates a table with one event per variant.
+
+        Parameters
+        ----------
+        positions : array-like
+            Position of each variant. Only read for parsed variants.
+
+        alt : `np.ndarray`
+            ASCII code of the alternate of each parsed variant.
+
+        prefix : str
+            HGVS prefix of every event.
+
+        parsed : array-like, optional.
+            Variants that could be read.
+
+        Returns
+        -------
+        `VariantTable`
+        """
+        positions = np.asarray(positions)
+        if parsed is None:
+            parsed = np.ones(len(positions), dtype=bool)
+        parsed = np.asarray(parsed, dtype=bool)
+        rows = np.flatnonzero(parsed)
+        return cls(
+            row=rows,
+            position=positions[rows].astype(np.int64),
+            ref=np.zeros(len(rows), dtype=np.uint8),
+            alt=alt,
+            prefix=np.full(len(rows), ord(prefix), dtype=np.uint8),
+            n_rows=len(positions),
+            silent=np.zeros(len(rows), dtype=bool),
+            parsed=parsed,
+        )
+
+    @classmethod
+    def codon_substitutions(cls, positions, codons, parsed=None):
+        """
+        Creates a table of coding nucleotide variants with an event for each
+        base of a mutant codon.
+
+        Parameters
+        ----------
+        positions : array-like
+            1-based codon position of each variant. Only read for parsed
+            variants.
+
+        codons : Sequence[str]
+            Mutant codon of each parsed variant.
+
+        parsed : array-like, optional.
+            Variants that could be read.
+
+        Returns
+        -------
+        `VariantTable`
+        """
+        positions = np.asarray(positions)
+        if parsed is None:
+            parsed = np.ones(len(positions), dtype=bool)
+        parsed = np.asarray(parsed, dtype=bool)
+        rows = np.flatnonzero(parsed)
+        first = 3 * (positions[rows].astype(np.int64) - 1)
+        return cls(
+            row=np.repeat(rows, 3),
+            position=(first[:, np.newaxis] + np.arange(1, 4)).ravel(),
+            ref=np.zeros(3 * len(rows), dtype=np.uint8),
+            alt=reference.encode(codons),
+            prefix=np.full(3 * len(rows), ord("c"), dtype=np.uint8),
+            n_rows=len(positions),
+            silent=np.zeros(3 * len(rows), dtype=bool),
+            parsed=parsed,
+        )
+
+    @classmethod
+    def from_seq_ids(cls, seq_ids):
+        """
+        Creates a protein table from Enrich seqIDs such as '3,4-L,Y'. Unknown
+        amino acids, '?', are read as 'X'. Malformed seqIDs, including those
+        with an unknown amino acid code or with more positions than amino acids
+        or the reverse, are not parsed.
+
+        Returns
+        -------
+        `VariantTable`
+        """
+        values = pd.Series(np.asarray(seq_ids, dtype=object))
+        text = values.where(values.map(type) == str, "")
+        parsed = text.str.fullmatch(SEQ_ID_RE).fillna(False).to_numpy(dtype=bool)
+
+        # Matching seqIDs have one character per amino acid.
+        halves = [seq_id.partition("-") for seq_id in text[parsed]]
+        lengths = np.array([ps.count(",") + 1 for ps, _, _ in halves], dtype=np.int64)
+        aa_lengths = np.array([len(aas) // 2 + 1 for _, _, aas in halves])
+        same_length = lengths == aa_lengths
+        parsed[np.flatnonzero(parsed)[~same_length]] = False
+        halves = [h for h, keep in zip(halves, same_length) if keep]
+        lengths = lengths[same_length]
+
+        n_events = int(lengths.sum())
+        rows = np.repeat(np.flatnonzero(parsed), lengths)
+        positions = np.array(
+            ",".join(ps for ps, _, _ in halves).split(",") if n_events else [],
+            dtype=np.int64,
+        )
+        alt = reference.encode("".join(aas[::2] for _, _, aas in halves).upper())
+        alt = np.where(alt == ord("?"), UNKNOWN_AA, alt).astype(np.uint8)
+        return cls(
+            row=rows,
+            position=positions,
+            ref=np.zeros(n_events, dtype=np.uint8),
+            alt=alt,
+            prefix=np.full(n_events, PROTEIN_PREFIX, dtype=np.uint8),
+            n_rows=len(values),
+            silent=np.zeros(n_events, dtype=bool),
+            parsed=parsed,
+        )
+
+    def shift(self, offset):
+        """Returns a table with `offset` subtracted from every position."""
+        return self._replace(position=self.position - int(offset))
+
+    def out_of_bounds(self, length):
+        """
+        Returns a boolean mask of the events outside a sequence of `length`
+        residues.
+        """
+        return (self.position < 1) | (self.position > length)
+
+    def reference_mismatches(self, wild_type):
+        """
+        Returns a boolean mask of the events with a known reference that is
+        out of bounds or does not match `wild_type`, an array of ASCII codes
+        indexed by zero-based position.
+        """
+        mismatched = self.out_of_bounds(len(wild_type))
+        known = ~mismatched & (self.ref != 0)
+        mismatched[known] = wild_type[self.position[known] - 1] != self.ref[known]
+        return mismatched & (self.ref != 0)
+
+    def fill_reference(self, wild_type):
+        """
+        Returns a table whose references are read from `wild_type`, an array
+        of ASCII codes indexed by zero-based position. Events whose
+        alternate matches the wild-type are marked silent and events out of
+        bounds have an unknown reference.
+        """
+        in_bounds = ~self.out_of_bounds(len(wild_type))
+        ref = np.zeros(len(self), dtype=np.uint8)
+        ref[in_bounds] = wild_type[self.position[in_bounds] - 1]
+        silent = self.silent | ((ref == self.alt) & (ref != 0))
+        return self._replace(ref=ref, silent=silent)
+
+    def invalid_rows(self, mask=None):
+        """
+        Returns a boolean mask of the variants that could not be parsed or
+        have an event in the event mask `mask`.
+        """
+        invalid = ~self.parsed
+        if mask is not None:
+            invalid = invalid | (np.bincount(self.row[mask], minlength=self.n_rows) > 0)
+        return invalid
+
+    def _event_strings(self, mask):
+        position = self.position[mask].astype(str).astype(object)
+        ref, alt, silent = self.ref[mask], self.alt[mask], self.silent[mask]
+        protein = self.prefix[mask] == PROTEIN_PREFIX
+
+        events = np.empty(len(position), dtype=object)
+        p, nt = protein, ~protein
+        events[p] = THREE_LETTER_CODES[ref[p]] + position[p]
+        events[p & silent] += "="
+        events[p & ~silent] += THREE_LETTER_CODES[alt[p & ~silent]]
+        events[nt] = position[nt]
+        events[nt & silent] += "="
+        events[nt & ~silent] += (
+            CHARACTERS[ref[nt & ~silent]] + ">" + CHARACTERS[alt[nt & ~silent]]
+        )
+        return events
+
+    def _row_prefixes(self, rows):
+        # Variants take the prefix of their first event.
+        return CHARACTERS[self.prefix[self.row_offsets[rows]]]
+
+    def to_hgvs(self, valid=None):
+        """
+        Formats each variant as a HGVS string, listing repeated events once.
+
+        Parameters
+        ----------
+        valid : array-like, optional.
+            Variants to format.
+
+        Returns
+        -------
+        list
+            The HGVS string of each variant, `None` for variants that are not
+            valid, not parsed or have no events.
+        """
+        keep = self.parsed.copy()
+        if valid is not None:
+            keep &= np.asarray(valid, dtype=bool)
+        mask = keep[self.row]
+        events = pd.DataFrame(
+            {"row": self.row[mask], "event": self._event_strings(mask)}
+        ).drop_duplicates()
+
+        rows = events["row"].to_numpy()
+        text = events["event"].to_numpy()
+
+        # Join the events of each variant, adding the j-th event of every
+        # variant with more than j events at once.
+        starts = np.flatnonzero(np.diff(rows, prepend=-1))
+        counts = np.diff(np.r_[starts, len(rows)])
+        joined = text[starts]
+        for j in range(1, counts.max(initial=1)):
+            more = counts > j
+            joined[more] = joined[more] + ";" + text[starts[more] + j]
+
+        variants = np.full(self.n_rows, None, dtype=object)
+        rows = rows[starts]
+        multi = counts > 1
+        variants[rows] = self._row_prefixes(rows) + "."
+        variants[rows[~multi]] += joined[~multi]
+        variants[rows[multi]] += "[" + joined[multi] + "]"
+        return list(variants)
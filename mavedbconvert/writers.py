@@ -0,0 +1,250 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import constants
+
+
+__all__ = [
+    "write_csv",
+    "to_arrow_table",
+    "write_parquet",
+    "write_feather",
+    "write_columnar",
+]
+
+
+# Number of rows formatted and written at a time by `write_csv`.
+CSV_CHUNK_SIZE = 100000
+
+# Size of the write buffer used when opening CSV outputs.
+CSV_BUFFER_SIZE = 1 << 20
+
+# String written for missing values, matching `to_csv(na_rep=np.NaN)`.
+NA_REP = str(np.NaN)
+
+QUOTECHAR = '"'
+
+# Name of the line terminator argument of `to_csv`, renamed in pandas 1.5.
+LINE_TERMINATOR_ARG = (
+    "lineterminator"
+    if tuple(int(v) for v in pd.__version__.split(".")[:2]) >= (1, 5)
+    else "line_terminator"
+)
+
+
+def _needs_quoting(value, special):
+    return any(char in value for char in special)
+
+
+def _quote(value):
+    return QUOTECHAR + value.replace(QUOTECHAR, QUOTECHAR * 2) + QUOTECHAR
+
+
+def _format_values(values, na_rep, special):
+    """
+    Formats a 1D array as a list of CSV fields the way `pd.DataFrame.to_csv`
+    does. Numeric and boolean arrays are formatted by NumPy, which produces
+    the same shortest round-trip representation as pandas. Other arrays are
+    formatted with `str`, replacing missing values with `na_rep` and quoting
+    fields containing a special character.
+    """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+    if kind in "fiub":
+        strings = values.astype(str).astype(object)
+        if kind == "f":
+            strings[np.isnan(values)] = na_rep
+        return strings.tolist()
+
+    strings = np.array(values, dtype=object)
+    strings[pd.isna(strings)] = na_rep
+    fields = list(map(str, strings))
+    # Quoting is rare, so check the whole block at once before checking
+    # individual fields.
+    if _needs_quoting("".join(fields), special):
+        fields = [_quote(f) if _needs_quoting(f, special) else f for f in fields]
+    return fields
+
+
+def _is_supported(df, index):
+    if len(df.columns) + bool(index) < 2:
+        # The csv module quotes empty fields of single column rows.
+        return False
+    if index and isinstance(df.index, pd.MultiIndex):
+        return False
+    if isinstance(df.columns, pd.MultiIndex):
+        return False
+    return all(
+        np.asarray(df.iloc[:0, i]).dtype.kind in "fiubO"
+        for i in range(len(df.columns))
+    )
+
+
+def write_csv(
+    df,
+    fh,
+    index=False,
+    header=True,
+    na_rep=NA_REP,
+    line_terminator=os.linesep,
+    chunksize=CSV_CHUNK_SIZE,
+):
+    """
+    Writes a MaveDB dataframe to an open text file as comma separated values.
+    The output is identical to that of
+    `df.to_csv(fh, sep=",", index=index, header=header, na_rep=np.NaN)`
+    but avoids the per-cell overhead of the `csv` module: each column is
+    formatted as a block and rows are joined and written `chunksize` rows
+    at a time, bounding memory use for large datasets.
+
+    Frames pandas formats specially, such as those with date columns or a
+    multi-level index, are written with `to_csv`.
+
+    Parameters
+    ----------
+    df : `pd.DataFrame`
+        Dataframe to write.
+
+    fh : TextIO
+        Text file to write to, opened with `newline=''`.
+
+    index : bool, optional.
+        Write the index as the first column.
+
+    header : bool, optional.
+        Write the column names as the first row.
+
+    na_rep : str, optional.
+        String written for missing values.
+
+    line_terminator : str, optional.
+        String terminating each row.
+
+    chunksize : int, optional.
+        Number of rows formatted and written at a time.
+    """
+    if not _is_supported(df, index):
+        df.to_csv(
+            fh,
+            sep=",",
+            index=index,
+            header=header,
+            na_rep=na_rep,
+            **{LINE_TERMINATOR_ARG: line_terminator}
+        )
+        return
+
+    special = set(',\r\n' + QUOTECHAR + line_terminator)
+    if header:
+        labels = list(df.columns)
+        if index:
+            labels.insert(0, "" if df.index.name is None else df.index.name)
+        fh.write(",".join(_format_values(labels, "", special)) + line_terminator)
+
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start : start + chunksize]
+        columns = [
+            _format_values(chunk.iloc[:, i].to_numpy(), na_rep, special)
+            for i in range(len(chunk.columns))
+        ]
+        if index:
+            columns.insert(0, _format_values(chunk.index.to_numpy(), na_rep, special))
+        rows = map(",".join, zip(*columns))
+        fh.write(line_terminator.join(rows) + line_terminator)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "Parquet and Feather outputs require pyarrow. Install it with "
+            "'pip install pyarrow'."
+        )
+    return pyarrow
+
+
+def to_arrow_table(df):
+    """
+    Converts a MaveDB dataframe to an Arrow table. Data columns keep their
+    dtypes and the hgvs columns are dictionary encoded since variants
+    repeat across the datasets of an experiment.
+
+    Parameters
+    ----------
+    df : `pd.DataFrame`
+        MaveDB-compliant dataframe.
+
+    Returns
+    -------
+    `pyarrow.Table`
+    """
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, name in enumerate(table.column_names):
+        if name not in constants.variant_columns:
+            continue
+        column = table.column(i)
+        if pa.types.is_dictionary(column.type):
+            continue
+        if pa.types.is_null(column.type):
+            column = column.cast(pa.string())
+        table = table.set_column(i, name, column.dictionary_encode())
+    return table
+
+
+def write_parquet(df, path, compression=None):
+    """
+    Writes a MaveDB dataframe to a Parquet file.
+
+    Parameters
+    ----------
+    df : `pd.DataFrame`
+        MaveDB-compliant dataframe.
+
+    path : str
+        Output path.
+
+    compression : str, optional.
+        Parquet compression codec, eg 'zstd' or 'gzip'. Defaults to snappy.
+    """
+    from pyarrow import parquet
+
+    parquet.write_table(to_arrow_table(df), path, compression=compression or "snappy")
+
+
+def write_feather(df, path, compression=None):
+    """
+    Writes a MaveDB dataframe to a Feather (Arrow IPC) file.
+
+    Parameters
+    ----------
+    df : `pd.DataFrame`
+        MaveDB-compliant dataframe.
+
+    path : str
+        Output path.
+
+    compression : str, optional.
+        Feather compression codec, either 'zstd' or 'lz4'. Defaults to lz4.
+    """
+    from pyarrow import feather
+
+    if compression not in ("zstd", "lz4"):
+        compression = "lz4"
+    feather.write_feather(to_arrow_table(df), path, compression=compression)
+
+
+def write_columnar(df, path, output_format, compression=None):
+    """
+    Writes a MaveDB dataframe in the columnar `output_format`, either
+    'parquet' or 'feather'.
+    """
+    _pyarrow()
+    if output_format == "parquet":
+        return write_parquet(df, path, compression=compression)
+    if output_format == "feather":
+        return write_feather(df, path, compression=compression)
+    raise ValueError("'{}' is not a columnar output format.".format(output_format))
@@ -44,6 +44,11 @@ setuptools.setup(
     ],
     python_requires=">=3.6",
     install_requires=requirements,
+    extras_require={
+        "calamine": ["python-calamine"],
+        "arrow": ["pyarrow"],
+        "zstd": ["zstandard"],
+    },
     entry_points={"console_scripts": ["mavedbconvert=mavedbconvert.main:main"]},
     test_suite="tests",
 )
@@ -18,6 +18,21 @@ __all__ = [
     "test_utilities",
     "test_filters",
     "test_validators",
+    "test_profiling",
+    "test_report",
+    "test_readers",
+    "test_compression",
+    "test_writers",
+    "test_cache",
+    "test_variant_cache",
+    "test_incremental",
+    "test_sharding",
+    "test_reference",
+    "test_exceptions",
+    "test_policy",
+    "test_preflight",
+    "test_offsets",
+    "test_variant_table",
     "ProgramTestCase",
 ]
 
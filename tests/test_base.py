@@ -2,6 +2,8 @@ import os
 import unittest
 from unittest.mock import patch
 
+import pandas as pd
+
 from mavedbconvert import base, exceptions
 
 from tests import ProgramTestCase
@@ -28,6 +30,13 @@ class BaseTest(base.BaseProgram):
         input_type=None,
         sheet_name=None,
         is_coding=True,
+        csv_engine=None,
+        output_compression=None,
+        output_formats=None,
+        incremental=False,
+        shard=None,
+        preflight=True,
+        error_policy=None,
     ):
         super().__init__(
             src=src,
@@ -42,6 +51,13 @@ class BaseTest(base.BaseProgram):
             input_type=input_type,
             hgvs_column=hgvs_column,
             is_coding=is_coding,
+            csv_engine=csv_engine,
+            output_compression=output_compression,
+            output_formats=output_formats,
+            incremental=incremental,
+            shard=shard,
+            preflight=preflight,
+            error_policy=error_policy,
         )
 
     def load_input_file(self):
@@ -222,6 +238,40 @@ class TestBaseProgramValidateAgainstWTSeq(ProgramTestCase):
             self.base.one_based = False
             self.base.validate_against_wt_sequence("c.3G>A")
 
+    def test_batch_returns_errors_for_failing_variants_only(self):
+        errors = self.base.wt_sequence_errors(
+            ["c.1A>G", "_wt", "c.[1A>G;2A>G]", "c.4G>A", "c.0T>G", "c.3G>A"]
+        )
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIsInstance(errors[2], ValueError)
+        self.assertIsInstance(errors[3], IndexError)
+        self.assertIsInstance(errors[4], IndexError)
+        self.assertIsNone(errors[5])
+
+    def test_batch_skips_silent_events(self):
+        errors = self.base.wt_sequence_errors(["c.1=", "c.[2=;3G>A]", "c.[4=;1C>G]"])
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIsInstance(errors[2], exceptions.ReferenceMismatchError)
+
+    def test_batch_reports_first_failing_event(self):
+        error = self.base.wt_sequence_errors(["c.[1A>G;2C>A;4G>A]"])[0]
+        self.assertIsInstance(error, exceptions.ReferenceMismatchError)
+        self.assertEqual(error.fields["position"], 2)
+
+    def test_error_message_does_not_embed_wt_sequence(self):
+        self.base.wt_sequence = "ATG" * 100
+        error = self.base.wt_sequence_errors(["c.301A>G"])[0]
+        self.assertNotIn(self.base.wt_sequence, str(error))
+
+    def test_errors_are_structured(self):
+        errors = self.base.wt_sequence_errors(["c.1C>G", "c.4G>A"])
+        self.assertIsInstance(errors[0], exceptions.ReferenceMismatchError)
+        self.assertEqual(errors[0].fields["wt"], "A")
+        self.assertIsInstance(errors[1], exceptions.PositionOutOfBoundsError)
+        self.assertEqual(errors[1].to_record()["position"], 4)
+
 
 class TestBaseProgramValidateAgainstProteinSeq(ProgramTestCase):
     def setUp(self):
@@ -264,6 +314,42 @@ class TestBaseProgramValidateAgainstProteinSeq(ProgramTestCase):
         with self.assertRaises(IndexError):
             self.base.validate_against_protein_sequence("p.Met3Lys")
 
+    def test_batch_returns_errors_for_failing_variants_only(self):
+        errors = self.base.protein_sequence_errors(
+            ["p.Met1Lys", "p.=", "p.[Met1Lys;Met2=]", "p.Met3Lys", "p.Lys2="]
+        )
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIsInstance(errors[2], ValueError)
+        self.assertIsInstance(errors[3], IndexError)
+        self.assertIsNone(errors[4])
+
+    def test_bulk_returns_failing_rows_with_reasons(self):
+        hgvs_pro = pd.Series(
+            ["p.Met1Lys", None, "p.[Met1Lys;Met2=]", "_wt", "p.Met3Lys", "p.Lys2="],
+            index=list("abcdef"),
+        )
+        errors = self.base.protein_reference_errors(hgvs_pro)
+        self.assertListEqual(list(errors.index), ["c", "e"])
+        self.assertIsInstance(errors["c"], ValueError)
+        self.assertIn("p.[Met1Lys;Met2=]", str(errors["c"]))
+        self.assertIsInstance(errors["e"], IndexError)
+
+    def test_bulk_position_zero_is_out_of_bounds(self):
+        # Lys is the last residue, so index -1 would otherwise match.
+        errors = self.base.protein_reference_errors(pd.Series(["p.Lys0Met"]))
+        self.assertIsInstance(errors[0], exceptions.InvalidPositionError)
+
+    def test_bulk_matches_per_variant_validation(self):
+        variants = ["p.Met1Lys", "p.[Lys1Met;Lys2=]", "p.Lys2Met", "p.Met3Lys"]
+        expected = self.base.protein_sequence_errors(variants)
+        errors = self.base.protein_reference_errors(pd.Series(variants))
+        for i, error in enumerate(expected):
+            if error is None:
+                self.assertNotIn(i, errors.index)
+            else:
+                self.assertIsInstance(errors[i], type(error))
+
 
 if __name__ == "__main__":
     unittest.main()
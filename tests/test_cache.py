@@ -0,0 +1,119 @@
+import os
+import shutil
+import unittest
+
+from mavedbconvert import cache
+
+from tests import ProgramTestCase
+
+
+class TestCacheKey(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.kwargs = {"src": self.src, "wt_sequence": "ATG", "offset": 0}
+
+    def test_ignores_input_directory_and_dst(self):
+        copy_dir = os.path.join(self.data_dir, "copy")
+        os.mkdir(copy_dir)
+        copy = shutil.copy(self.src, copy_dir)
+        self.assertEqual(
+            cache.cache_key("enrich", self.kwargs),
+            cache.cache_key("enrich", dict(self.kwargs, src=copy, dst="out")),
+        )
+
+    def test_changes_with_kwargs_program_and_version(self):
+        key = cache.cache_key("enrich", self.kwargs)
+        self.assertNotEqual(key, cache.cache_key("enrich", dict(self.kwargs, offset=3)))
+        self.assertNotEqual(key, cache.cache_key("empiric", self.kwargs))
+        self.assertNotEqual(
+            key, cache.cache_key("enrich", self.kwargs, version="0.0.0")
+        )
+
+    def test_changes_with_input_contents(self):
+        key = cache.cache_key("enrich", self.kwargs)
+        with open(self.src, "at") as fh:
+            fh.write("\n")
+        self.assertNotEqual(key, cache.cache_key("enrich", self.kwargs))
+
+
+class TestResultCache(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = cache.ResultCache(
+            directory=os.path.join(self.data_dir, "cache"), max_size=1000
+        )
+        self.output_dir = os.path.join(self.data_dir, "outputs")
+        os.makedirs(os.path.join(self.output_dir, "sub"))
+
+    def write_output(self, name, size=10):
+        path = os.path.join(self.output_dir, name)
+        with open(path, "wt") as fh:
+            fh.write("x" * size)
+        return path
+
+    def test_restores_outputs(self):
+        files = [self.write_output("a.csv"), self.write_output("sub/b.csv")]
+        self.assertTrue(self.cache.put("key", self.output_dir, files))
+        restore_dir = os.path.join(self.data_dir, "restored")
+        restored = self.cache.get("key", restore_dir)
+        self.assertListEqual(
+            restored,
+            [
+                os.path.join(restore_dir, "a.csv"),
+                os.path.join(restore_dir, "sub", "b.csv"),
+            ],
+        )
+        with open(restored[1]) as fh:
+            self.assertEqual(fh.read(), "x" * 10)
+
+    def test_returns_none_on_miss(self):
+        self.assertIsNone(self.cache.get("key", self.output_dir))
+
+    def test_does_not_cache_outputs_larger_than_cache(self):
+        path = self.write_output("a.csv", size=1001)
+        self.assertFalse(self.cache.put("key", self.output_dir, [path]))
+        self.assertIsNone(self.cache.get("key", self.output_dir))
+
+    def test_evicts_least_recently_used(self):
+        path = self.write_output("a.csv", size=400)
+        for i, key in enumerate(["a", "b"]):
+            self.cache.put(key, self.output_dir, [path])
+            manifest = os.path.join(self.cache.entry_path(key), cache.MANIFEST)
+            os.utime(manifest, (i, i))
+        self.cache.get("a", self.output_dir)
+        self.cache.put("c", self.output_dir, [path])
+        self.assertListEqual(
+            sorted(key for key, _, _ in self.cache.entries()), ["a", "c"]
+        )
+        self.assertLessEqual(self.cache.size(), 1000)
+
+
+class TestCachedConvert(ProgramTestCase):
+    class Converter(object):
+        def __init__(self, output_directory):
+            self.src = "input.tsv"
+            self.output_directory = output_directory
+            self.output_files = []
+            self.n_converted = 0
+
+        def convert(self):
+            path = os.path.join(self.output_directory, "mavedb_input.csv")
+            with open(path, "wt") as fh:
+                fh.write("hgvs_nt,score\n")
+            self.output_files.append(path)
+            self.n_converted += 1
+
+    def test_converts_once(self):
+        result_cache = cache.ResultCache(directory=os.path.join(self.data_dir, "cache"))
+        converter = self.Converter(self.data_dir)
+        expected = cache.cached_convert(converter, "key", result_cache)
+        os.remove(expected[0])
+        result = cache.cached_convert(converter, "key", result_cache)
+        self.assertEqual(converter.n_converted, 1)
+        self.assertListEqual(result, expected)
+        self.assertTrue(os.path.isfile(result[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
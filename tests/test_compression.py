@@ -0,0 +1,124 @@
+import io
+import os
+import bz2
+import gzip
+import lzma
+import unittest
+
+from mavedbconvert import compression
+
+from tests import ProgramTestCase
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+CONTENT = b"seqID\tscore\n0-L\t1.5\n1-Y\t2.5\n"
+
+
+class TestDetectCompression(ProgramTestCase):
+    def write(self, name, content):
+        path = os.path.join(self.data_dir, name)
+        with open(path, "wb") as fh:
+            fh.write(content)
+        return path
+
+    def test_detects_formats_from_magic_bytes(self):
+        self.assertEqual(
+            compression.detect_compression(self.write("a", gzip.compress(CONTENT))),
+            "gzip",
+        )
+        self.assertEqual(
+            compression.detect_compression(self.write("b", bz2.compress(CONTENT))),
+            "bz2",
+        )
+        self.assertEqual(
+            compression.detect_compression(self.write("c", lzma.compress(CONTENT))),
+            "xz",
+        )
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_detects_zstd(self):
+        data = zstandard.ZstdCompressor().compress(CONTENT)
+        self.assertEqual(compression.detect_compression(self.write("d", data)), "zstd")
+
+    def test_ignores_extension(self):
+        path = self.write("plain.tsv.gz", CONTENT)
+        self.assertIsNone(compression.detect_compression(path))
+
+    def test_returns_none_for_missing_file(self):
+        self.assertIsNone(compression.detect_compression("missing.tsv.gz"))
+
+    def test_peeks_stream_without_consuming(self):
+        stream = io.BufferedReader(io.BytesIO(gzip.compress(CONTENT)))
+        self.assertEqual(compression.detect_compression(stream), "gzip")
+        self.assertEqual(gzip.decompress(stream.read()), CONTENT)
+
+
+class TestSplitCompressionExtension(unittest.TestCase):
+    def test_strips_compression_extension(self):
+        self.assertEqual(
+            compression.split_compression_extension("enrich.tsv.gz"),
+            ("enrich.tsv", "gzip"),
+        )
+        self.assertEqual(
+            compression.split_compression_extension("enrich2.h5.ZST"),
+            ("enrich2.h5", "zstd"),
+        )
+
+    def test_leaves_other_extensions(self):
+        self.assertEqual(
+            compression.split_compression_extension("enrich.tsv"),
+            ("enrich.tsv", None),
+        )
+
+
+class TestOpenInputOutput(ProgramTestCase):
+    def roundtrip(self, method):
+        path = os.path.join(
+            self.data_dir, "out.csv" + compression.output_suffix(method)
+        )
+        with compression.open_output(path, method) as fh:
+            fh.write(CONTENT.decode())
+        self.assertEqual(compression.detect_compression(path), method)
+        with compression.open_input(path, method) as fh:
+            self.assertEqual(fh.read(), CONTENT)
+        return path
+
+    def test_gzip_roundtrip(self):
+        path = self.roundtrip("gzip")
+        self.assertTrue(path.endswith(".csv.gz"))
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd_roundtrip(self):
+        path = self.roundtrip("zstd")
+        self.assertTrue(path.endswith(".csv.zst"))
+
+    def test_uncompressed_output_is_plain_text(self):
+        path = os.path.join(self.data_dir, "out.csv")
+        with compression.open_output(path, None) as fh:
+            fh.write("a,b\r\n")
+        with open(path, "rb") as fh:
+            self.assertEqual(fh.read(), b"a,b\r\n")
+
+    def test_error_unsupported_output_compression(self):
+        with self.assertRaises(ValueError):
+            compression.open_output(os.path.join(self.data_dir, "out"), "bz2")
+
+    def test_decompress_to_file(self):
+        src = os.path.join(self.data_dir, "in.xz")
+        with open(src, "wb") as fh:
+            fh.write(lzma.compress(CONTENT))
+        path = compression.decompress_to_file(src, "xz", suffix=".h5")
+        try:
+            self.assertTrue(path.endswith(".h5"))
+            with open(path, "rb") as fh:
+                self.assertEqual(fh.read(), CONTENT)
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
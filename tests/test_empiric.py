@@ -5,7 +5,9 @@ import pandas as pd
 import numpy as np
 from pandas.testing import assert_frame_equal, assert_series_equal
 
-from mavedbconvert import empiric, constants
+from fqfa.constants.translation.table import CODON_TABLE
+
+from mavedbconvert import empiric, constants, utilities
 
 from tests import ProgramTestCase
 
@@ -27,6 +29,96 @@ class TestEmpiricInit(ProgramTestCase):
             empiric.Empiric(src=self.path, wt_sequence="ATC", is_coding=False)
 
 
+class TestEmpiricResolveOneBased(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "empiric", "empiric.xlsx")
+        self.wt = "ATGAAAGGGTTTCCCCTGGACTGG" * 3
+        codons = [c for c in CODON_TABLE if CODON_TABLE[c] != "*"]
+        # Every codon but the wild-type at each position, as in a scan
+        # omitting wild-type rows.
+        rows = [
+            (i + 1, CODON_TABLE[c], c)
+            for i, wt_codon in enumerate(utilities.slicer(self.wt, 3))
+            for c in codons
+            if c != wt_codon
+        ]
+        self.df = pd.DataFrame(rows, columns=["Position", "Amino Acid", "Codon"])
+        self.df["Score"] = 1.0
+
+    def test_infers_base_from_codons(self):
+        p = empiric.Empiric(
+            src=self.path, wt_sequence=self.wt, one_based="auto", score_column="Score"
+        )
+        p.prepare_input(self.df)
+        self.assertTrue(p.one_based)
+
+    def test_infers_base_from_amino_acids(self):
+        p = empiric.Empiric(
+            src=self.path, wt_sequence=self.wt, one_based="auto", score_column="Score"
+        )
+        # One codon per amino acid other than the wild-type.
+        wt_aa = [CODON_TABLE[c] for c in utilities.slicer(self.wt, 3)]
+        wt_at_row = [wt_aa[i - 1] for i in self.df["Position"]]
+        df = self.df[self.df["Amino Acid"] != wt_at_row]
+        df = df.drop_duplicates(["Position", "Amino Acid"]).drop(columns=["Codon"])
+        df["Position"] -= 1
+        p.prepare_input(df)
+        self.assertFalse(p.one_based)
+
+
+class TestEmpiricResolveOffset(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "empiric", "empiric.xlsx")
+        self.wt = (
+            "GACGTTCCACTGCCGGCTGGTTGGGAAATGGCTAAAACTAGTTCTGGTCAGCGTTACTTC"
+            "CTGAACCACATCGACCAGACCACCACGTGGCAGGACCCGCGT"
+        )
+        codons = [c for c in CODON_TABLE if CODON_TABLE[c] != "*"]
+        # A scan of codons 5 to 29 written four codons downstream.
+        rows = [
+            (i + 5, CODON_TABLE[c], c)
+            for i, wt_codon in enumerate(utilities.slicer(self.wt, 3))
+            for c in codons
+            if c != wt_codon and 4 <= i < 29
+        ]
+        self.df = pd.DataFrame(rows, columns=["Position", "Amino Acid", "Codon"])
+        self.df["Score"] = 1.0
+
+    def test_infers_offset_from_codons(self):
+        p = empiric.Empiric(
+            src=self.path,
+            wt_sequence=self.wt,
+            offset="auto",
+            one_based=True,
+            score_column="Score",
+        )
+        df = p.prepare_input(self.df.copy())
+        self.assertEqual(p.offset, 12)
+        self.assertEqual(df["Position"].min(), 5)
+
+    def test_infers_offset_from_amino_acids(self):
+        p = empiric.Empiric(
+            src=self.path, wt_sequence=self.wt, offset="auto", score_column="Score"
+        )
+        # One codon per amino acid other than the wild-type.
+        wt_aa = [CODON_TABLE[c] for c in utilities.slicer(self.wt, 3)]
+        wt_at_row = [wt_aa[i - 5] for i in self.df["Position"]]
+        df = self.df[self.df["Amino Acid"] != wt_at_row]
+        df = df.drop_duplicates(["Position", "Amino Acid"]).drop(columns=["Codon"])
+        df["Position"] -= 1
+        p.prepare_input(df)
+        self.assertEqual(p.offset, 12)
+
+    def test_error_ambiguous_offset(self):
+        p = empiric.Empiric(
+            src=self.path, wt_sequence=self.wt, offset="auto", score_column="Score"
+        )
+        with self.assertRaises(ValueError):
+            p.prepare_input(self.df.iloc[:2].copy())
+
+
 class TestInferProEvent(unittest.TestCase):
     def test_infers_equal_event(self):
         self.assertEqual(
@@ -1,12 +1,15 @@
+import io
 import os
+import gzip
 import unittest
+from unittest.mock import patch
 
 import pandas as pd
 import numpy as np
 from pandas.testing import assert_frame_equal
 from fqfa.constants.iupac.protein import AA_CODES
 
-from mavedbconvert import enrich, constants, utilities
+from mavedbconvert import enrich, constants, utilities, exceptions, preflight
 
 from tests import ProgramTestCase
 
@@ -196,6 +199,195 @@ class TestEnrichParseInput(ProgramTestCase):
         self.assertNotIn("B", result)
 
 
+class TestEnrichErrorPolicy(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.df = pd.DataFrame(
+            {"seqID": ["0-L", "100-L", "1-Y", "0-B"], "A": [1.0, 2.0, 3.0, 4.0]}
+        )
+
+    def program(self, error_policy=None):
+        return enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="A",
+            input_type=constants.score_type,
+            error_policy=error_policy,
+        )
+
+    def test_fails_at_first_invalid_row_by_default(self):
+        with self.assertRaises(IndexError):
+            self.program().parse_input(self.df)
+
+    def test_collect_drops_and_writes_invalid_rows(self):
+        p = self.program("collect")
+        result = p.parse_input(self.df)
+        self.assertListEqual(
+            list(result[constants.pro_variant_col]), ["p.Asp1Leu", "p.Val2Tyr"]
+        )
+        path = os.path.join(self.data_dir, "enrich", "enrich_invalid_rows.csv")
+        self.assertIn(path, p.output_files)
+        invalid = pd.read_csv(path, index_col=0)
+        self.assertListEqual(list(invalid["seqID"]), ["100-L", "0-B"])
+        self.assertIn("error_code", invalid.columns)
+
+    def test_aborts_once_error_budget_spent(self):
+        with self.assertRaises(exceptions.ErrorBudgetExceeded):
+            self.program("1").parse_input(self.df)
+
+    def test_fraction_checked_at_end_of_input(self):
+        with self.assertRaises(exceptions.ErrorBudgetExceeded):
+            self.program("25%").parse_input(self.df)
+        self.program("50%").parse_input(self.df)
+
+
+class TestEnrichPreflight(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.df = pd.DataFrame(
+            {"seqID": ["0-L", "1-Y", "2-T", "3-I"], "A": [1.0, 2.0, 3.0, 4.0]}
+        )
+
+    def program(self, offset=0, **kwargs):
+        return enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            offset=offset,
+            one_based=False,
+            score_column="A",
+            input_type=constants.score_type,
+            **kwargs
+        )
+
+    @patch.object(preflight, "SAMPLE_SIZE", 2)
+    def test_samples_rows_of_valid_input(self):
+        result = self.program().run_preflight(self.df)
+        self.assertEqual(result.sample_size, 2)
+        self.assertEqual(result.n_invalid, 0)
+
+    def test_skips_inputs_smaller_than_sample(self):
+        self.assertIsNone(self.program().run_preflight(self.df))
+
+    @patch.object(preflight, "SAMPLE_SIZE", 2)
+    def test_refuses_input_with_wrong_offset(self):
+        with self.assertRaises(exceptions.PreflightError):
+            self.program(offset=-len(WT)).run_preflight(self.df)
+
+    @patch.object(preflight, "SAMPLE_SIZE", 2)
+    def test_can_be_disabled(self):
+        program = self.program(offset=-len(WT), preflight=False)
+        self.assertIsNone(program.run_preflight(self.df))
+
+
+class TestEnrichResolveOneBased(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        protein = utilities.translate_dna(WT)
+        aa_codes = sorted(set(protein))
+        seq_ids = [
+            "{}-{}".format(i, aa)
+            for i, wt_aa in enumerate(protein)
+            for aa in aa_codes
+            if aa != wt_aa
+        ]
+        self.df = pd.DataFrame({"seqID": seq_ids, "A": 1.0})
+
+    def program(self):
+        return enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            one_based="auto",
+            score_column="A",
+            input_type=constants.score_type,
+        )
+
+    def test_infers_zero_based_positions(self):
+        p = self.program()
+        self.assertTrue(p.one_based_pending)
+        p.prepare_input(self.df)
+        self.assertFalse(p.one_based)
+        self.assertFalse(p.one_based_pending)
+
+    def test_infers_one_based_positions(self):
+        p = self.program()
+        df = self.df.copy()
+        df["seqID"] = [
+            "{}-{}".format(int(s.split("-")[0]) + 1, s.split("-")[1])
+            for s in df["seqID"]
+        ]
+        p.prepare_input(df)
+        self.assertTrue(p.one_based)
+
+    def test_error_ambiguous_positions(self):
+        p = self.program()
+        df = pd.DataFrame({"seqID": ["5-L", "6-Y"], "A": 1.0})
+        with self.assertRaises(ValueError):
+            p.prepare_input(df)
+
+    def test_error_enrich2_cannot_infer_base(self):
+        from mavedbconvert import enrich2
+
+        with self.assertRaises(ValueError):
+            enrich2.Enrich2(src=self.path, wt_sequence=WT, one_based="auto")
+
+
+class TestEnrichResolveOffset(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        protein = utilities.translate_dna(WT)
+        aa_codes = sorted(set(protein))
+        # A scan of codons 5 to 29 written five codons downstream.
+        seq_ids = [
+            "{}-{}".format(i + 5, aa)
+            for i, wt_aa in enumerate(protein)
+            for aa in aa_codes
+            if aa != wt_aa and 4 <= i < 29
+        ]
+        self.df = pd.DataFrame({"seqID": seq_ids, "A": 1.0})
+
+    def program(self, **kwargs):
+        return enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            offset="auto",
+            score_column="A",
+            input_type=constants.score_type,
+            **kwargs
+        )
+
+    def test_infers_offset(self):
+        p = self.program()
+        self.assertTrue(p.offset_pending)
+        p.prepare_input(self.df)
+        self.assertEqual(p.offset, 15)
+        self.assertFalse(p.offset_pending)
+        self.assertEqual(p.parse_row("15-G"), "p.Ala11Gly")
+
+    def test_infers_offset_of_one_based_positions(self):
+        p = self.program(one_based=True)
+        df = self.df.copy()
+        df["seqID"] = [
+            "{}-{}".format(int(s.split("-")[0]) + 1, s.split("-")[1])
+            for s in df["seqID"]
+        ]
+        p.prepare_input(df)
+        self.assertEqual(p.offset, 15)
+
+    def test_error_ambiguous_offset(self):
+        p = self.program()
+        with self.assertRaises(ValueError):
+            p.prepare_input(pd.DataFrame({"seqID": ["5-L", "6-Y"], "A": 1.0}))
+
+    def test_error_offset_and_base_both_inferred(self):
+        with self.assertRaises(ValueError):
+            self.program(one_based="auto")
+
+
 class TestEnrichLoadInput(ProgramTestCase):
     def setUp(self):
         super().setUp()
@@ -269,6 +461,31 @@ class TestEnrichLoadInput(ProgramTestCase):
         )
         assert_frame_equal(result, expected)
 
+    def test_parses_only_target_sheet(self):
+        p = enrich.Enrich(
+            src=self.excel_multisheet_path,
+            wt_sequence=WT,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+            sheet_name="Sheet3",
+        )
+        with patch.object(
+            pd.ExcelFile, "parse", autospec=True, side_effect=pd.ExcelFile.parse
+        ) as parse:
+            p.load_input_file()
+        parse.assert_called_once()
+        self.assertEqual(parse.call_args[1]["sheet_name"], "Sheet3")
+
+    def test_sets_sheet_name_to_first_sheet(self):
+        p = enrich.Enrich(
+            src=self.excel_multisheet_path,
+            wt_sequence=WT,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+        )
+        p.load_input_file()
+        self.assertEqual(p.sheet_name, "Sheet1")
+
     def test_error_missing_sheet(self):
         p = enrich.Enrich(
             src=self.excel_multisheet_path,
@@ -388,5 +605,249 @@ class TestEnrichIntegration(ProgramTestCase):
         assert_frame_equal(expected, result)
 
 
+class TestEnrichCompression(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.expected = os.path.join(self.data_dir, "enrich", "enrich_expected.csv")
+
+    def test_converts_gzipped_input(self):
+        path = os.path.join(self.data_dir, "enrich", "archived.tsv.gz")
+        with open(self.path, "rb") as src, gzip.open(path, "wb") as dst:
+            dst.write(src.read())
+        p = enrich.Enrich(
+            src=path,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+        )
+        self.assertEqual(p.input_compression, "gzip")
+        self.assertEqual(p.extension, ".tsv")
+        p.convert()
+        result = pd.read_csv(
+            os.path.join(self.data_dir, "enrich", "mavedb_archived.csv")
+        )
+        assert_frame_equal(result, pd.read_csv(self.expected))
+
+    def test_writes_compressed_output(self):
+        p = enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+            output_compression="gzip",
+        )
+        p.convert()
+        self.assertTrue(p.output_file.endswith("mavedb_enrich.csv.gz"))
+        assert_frame_equal(pd.read_csv(p.output_file), pd.read_csv(self.expected))
+
+    def test_writes_each_output_format(self):
+        p = enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+            output_compression="gzip",
+            output_formats=["csv", "parquet", "feather"],
+        )
+        p.convert()
+        expected = pd.read_csv(self.expected)
+        assert_frame_equal(pd.read_csv(p.output_file), expected)
+        for output_format in ("parquet", "feather"):
+            path = os.path.join(
+                self.data_dir, "enrich", "mavedb_enrich.{}".format(output_format)
+            )
+            self.assertTrue(os.path.isfile(path))
+
+    def test_error_compressed_streaming_output(self):
+        with self.assertRaises(ValueError):
+            enrich.Enrich(
+                src="-",
+                wt_sequence=WT,
+                score_column="log2_ratio",
+                input_type=constants.score_type,
+                output_compression="gzip",
+            )
+
+
+class TestEnrichIncremental(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.output = os.path.join(self.data_dir, "enrich", "mavedb_enrich.csv")
+        self.expected = os.path.join(self.data_dir, "enrich", "enrich_expected.csv")
+
+    def convert(self):
+        p = enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+            incremental=True,
+        )
+        with patch.object(
+            enrich.Enrich, "parse_seq_ids", side_effect=p.parse_seq_ids
+        ) as parse_seq_ids:
+            p.convert()
+        return sum(len(call.args[0]) for call in parse_seq_ids.call_args_list)
+
+    def test_reparses_only_changed_rows(self):
+        n_rows = len(pd.read_csv(self.path, sep="\t"))
+        self.assertEqual(self.convert(), n_rows)
+        self.assertTrue(os.path.isfile(self.output + ".rows"))
+
+        self.assertEqual(self.convert(), 0)
+        assert_frame_equal(pd.read_csv(self.output), pd.read_csv(self.expected))
+
+        df = pd.read_csv(self.path, sep="\t")
+        df.loc[0, "log2_ratio"] += 1
+        df.to_csv(self.path, sep="\t", index=False)
+        self.assertEqual(self.convert(), 0)
+        self.assertAlmostEqual(
+            pd.read_csv(self.output)["score"][0],
+            pd.read_csv(self.expected)["score"][0] + 1,
+        )
+
+    def test_error_streaming(self):
+        with self.assertRaises(ValueError):
+            enrich.Enrich(src="-", wt_sequence=WT, incremental=True)
+
+
+class TestEnrichAllSheets(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.excel_multisheet_path = os.path.join(
+            self.data_dir, "enrich", "enrich_multisheet.xlsx"
+        )
+
+    def test_writes_one_output_per_sheet(self):
+        p = enrich.Enrich(
+            src=self.excel_multisheet_path,
+            wt_sequence=WT,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+        )
+        with self.assertRaises(ValueError):
+            p.convert_all_sheets(n_jobs=1)
+        for sheet in ("Sheet1", "Sheet3"):
+            path = os.path.join(
+                self.data_dir, "enrich", "mavedb_enrich_multisheet_{}.csv".format(sheet)
+            )
+            self.assertTrue(os.path.isfile(path))
+            expected = enrich.Enrich(
+                src=self.excel_multisheet_path,
+                wt_sequence=WT,
+                score_column="log2_ratio",
+                input_type=constants.score_type,
+                sheet_name=sheet,
+            )
+            expected = expected.parse_input(expected.load_input_file())
+            assert_frame_equal(pd.read_csv(path), expected)
+
+    def test_failed_sheet_is_isolated(self):
+        p = enrich.Enrich(
+            src=self.excel_multisheet_path,
+            wt_sequence=WT,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+        )
+        with self.assertRaisesRegex(ValueError, "1 of 3 sheets.*Sheet2"):
+            p.convert_all_sheets(n_jobs=1)
+        self.assertFalse(
+            os.path.isfile(
+                os.path.join(
+                    self.data_dir, "enrich", "mavedb_enrich_multisheet_Sheet2.csv"
+                )
+            )
+        )
+
+    def test_error_not_excel(self):
+        p = enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+        )
+        with self.assertRaises(ValueError):
+            p.convert_all_sheets()
+
+    def test_sheets_have_own_error_budget_and_invalid_rows_file(self):
+        path = os.path.join(self.data_dir, "enrich", "enrich_invalid.xlsx")
+        df = pd.read_csv(self.path, sep="\t").iloc[:2]
+        with pd.ExcelWriter(path) as writer:
+            for sheet, seq_id in (("Sheet1", "1000-L"), ("Sheet 2", "2000-L")):
+                invalid = pd.DataFrame({"seqID": [seq_id], "log2_ratio": [1.0]})
+                pd.concat([df, invalid]).to_excel(writer, sheet, index=False)
+
+        p = enrich.Enrich(
+            src=path,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+            error_policy="1",
+        )
+        outputs = p.convert_all_sheets(n_jobs=1)
+        self.assertListEqual(list(outputs), ["Sheet1", "Sheet 2"])
+        self.assertEqual(p.error_policy.errors, 0)
+        self.assertEqual(len(p.row_errors), 0)
+        for sheet, name, seq_id in (
+            ("Sheet1", "Sheet1", "1000-L"),
+            ("Sheet 2", "Sheet_2", "2000-L"),
+        ):
+            invalid_rows_path = os.path.join(
+                self.data_dir,
+                "enrich",
+                "enrich_invalid_{}_invalid_rows.csv".format(name),
+            )
+            invalid = pd.read_csv(invalid_rows_path)
+            self.assertListEqual(list(invalid["seqID"]), [seq_id])
+            self.assertEqual(len(pd.read_csv(outputs[sheet])), 2)
+
+
+class TestEnrichStreaming(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.expected = os.path.join(self.data_dir, "enrich", "enrich_expected.csv")
+
+    def convert_stream(self, chunksize, **kwargs):
+        p = enrich.Enrich(
+            src="-",
+            dst=self.data_dir,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+            **kwargs
+        )
+        p.chunksize = chunksize
+        stdout = io.StringIO()
+        with open(self.path) as stdin:
+            with patch("sys.stdin", stdin), patch("sys.stdout", stdout):
+                p.convert()
+        return stdout.getvalue()
+
+    def test_streamed_output_matches_file_output(self):
+        result = pd.read_csv(io.StringIO(self.convert_stream(chunksize=1)))
+        expected = pd.read_csv(self.expected)
+        # Streamed output always has both variant columns.
+        expected.insert(0, constants.nt_variant_col, np.nan)
+        assert_frame_equal(expected, result)
+
+    def test_writes_header_once(self):
+        output = self.convert_stream(chunksize=1)
+        self.assertEqual(output.count(constants.pro_variant_col), 1)
+
+    def test_error_skip_footer_when_streaming(self):
+        with self.assertRaises(ValueError):
+            self.convert_stream(chunksize=1, skip_footer_rows=1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import io
 import os
 import unittest
 from unittest.mock import patch
@@ -6,11 +7,11 @@ import hgvsp
 
 import numpy as np
 import pandas as pd
-from pandas.testing import assert_index_equal
+from pandas.testing import assert_index_equal, assert_frame_equal
 from fqfa.constants.translation.table import CODON_TABLE
 from fqfa.constants.iupac.protein import AA_CODES
 
-from mavedbconvert import enrich2, constants, exceptions
+from mavedbconvert import enrich2, constants, exceptions, variant_cache
 
 from tests import ProgramTestCase
 
@@ -384,6 +385,166 @@ class TestEnrich2ConvertH5Df(ProgramTestCase):
         self.assertEqual(invalid.index[0], "c.1T>G (p.Lys1Val)")
         self.assertIn("error_description", invalid.columns)
 
+    def test_validates_protein_variants_in_bulk(self):
+        self.path = os.path.join(self.data_dir, "enrich2", "enrich2.tsv")
+        self.enrich2 = enrich2.Enrich2(self.path, wt_sequence="AAA")
+        invalid_rows_path = os.path.join(
+            os.path.dirname(self.path), "enrich2_invalid_rows.csv"
+        )
+
+        df = pd.DataFrame(
+            data={"score": [1.1, 1.2]},
+            index=["c.1A>T (p.Lys1Val)", "c.1A>T (p.Met1Val)"],
+        )
+        with patch.object(
+            enrich2.base.BaseProgram,
+            "validate_against_protein_sequence",
+        ) as patched:
+            result = self.enrich2.convert_h5_df(
+                df=df, df_type=constants.score_type, element=None
+            )
+            patched.assert_not_called()
+        self.assertListEqual(list(result.index), ["c.1A>T (p.Lys1Val)"])
+
+        invalid = pd.read_csv(invalid_rows_path, sep=",", index_col=0)
+        self.assertListEqual(list(invalid.index), ["c.1A>T (p.Met1Val)"])
+        self.assertIn("Met", invalid["error_description"].values[0])
+        self.assertEqual(invalid["error_code"].values[0], "reference_mismatch")
+
+    def test_validates_nucleotide_variants_once_per_frame(self):
+        self.path = os.path.join(self.data_dir, "enrich2", "enrich2.tsv")
+        self.enrich2 = enrich2.Enrich2(self.path, wt_sequence="AAA")
+        invalid_rows_path = os.path.join(
+            os.path.dirname(self.path), "enrich2_invalid_rows.csv"
+        )
+
+        df = pd.DataFrame(
+            data={"score": [1.1, 1.2, 1.3]},
+            index=["c.1A>T (p.Lys1Val)", "c.2T>G (p.Lys1Val)", "c.3A>T (p.Lys1Asn)"],
+        )
+        with patch.object(
+            enrich2.base.BaseProgram, "validate_against_wt_sequence"
+        ) as per_row, patch.object(
+            enrich2.base.BaseProgram,
+            "wt_sequence_errors",
+            autospec=True,
+            side_effect=enrich2.base.BaseProgram.wt_sequence_errors,
+        ) as batch:
+            result = self.enrich2.convert_h5_df(
+                df=df, df_type=constants.score_type, element=None
+            )
+            per_row.assert_not_called()
+            self.assertEqual(batch.call_count, 1)
+        self.assertListEqual(
+            list(result.index), ["c.1A>T (p.Lys1Val)", "c.3A>T (p.Lys1Asn)"]
+        )
+
+        invalid = pd.read_csv(invalid_rows_path, sep=",", index_col=0)
+        self.assertListEqual(list(invalid.index), ["c.2T>G (p.Lys1Val)"])
+        self.assertEqual(invalid["error_code"].values[0], "reference_mismatch")
+
+
+class TestEnrich2Streaming(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich2", "enrich2_stream.tsv")
+
+    def convert_stream(self, variants, **kwargs):
+        pd.DataFrame(
+            {"hgvs": variants, "score": np.arange(len(variants), dtype=float)}
+        ).to_csv(self.path, sep="\t", index=False)
+        p = enrich2.Enrich2(
+            src="-",
+            dst=self.data_dir,
+            wt_sequence="AAA",
+            input_type=constants.score_type,
+            **kwargs
+        )
+        p.chunksize = 1
+        stdout = io.StringIO()
+        with open(self.path) as stdin:
+            with patch("sys.stdin", stdin), patch("sys.stdout", stdout):
+                p.convert()
+        return pd.read_csv(io.StringIO(stdout.getvalue()))
+
+    def test_skips_chunks_without_valid_rows(self):
+        result = self.convert_stream(["c.1T>G (p.Lys1Val)", "c.1A>T (p.Lys1Val)"])
+        self.assertListEqual(list(result[constants.nt_variant_col]), ["c.1A>T"])
+
+    def test_checks_error_budget_after_last_chunk(self):
+        result = self.convert_stream(
+            ["c.1T>G (p.Lys1Val)", "c.1A>T (p.Lys1Val)", "c.2A>T (p.Lys1Ile)"],
+            error_policy="50%",
+        )
+        self.assertEqual(len(result), 2)
+        with self.assertRaises(exceptions.ErrorBudgetExceeded):
+            self.convert_stream(
+                ["c.1A>T (p.Lys1Val)", "c.1T>G (p.Lys1Val)", "c.2T>G (p.Lys1Val)"],
+                error_policy="50%",
+            )
+
+    def test_writes_variant_columns_filled_after_first_chunk(self):
+        result = self.convert_stream(["p.Lys1Val", "c.1A>T (p.Lys1Ter)"])
+        self.assertListEqual(
+            list(result.columns[:2]), list(constants.variant_columns)
+        )
+        self.assertListEqual(
+            list(result[constants.nt_variant_col].isnull()), [True, False]
+        )
+        self.assertEqual(result[constants.nt_variant_col][1], "c.1A>T")
+
+    def test_error_no_valid_rows(self):
+        with self.assertRaisesRegex(ValueError, "Could not parse any variants"):
+            self.convert_stream(["c.1T>G (p.Lys1Val)", "c.2T>G (p.Lys1Val)"])
+
+
+class TestEnrich2VariantCache(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich2", "enrich2.tsv")
+        self.cache = variant_cache.VariantCache(
+            os.path.join(self.data_dir, "variants.sqlite")
+        )
+        self.enrich2 = enrich2.Enrich2(
+            self.path, wt_sequence="AAA", variant_cache=self.cache
+        )
+        self.df = pd.DataFrame(
+            data={"score": [1.1, 1.2]},
+            index=["c.1A>G (p.Lys1Glu)", "c.1T>G (p.Lys1Val)"],
+        )
+
+    def tearDown(self):
+        self.cache.close()
+        super().tearDown()
+
+    def test_empty_cache_is_populated_after_one_conversion(self):
+        self.assertEqual(len(self.cache), 0)
+        self.assertIs(self.enrich2.variant_cache, self.cache)
+        self.enrich2.convert_h5_df(self.df, element=None, df_type="scores")
+        self.assertEqual(len(self.cache), len(self.df))
+
+    def test_stores_parsed_variants_and_errors(self):
+        self.enrich2.convert_h5_df(self.df, element=None, df_type="scores")
+        cached = self.cache.lookup(self.enrich2.variant_context, None, self.df.index)
+        self.assertEqual(cached["c.1A>G (p.Lys1Glu)"], ("c.1A>G", "p.Lys1Glu", None))
+        self.assertIsNotNone(cached["c.1T>G (p.Lys1Val)"][2])
+
+    def test_warm_run_does_not_parse_cached_variants(self):
+        expected = self.enrich2.convert_h5_df(self.df, element=None, df_type="scores")
+        with patch.object(enrich2.Enrich2, "parse_row") as parse_row:
+            result = self.enrich2.convert_h5_df(
+                self.df, element=None, df_type="scores"
+            )
+        parse_row.assert_not_called()
+        assert_frame_equal(result, expected)
+
+    def test_cache_is_keyed_on_wild_type(self):
+        self.enrich2.convert_h5_df(self.df, element=None, df_type="scores")
+        other = enrich2.Enrich2(self.path, wt_sequence="AAG", variant_cache=self.cache)
+        self.assertEqual(
+            self.cache.lookup(other.variant_context, None, self.df.index), {}
+        )
+
 
 class TestEnrich2LoadInput(ProgramTestCase):
     def test_error_file_not_h5_or_tsv(self):
@@ -847,5 +1008,32 @@ class TestEnrich2Init(ProgramTestCase):
         enrich2.Enrich2(src=self.path, wt_sequence="ATC", is_coding=True, offset=-3)
 
 
+class TestEnrich2ResolveOffset(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich2", "enrich2.tsv")
+        self.wt = "ATGAAAGGGTTTCCCTAA"
+        variants = ["c.{}{}>N".format(i + 31, b) for i, b in enumerate(self.wt)]
+        self.df = pd.DataFrame({"score": range(len(variants))}, index=variants)
+
+    def test_infers_offset_from_reference_bases(self):
+        p = enrich2.Enrich2(src=self.path, wt_sequence=self.wt, offset="auto")
+        self.assertTrue(p.offset_pending)
+        estimate = p.resolve_offset(self.df)
+        self.assertEqual(estimate.offset, 30)
+        self.assertEqual(p.offset, 30)
+        self.assertFalse(p.offset_pending)
+
+    def test_keeps_given_offset(self):
+        p = enrich2.Enrich2(src=self.path, wt_sequence=self.wt, offset=3)
+        self.assertIsNone(p.resolve_offset(self.df))
+        self.assertEqual(p.offset, 3)
+
+    def test_error_no_confident_offset(self):
+        p = enrich2.Enrich2(src=self.path, wt_sequence=self.wt[::-1], offset="auto")
+        with self.assertRaises(ValueError):
+            p.resolve_offset(self.df)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -227,12 +227,29 @@ class TestEnrich2ParseInput(ProgramTestCase):
 
     @patch(
         "mavedbconvert.enrich2.drop_null",
-        side_effect=lambda scores_df, counts_df: (scores_df, counts_df),
+        side_effect=lambda scores_df, counts_df, drop_columns=True: (
+            scores_df,
+            counts_df,
+        ),
     )
     def test_calls_drop_null(self, patch):
         self.enrich2.convert()
         patch.assert_called()
 
+    def test_scores_and_counts_share_hgvs_categories(self):
+        with patch(
+            "mavedbconvert.enrich2.drop_null", side_effect=enrich2.drop_null
+        ) as drop_null:
+            self.enrich2.convert()
+        drop_null.assert_called()
+        for call in drop_null.call_args_list:
+            scores_df, counts_df = call.args[:2]
+            for column in constants.variant_columns:
+                self.assertIs(
+                    scores_df[column].cat.categories,
+                    counts_df[column].cat.categories,
+                )
+
     def test_scores_index_order_retained_in_hgvs_columns(self):
         self.enrich2.convert()
 
@@ -502,6 +519,25 @@ class TestEnrich2ParseInput(ProgramTestCase):
         self.assertNotIn("p.Ala1=", df_counts[constants.pro_variant_col])
         self.assertNotIn("p.Ala1=", df_scores[constants.pro_variant_col])
 
+    def test_sharded_run_keeps_null_columns(self):
+        self.store.close()
+        self.store = pd.HDFStore(self.path, "w")
+        scores, shared, counts, *_ = self.mock_variants_frames()
+        scores[("c1", "epsilon")] = np.nan
+        self.store["/main/variants/scores/"] = scores
+        self.store["/main/variants/scores_shared/"] = shared
+        self.store["/main/variants/counts/"] = counts
+        self.store.close()
+
+        self.enrich2 = enrich2.Enrich2(
+            self.path, wt_sequence=self.wt, offset=0, one_based=True, shard=(1, 1)
+        )
+        self.enrich2.convert()
+        path = self.files[6].replace(".csv", ".shard-1-of-1.csv")
+        df_scores = pd.read_csv(path)
+        self.assertIn("epsilon", df_scores.columns)
+        self.assertTrue(df_scores["epsilon"].isnull().all())
+
 
 class TestEnrich2ParseInputNoVariants(ProgramTestCase):
     def setUp(self):
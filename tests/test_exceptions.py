@@ -0,0 +1,74 @@
+import pickle
+import unittest
+
+from mavedbconvert import exceptions
+
+
+class TestSequenceContext(unittest.TestCase):
+    def test_brackets_offending_position(self):
+        self.assertEqual(exceptions.sequence_context("ATG", 1), "A[T]G")
+
+    def test_truncates_around_position(self):
+        sequence = "A" * 50 + "T" + "C" * 50
+        self.assertEqual(
+            exceptions.sequence_context(sequence, 50, width=3), "...AAA[T]CCC..."
+        )
+
+    def test_out_of_bounds_index_shows_nearest_end(self):
+        self.assertEqual(
+            exceptions.sequence_context("ACGTACGT", 12, width=2), "...GT[]"
+        )
+        self.assertEqual(
+            exceptions.sequence_context("ACGTACGT", -3, width=2), "[]AC..."
+        )
+
+
+class TestVariantError(unittest.TestCase):
+    def setUp(self):
+        self.sequence = "ACGT" * 1000
+        self.error = exceptions.ReferenceMismatchError(
+            variant="c.2001A>G",
+            row="c.2001A>G (p.Asp667Gly)",
+            sequence=self.sequence,
+            index=2000,
+            unit="base",
+            wt="A",
+            ref="A",
+            position=2001,
+            sequence_name="wild-type sequence",
+        )
+
+    def test_subclasses_builtin_error_types(self):
+        self.assertIsInstance(self.error, ValueError)
+        self.assertIsInstance(exceptions.PositionOutOfBoundsError(), IndexError)
+        self.assertIsInstance(exceptions.NegativePositionError(), IndexError)
+        self.assertIsInstance(exceptions.InvalidPositionError(), ValueError)
+
+    def test_renders_message_with_bounded_context(self):
+        message = str(self.error)
+        self.assertIn("c.2001A>G", message)
+        self.assertIn("[A]", message)
+        self.assertNotIn(self.sequence, message)
+        self.assertLess(len(message), 300)
+
+    def test_template_can_be_overridden(self):
+        error = exceptions.NegativePositionError(
+            row=3, template="Negative position in row {row}."
+        )
+        self.assertEqual(str(error), "Negative position in row 3.")
+
+    def test_record_contains_code_and_fields_but_not_sequence(self):
+        record = self.error.to_record()
+        self.assertEqual(record["code"], "reference_mismatch")
+        self.assertEqual(record["row"], "c.2001A>G (p.Asp667Gly)")
+        self.assertEqual(record["position"], 2001)
+        self.assertNotIn(self.sequence, record.values())
+
+    def test_pickles(self):
+        error = pickle.loads(pickle.dumps(self.error))
+        self.assertEqual(str(error), str(self.error))
+        self.assertEqual(error.code, self.error.code)
+
+
+if __name__ == "__main__":
+    unittest.main()
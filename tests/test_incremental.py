@@ -0,0 +1,79 @@
+import os
+import unittest
+
+import pandas as pd
+
+from mavedbconvert import incremental
+
+from tests import ProgramTestCase
+
+
+class TestRowHashes(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {"seqID": ["0-L", "1-Y", "0-L"], "score": [1.0, 2.0, 3.0]}
+        )
+
+    def test_depends_on_hashed_columns_only(self):
+        hashes = incremental.row_hashes(self.df, ["seqID"], "ctx")
+        self.assertEqual(hashes[0], hashes[2])
+        self.assertNotEqual(hashes[0], hashes[1])
+
+    def test_depends_on_context(self):
+        self.assertFalse(
+            (
+                incremental.row_hashes(self.df, ["seqID"], "a")
+                == incremental.row_hashes(self.df, ["seqID"], "b")
+            ).any()
+        )
+
+
+class TestParseRows(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "mavedb_enrich.csv.rows")
+        self.df = pd.DataFrame(
+            {"seqID": ["0-L", "1-Y", "2-W"], "score": [1.0, 2.0, 3.0]}
+        )
+        self.parsed = []
+
+    def parse(self, df):
+        self.parsed.extend(df["seqID"])
+        return [None] * len(df), ["p.{}".format(s) for s in df["seqID"]]
+
+    def test_parses_all_rows_without_stored_rows(self):
+        nt, pro = incremental.parse_rows(
+            self.df, ["seqID"], self.parse, self.path, "ctx"
+        )
+        self.assertListEqual(self.parsed, ["0-L", "1-Y", "2-W"])
+        self.assertListEqual(nt, [None, None, None])
+        self.assertListEqual(pro, ["p.0-L", "p.1-Y", "p.2-W"])
+        self.assertTrue(os.path.isfile(self.path))
+
+    def test_parses_only_new_or_changed_rows(self):
+        incremental.parse_rows(self.df, ["seqID"], self.parse, self.path, "ctx")
+        self.parsed = []
+        df = pd.DataFrame(
+            {"seqID": ["3-A", "1-Y", "2-F", "0-L"], "score": [0.0, 2.5, 3.0, 1.0]}
+        )
+        nt, pro = incremental.parse_rows(df, ["seqID"], self.parse, self.path, "ctx")
+        self.assertListEqual(self.parsed, ["3-A", "2-F"])
+        self.assertListEqual(nt, [None] * 4)
+        self.assertListEqual(pro, ["p.3-A", "p.1-Y", "p.2-F", "p.0-L"])
+
+    def test_reparses_rows_stored_with_other_context(self):
+        incremental.parse_rows(self.df, ["seqID"], self.parse, self.path, "ctx")
+        self.parsed = []
+        incremental.parse_rows(self.df, ["seqID"], self.parse, self.path, "other")
+        self.assertListEqual(self.parsed, ["0-L", "1-Y", "2-W"])
+
+    def test_ignores_unreadable_stored_rows(self):
+        with open(self.path, "wt") as fh:
+            fh.write("row_hash,hgvs_nt,hgvs_pro\nnot a hash,,\n")
+        self.assertIsNone(incremental.load_rows(self.path))
+        incremental.parse_rows(self.df, ["seqID"], self.parse, self.path, "ctx")
+        self.assertEqual(len(self.parsed), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import unittest
+
+import numpy as np
+
+from mavedbconvert import offsets, reference
+
+
+WT = "ATGAAAGGGTTTCCCTAA"
+
+
+class TestCandidateOffsets(unittest.TestCase):
+    def test_returns_multiples_of_step_in_range(self):
+        self.assertListEqual(
+            offsets.candidate_offsets(-7, 7, step=3).tolist(), [-6, -3, 0, 3, 6]
+        )
+        self.assertListEqual(offsets.candidate_offsets(-1, 1).tolist(), [-1, 0, 1])
+
+
+class TestInferOffset(unittest.TestCase):
+    def setUp(self):
+        self.index = reference.WildTypeIndex(WT)
+
+    def test_infers_offset_from_reference_bases(self):
+        positions = np.arange(len(WT)) + 1 + 9
+        estimate = offsets.infer_offset(self.index, positions, reference.encode(WT))
+        self.assertEqual(estimate.offset, 9)
+        self.assertEqual(estimate.fraction(9), 1.0)
+        estimate.check()
+
+    def test_only_considers_codon_offsets_when_coding(self):
+        positions = np.arange(len(WT)) + 1 + 1
+        coding = offsets.infer_offset(self.index, positions, reference.encode(WT))
+        self.assertEqual(coding.offset % 3, 0)
+        non_coding = offsets.infer_offset(
+            reference.WildTypeIndex(WT, is_coding=False),
+            positions,
+            reference.encode(WT),
+            is_coding=False,
+        )
+        self.assertEqual(non_coding.offset, 1)
+
+    def test_compares_amino_acids(self):
+        estimate = offsets.infer_offset(
+            self.index,
+            np.array([], dtype=np.int64),
+            np.array([], dtype=np.uint8),
+            aa_positions=[4, 5, 6],
+            aa_refs=["Met", "Lys", "Gly"],
+        )
+        self.assertEqual(estimate.offset, 9)
+        self.assertEqual(estimate.n_references, 3)
+
+    def test_error_without_references(self):
+        estimate = offsets.infer_offset(self.index, [], np.array([], dtype=np.uint8))
+        self.assertIsNone(estimate.offset)
+        with self.assertRaises(ValueError):
+            estimate.check()
+
+    def test_error_low_match_fraction(self):
+        positions = np.arange(len(WT)) + 1
+        estimate = offsets.infer_offset(
+            self.index, positions, reference.encode(WT[::-1])
+        )
+        with self.assertRaises(ValueError):
+            estimate.check()
+
+    def test_error_ambiguous_offset(self):
+        estimate = offsets.OffsetEstimate(
+            np.array([0, 3]), np.array([5, 5]), n_references=5
+        )
+        self.assertTrue(estimate.is_ambiguous)
+        with self.assertRaises(ValueError):
+            estimate.check()
+
+    def test_summary_reports_runner_up(self):
+        estimate = offsets.OffsetEstimate(
+            np.array([0, 3, 6]), np.array([1, 10, 4]), n_references=10
+        )
+        self.assertEqual(estimate.offset, 3)
+        self.assertEqual(estimate.runner_up, 6)
+        self.assertIn("100.0%", estimate.summary())
+        self.assertIn("next best offset 6 matches 40.0%", estimate.summary())
+
+
+class TestInferCodonOffset(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.protein = reference.encode(
+            list(rng.choice(list("ACDEFGHIKLMNPQRSTVWY"), 60))
+        )
+        self.positions, self.residues = self.scan(self.protein)
+
+    def scan(self, protein):
+        """
+        Every amino acid but the wild-type at codons 11 to 50 of `protein`,
+        written one-based seven codons downstream.
+        """
+        positions, residues = [], []
+        for i in range(10, 50):
+            for aa in set(protein) - {protein[i]}:
+                positions.append(i + 1 + 7)
+                residues.append(aa)
+        return np.array(positions), np.array(residues, dtype=np.uint8)
+
+    def test_infers_codon_offset(self):
+        estimate = offsets.infer_codon_offset(
+            self.positions, self.residues, self.protein
+        )
+        self.assertEqual(estimate.offset, 21)
+        self.assertEqual(estimate.score(21), max(estimate.scores))
+        estimate.check()
+
+    def test_infers_codon_offset_of_zero_based_positions(self):
+        estimate = offsets.infer_codon_offset(
+            self.positions - 1, self.residues, self.protein, one_based=False
+        )
+        self.assertEqual(estimate.offset, 21)
+
+    def test_only_considers_offsets_in_bounds(self):
+        estimate = offsets.infer_codon_offset(
+            self.positions, self.residues, self.protein
+        )
+        self.assertEqual(list(estimate.offsets), list(range(-9, 52, 3)))
+
+    def test_error_too_few_rows(self):
+        estimate = offsets.infer_codon_offset(
+            self.positions[:3], self.residues[:3], self.protein
+        )
+        with self.assertRaises(ValueError):
+            estimate.check()
+
+    def test_error_repeated_wild_type(self):
+        # Offsets a repeat apart agree with the wild-type equally.
+        protein = np.tile(self.protein[:15], 6)
+        positions, residues = self.scan(protein)
+        estimate = offsets.infer_codon_offset(positions, residues, protein)
+        with self.assertRaisesRegex(ValueError, "next best"):
+            estimate.check()
+
+
+class TestInferOneBased(unittest.TestCase):
+    def setUp(self):
+        self.index = reference.WildTypeIndex(WT * 10)
+        self.protein = self.index.protein
+        # Every amino acid but the wild-type at each position, as in a scan
+        # omitting wild-type rows.
+        self.positions, self.residues = [], []
+        for i, wt_aa in enumerate(self.protein):
+            for aa in set(self.protein) - {wt_aa}:
+                self.positions.append(i)
+                self.residues.append(aa)
+        self.positions = np.array(self.positions)
+        self.residues = np.array(self.residues, dtype=np.uint8)
+
+    def test_infers_base_from_bounds(self):
+        estimate = offsets.infer_one_based(
+            self.positions + 1, self.residues, self.protein
+        )
+        self.assertEqual(estimate.out_of_bounds[False], 1 * 5)
+        self.assertEqual(estimate.out_of_bounds[True], 0)
+        self.assertTrue(estimate.one_based)
+        estimate.check()
+
+    def test_infers_base_from_agreement_with_wild_type(self):
+        inner = (self.positions > 0) & (self.positions < len(self.protein) - 1)
+        estimate = offsets.infer_one_based(
+            self.positions[inner], self.residues[inner], self.protein
+        )
+        self.assertEqual(estimate.out_of_bounds, {False: 0, True: 0})
+        self.assertEqual(estimate.matches[False], 0)
+        self.assertFalse(estimate.one_based)
+
+    def test_error_in_bounds_base_without_agreement(self):
+        # Residues matching the wild-type at chance rate, as with a wrong
+        # wild-type sequence, do not support the only base in bounds.
+        rng = np.random.RandomState(0)
+        picks = rng.randint(len(self.protein), size=len(self.positions))
+        residues = self.protein[picks]
+        estimate = offsets.infer_one_based(
+            self.positions + 1, residues, self.protein
+        )
+        self.assertEqual(estimate.out_of_bounds[True], 0)
+        self.assertGreater(estimate.out_of_bounds[False], 0)
+        self.assertLess(estimate.score(True), offsets.MIN_AGREEMENT_SCORE)
+        self.assertIsNone(estimate.one_based)
+        with self.assertRaises(ValueError):
+            estimate.check()
+
+    def test_error_ambiguous_base(self):
+        inner = (self.positions > 0) & (self.positions < len(self.protein) - 1)
+        residues = np.full(inner.sum(), ord("X"), dtype=np.uint8)
+        estimate = offsets.infer_one_based(
+            self.positions[inner], residues, self.protein
+        )
+        self.assertIsNone(estimate.one_based)
+        with self.assertRaises(ValueError):
+            estimate.check()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -52,6 +52,9 @@ class TestParseSrc(ProgramTestCase):
             with self.assertRaises(ValueError):
                 parsers.parse_src(v)
 
+    def test_stdin_src_is_returned_unchanged(self):
+        self.assertEqual(parsers.parse_src("-"), "-")
+
     def test_error_file_not_found(self):
         path = os.path.join(self.data_dir, "enrich2", "missing_file.tsv")
         with self.assertRaises(FileNotFoundError):
@@ -224,6 +227,136 @@ class TestParseOffset(unittest.TestCase):
     def test_ok_non_coding_and_not_mult_of_three(self):
         self.assertEqual(-7, parsers.parse_offset("-7", coding=False))
 
+    def test_parses_auto_offset(self):
+        self.assertEqual(parsers.parse_offset("auto"), constants.AUTO_OFFSET)
+        self.assertEqual(parsers.parse_offset(" Auto "), constants.AUTO_OFFSET)
+
+    def test_error_auto_offset_with_detect_base(self):
+        with self.assertRaisesRegex(ValueError, "--detect-base"):
+            parsers.parse_offset("auto", one_based=constants.AUTO_ONE_BASED)
+
+
+class TestParseOneBased(unittest.TestCase):
+    def test_flips_zero_based(self):
+        self.assertTrue(parsers.parse_one_based(zero_based=False))
+        self.assertFalse(parsers.parse_one_based(zero_based=True))
+
+    def test_detect_base_for_enrich_and_empiric(self):
+        for program in ("enrich", "empiric"):
+            self.assertEqual(
+                parsers.parse_one_based(detect_base=True, program=program),
+                constants.AUTO_ONE_BASED,
+            )
+        with self.assertRaises(ValueError):
+            parsers.parse_one_based(detect_base=True, program="enrich2")
+
+    def test_error_zero_based_and_detect_base(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_one_based(zero_based=True, detect_base=True)
+
+
+class TestParseCsvEngine(unittest.TestCase):
+    def test_defaults_to_c(self):
+        self.assertEqual(parsers.parse_csv_engine(None), "c")
+
+    def test_parses_pyarrow(self):
+        self.assertEqual(parsers.parse_csv_engine("PyArrow"), "pyarrow")
+
+    def test_error_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_csv_engine("python")
+
+
+class TestParseCompression(unittest.TestCase):
+    def test_none_by_default(self):
+        self.assertIsNone(parsers.parse_compression(None))
+        self.assertIsNone(parsers.parse_compression("None"))
+
+    def test_parses_aliases(self):
+        self.assertEqual(parsers.parse_compression("gz"), "gzip")
+        self.assertEqual(parsers.parse_compression("ZSTD"), "zstd")
+
+    def test_error_unsupported_compression(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_compression("bz2")
+
+
+class TestParseShard(unittest.TestCase):
+    def test_parses_shard_number_and_count(self):
+        self.assertEqual(parsers.parse_shard("2/4"), (2, 4))
+        self.assertIsNone(parsers.parse_shard(None))
+
+    def test_error_malformed_shard(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_shard("2")
+        with self.assertRaises(ValueError):
+            parsers.parse_shard("a/b")
+
+    def test_error_shard_out_of_range(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_shard("0/4")
+        with self.assertRaises(ValueError):
+            parsers.parse_shard("5/4")
+
+
+class TestParseErrorPolicy(unittest.TestCase):
+    def test_normalizes_policy(self):
+        self.assertEqual(parsers.parse_error_policy(" Collect "), "collect")
+        self.assertEqual(parsers.parse_error_policy("5%"), "5%")
+        self.assertIsNone(parsers.parse_error_policy(None))
+
+    def test_error_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_error_policy("sometimes")
+
+
+class TestParseOutputFormats(unittest.TestCase):
+    def test_defaults_to_csv(self):
+        self.assertListEqual(parsers.parse_output_formats(None), ["csv"])
+
+    def test_parses_several_formats(self):
+        self.assertListEqual(
+            parsers.parse_output_formats("csv, Parquet,feather,csv"),
+            ["csv", "parquet", "feather"],
+        )
+
+    def test_error_unknown_format(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_output_formats("csv,xlsx")
+
+
+class TestParseRunOptions(unittest.TestCase):
+    def test_profile_off_by_default(self):
+        options = parsers.parse_run_options({})
+        self.assertFalse(options["profile"])
+        self.assertIsNone(options["profile_stats"])
+
+    def test_profile_stats_implies_profile(self):
+        options = parsers.parse_run_options({"--profile-stats": "run.prof"})
+        self.assertTrue(options["profile"])
+        self.assertEqual(options["profile_stats"], "run.prof")
+
+    def test_parses_report_path(self):
+        self.assertIsNone(parsers.parse_run_options({})["report"])
+        options = parsers.parse_run_options({"--report": "run.json"})
+        self.assertEqual(options["report"], "run.json")
+
+    def test_parses_all_sheets(self):
+        options = parsers.parse_run_options({})
+        self.assertFalse(options["all_sheets"])
+        self.assertEqual(options["n_jobs"], -1)
+        options = parsers.parse_run_options({"--all-sheets": True, "--n-jobs": "4"})
+        self.assertTrue(options["all_sheets"])
+        self.assertEqual(options["n_jobs"], 4)
+
+    def test_parses_no_cache(self):
+        self.assertTrue(parsers.parse_run_options({})["cache"])
+        self.assertFalse(parsers.parse_run_options({"--no-cache": True})["cache"])
+
+    def test_error_n_jobs_not_int(self):
+        with self.assertRaises(ValueError):
+            parsers.parse_run_options({"--n-jobs": "many"})
+
 
 class TestParseDocopt(unittest.TestCase):
     @staticmethod
@@ -280,6 +413,21 @@ class TestParseDocopt(unittest.TestCase):
             args = self.mock_args(program=p)
             self.assertEqual(parsers.parse_docopt(args)[0], p)
 
+    def test_variant_cache_passed_to_enrich2_only(self):
+        args = self.mock_args(program="enrich2")
+        self.assertFalse(parsers.parse_docopt(args)[1]["variant_cache"])
+        args["--variant-cache"] = True
+        self.assertTrue(parsers.parse_docopt(args)[1]["variant_cache"])
+        args = self.mock_args(program="enrich")
+        self.assertNotIn("variant_cache", parsers.parse_docopt(args)[1])
+
+    def test_error_policy_passed_to_all_programs(self):
+        for p in constants.supported_programs:
+            args = self.mock_args(program=p)
+            self.assertIsNone(parsers.parse_docopt(args)[1]["error_policy"])
+            args["--errors"] = "100"
+            self.assertEqual(parsers.parse_docopt(args)[1]["error_policy"], "100")
+
     def test_is_coding_is_flip_of_non_coding(self):
         args = self.mock_args(non_coding=False)
         _, kwargs = parsers.parse_docopt(args)
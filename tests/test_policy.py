@@ -0,0 +1,95 @@
+import unittest
+
+from mavedbconvert import policy, exceptions
+
+
+class TestParse(unittest.TestCase):
+    def test_fail_aborts_at_first_error(self):
+        p = policy.ErrorPolicy.parse("fail")
+        self.assertTrue(p.fail_fast)
+        self.assertEqual(p.max_errors, 0)
+
+    def test_collect_has_no_budget(self):
+        p = policy.ErrorPolicy.parse("Collect")
+        self.assertFalse(p.fail_fast)
+        self.assertIsNone(p.max_errors)
+        self.assertIsNone(p.max_fraction)
+
+    def test_parses_maximum_number_of_errors(self):
+        p = policy.ErrorPolicy.parse("100")
+        self.assertEqual(p.max_errors, 100)
+        self.assertIsNone(p.max_fraction)
+
+    def test_parses_percentage(self):
+        p = policy.ErrorPolicy.parse(" 5% ")
+        self.assertAlmostEqual(p.max_fraction, 0.05)
+        self.assertIsNone(p.max_errors)
+
+    def test_error_invalid_value(self):
+        for value in ("sometimes", "-1", "150%", "1.5", "%"):
+            with self.assertRaises(ValueError):
+                policy.ErrorPolicy.parse(value)
+
+
+class TestRecord(unittest.TestCase):
+    def test_counts_rows_and_errors(self):
+        p = policy.ErrorPolicy()
+        p.record()
+        p.record(errors=1, error="bad")
+        p.record(rows=3)
+        self.assertEqual(p.rows, 5)
+        self.assertEqual(p.errors, 1)
+        self.assertEqual(p.last_error, "bad")
+
+    def test_collect_never_aborts(self):
+        p = policy.ErrorPolicy.parse("collect")
+        for _ in range(10):
+            p.record(errors=1)
+        p.check(final=True)
+
+    def test_aborts_once_max_errors_exceeded(self):
+        p = policy.ErrorPolicy(max_errors=2)
+        p.record(errors=1)
+        p.record(errors=1)
+        with self.assertRaises(exceptions.ErrorBudgetExceeded):
+            p.record(errors=1, error="Reference mismatch")
+
+    def test_abort_message_includes_last_error(self):
+        p = policy.ErrorPolicy(max_errors=0)
+        with self.assertRaises(exceptions.ErrorBudgetExceeded) as context:
+            p.record(errors=1, error="Reference mismatch at 3")
+        self.assertIn("Reference mismatch at 3", str(context.exception))
+
+    def test_fraction_not_checked_before_min_rows(self):
+        p = policy.ErrorPolicy(max_fraction=0.1, min_rows=10)
+        p.record(errors=1)
+        p.record(errors=1)
+
+    def test_fraction_checked_after_min_rows(self):
+        p = policy.ErrorPolicy(max_fraction=0.1, min_rows=10)
+        p.record(rows=9)
+        with self.assertRaises(exceptions.ErrorBudgetExceeded):
+            p.record(errors=2)
+
+    def test_final_check_applies_fraction_to_short_inputs(self):
+        p = policy.ErrorPolicy(max_fraction=0.1, min_rows=10)
+        p.record(rows=3)
+        p.record(errors=1)
+        with self.assertRaises(exceptions.ErrorBudgetExceeded):
+            p.check(final=True)
+
+    def test_within_fraction_does_not_abort(self):
+        p = policy.ErrorPolicy(max_fraction=0.5, min_rows=1)
+        p.record(rows=3)
+        p.record(errors=1)
+        p.check(final=True)
+
+    def test_reset_clears_counts(self):
+        p = policy.ErrorPolicy(max_errors=1)
+        p.record(errors=1, error="bad")
+        p.reset()
+        self.assertEqual((p.rows, p.errors, p.last_error), (0, 0, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+
+import numpy as np
+
+from mavedbconvert import preflight, exceptions
+
+
+def mismatch(variant="c.1A>G"):
+    return exceptions.ReferenceMismatchError(
+        variant=variant,
+        unit="base",
+        sequence_name="wild-type sequence",
+        position=1,
+        ref="A",
+        wt="T",
+    )
+
+
+class TestVariantPositions(unittest.TestCase):
+    def test_extracts_first_position(self):
+        positions = preflight.variant_positions(
+            ["c.12A>G", "p.[Leu3Tyr;Ala4Gly]", "3,4-L,Y", 7, None, "_wt"]
+        )
+        np.testing.assert_array_equal(positions[:4], [12, 3, 3, 7])
+        self.assertTrue(np.isnan(positions[4:]).all())
+
+
+class TestStratifiedSample(unittest.TestCase):
+    def test_returns_every_row_of_small_inputs(self):
+        np.testing.assert_array_equal(
+            preflight.stratified_sample(np.arange(5.0), size=10), np.arange(5)
+        )
+
+    def test_spreads_sample_across_positions(self):
+        positions = np.repeat(np.arange(10.0), 100)
+        np.random.default_rng(1).shuffle(positions)
+        sample = preflight.stratified_sample(positions, size=20)
+        self.assertEqual(len(sample), 20)
+        self.assertEqual(len(set(sample)), 20)
+        counts = np.bincount(positions[sample].astype(int), minlength=10)
+        np.testing.assert_array_equal(counts, [2] * 10)
+
+    def test_is_deterministic(self):
+        positions = np.arange(1000.0)
+        np.testing.assert_array_equal(
+            preflight.stratified_sample(positions, size=10),
+            preflight.stratified_sample(positions, size=10),
+        )
+
+
+class TestPreflight(unittest.TestCase):
+    def test_reports_invalid_rate_and_common_errors(self):
+        result = preflight.Preflight(
+            100,
+            np.arange(4.0),
+            [("a", mismatch()), ("b", mismatch()), ("c", ValueError("x"))],
+        )
+        self.assertEqual(result.invalid_fraction, 0.75)
+        self.assertEqual(
+            result.most_common(), [("reference_mismatch", 2), ("invalid_variant", 1)]
+        )
+        self.assertIn("75.0%", result.summary())
+        self.assertIn("'reference_mismatch' (2)", result.summary())
+
+    def test_refuses_when_most_rows_fail_with_configuration_errors(self):
+        result = preflight.Preflight(
+            100, np.arange(3.0), [("a", mismatch()), ("b", mismatch())]
+        )
+        self.assertEqual(result.cause, "wild-type sequence and offset")
+        with self.assertRaises(exceptions.PreflightError):
+            result.check()
+
+    def test_continues_when_few_rows_fail(self):
+        result = preflight.Preflight(100, np.arange(4.0), [("a", mismatch())])
+        self.assertIsNone(result.cause)
+        result.check()
+
+    def test_continues_when_errors_are_not_configuration_errors(self):
+        errors = [("a", ValueError("x")), ("b", ValueError("y"))]
+        result = preflight.Preflight(100, np.arange(2.0), errors)
+        self.assertIsNone(result.cause)
+        result.check()
+
+
+class TestRun(unittest.TestCase):
+    def test_parses_sample_and_collects_errors(self):
+        rows = ["r{}".format(i) for i in range(100)]
+        parsed = []
+
+        def parse(row):
+            parsed.append(row)
+            if row == "r50":
+                raise mismatch(row)
+
+        result = preflight.run(
+            parse,
+            lambda sample: [rows[i] for i in sample],
+            ["label{}".format(i) for i in range(100)],
+            np.arange(100.0),
+            size=100,
+        )
+        self.assertEqual(len(parsed), 100)
+        self.assertEqual(result.n_invalid, 1)
+        self.assertEqual(result.errors.samples["reference_mismatch"][0][0], "label50")
+
+    def test_samples_from_pool_of_large_inputs(self):
+        values = ["c.{}A>G".format(i) for i in range(1000)]
+        result = preflight.run(
+            lambda row: None,
+            lambda sample: [values[i] for i in sample],
+            values,
+            values,
+            size=10,
+            pool_size=100,
+        )
+        self.assertEqual(result.n_rows, 1000)
+        self.assertEqual(result.sample_size, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
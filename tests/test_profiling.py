@@ -0,0 +1,110 @@
+import os
+import pstats
+import tempfile
+import unittest
+
+from mavedbconvert import profiling
+
+
+class TestStage(unittest.TestCase):
+    def test_returns_null_stage_when_profiling_is_off(self):
+        self.assertIsNone(profiling.active_profiler())
+        self.assertIs(profiling.stage("load_input_file"), profiling.NULL_STAGE)
+
+    def test_null_stage_ignores_rows(self):
+        with profiling.stage("load_input_file") as stage:
+            stage.rows = 10
+        self.assertIsNone(profiling.NULL_STAGE.rows)
+
+    def test_records_stage_in_active_profiler(self):
+        with profiling.Profiler() as profiler:
+            with profiling.stage("filters", rows=5):
+                pass
+        self.assertIn("filters", profiler.stages)
+        self.assertEqual(profiler.stages["filters"].rows, 5)
+        self.assertEqual(profiler.stages["filters"].calls, 1)
+
+    def test_rows_can_be_set_inside_block(self):
+        with profiling.Profiler() as profiler:
+            with profiling.stage("load_input_file") as stage:
+                stage.rows = 7
+        self.assertEqual(profiler.stages["load_input_file"].rows, 7)
+
+    def test_accumulates_repeated_stages(self):
+        with profiling.Profiler() as profiler:
+            for _ in range(3):
+                with profiling.stage("parse_variants", rows=2):
+                    pass
+        stats = profiler.stages["parse_variants"]
+        self.assertEqual(stats.calls, 3)
+        self.assertEqual(stats.rows, 6)
+
+    def test_records_stage_when_block_raises(self):
+        with profiling.Profiler() as profiler:
+            with self.assertRaises(ValueError):
+                with profiling.stage("validate_mavedb_compliance"):
+                    raise ValueError()
+        self.assertIn("validate_mavedb_compliance", profiler.stages)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_restores_previous_profiler_on_exit(self):
+        with profiling.Profiler() as outer:
+            with profiling.Profiler():
+                pass
+            self.assertIs(profiling.active_profiler(), outer)
+        self.assertIsNone(profiling.active_profiler())
+
+    def test_records_peak_rss(self):
+        with profiling.Profiler() as profiler:
+            with profiling.stage("to_csv"):
+                pass
+        self.assertGreater(profiler.stages["to_csv"].peak_rss, 0)
+
+    def test_rows_per_second_none_without_rows(self):
+        stats = profiling.StageStats("to_csv")
+        stats.wall_time = 1.0
+        self.assertIsNone(stats.rows_per_second)
+        stats.rows = 10
+        self.assertEqual(stats.rows_per_second, 10)
+
+    def test_summary_lists_each_stage(self):
+        with profiling.Profiler() as profiler:
+            with profiling.stage("load_input_file", rows=1):
+                pass
+            with profiling.stage("to_csv", rows=1):
+                pass
+        summary = profiler.summary()
+        self.assertIn("load_input_file", summary)
+        self.assertIn("to_csv", summary)
+        self.assertIn("total", summary)
+
+    def test_error_dump_stats_without_cprofile(self):
+        with self.assertRaises(ValueError):
+            profiling.Profiler().dump_stats("stats.prof")
+
+
+class TestProfile(unittest.TestCase):
+    def test_writes_pstats_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.prof")
+            with profiling.profile(stats_path=path):
+                sum(range(100))
+            self.assertIsInstance(pstats.Stats(path), pstats.Stats)
+
+    def test_writes_pstats_file_when_conversion_raises(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.prof")
+            with self.assertRaises(ValueError):
+                with profiling.profile(stats_path=path):
+                    raise ValueError("Conversion failed.")
+            self.assertIsInstance(pstats.Stats(path), pstats.Stats)
+
+    def test_does_not_enable_cprofile_without_path(self):
+        with profiling.profile() as profiler:
+            pass
+        self.assertIsNone(profiler.cprofile)
+
+
+if __name__ == "__main__":
+    unittest.main()
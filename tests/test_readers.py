@@ -0,0 +1,109 @@
+import os
+import gzip
+import unittest
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from mavedbconvert import readers, constants
+
+from tests import ProgramTestCase
+
+
+class TestFooterOffset(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "footer.tsv")
+
+    def write(self, content):
+        with open(self.path, "wb") as fh:
+            fh.write(content)
+
+    def test_returns_start_of_last_lines(self):
+        self.write(b"a\nb\nc\nd\n")
+        self.assertEqual(readers.footer_offset(self.path, 1), 6)
+        self.assertEqual(readers.footer_offset(self.path, 2), 4)
+
+    def test_ignores_trailing_newlines(self):
+        self.write(b"a\nb\nc\n\n\r\n")
+        self.assertEqual(readers.footer_offset(self.path, 1), 4)
+
+    def test_handles_missing_final_newline(self):
+        self.write(b"a\nb\nc")
+        self.assertEqual(readers.footer_offset(self.path, 1), 4)
+
+    def test_returns_zero_if_footer_covers_file(self):
+        self.write(b"a\nb\n")
+        self.assertEqual(readers.footer_offset(self.path, 5), 0)
+
+    def test_scans_across_blocks(self):
+        self.write(b"header\n" + b"x" * 100 + b"\nfooter\n")
+        self.assertEqual(readers.footer_offset(self.path, 1, block_size=8), 108)
+
+
+@unittest.skipUnless(readers.arrow_available(), "pyarrow is not installed")
+class TestReadCsvArrow(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.path_header_footer = os.path.join(
+            self.data_dir, "enrich", "enrich_header_footer.tsv"
+        )
+
+    def test_matches_pandas(self):
+        result = readers.read_csv_arrow(
+            self.path, na_values=constants.extra_na, required_columns=["seqID"]
+        )
+        expected = pd.read_csv(self.path, delimiter="\t", na_values=constants.extra_na)
+        assert_frame_equal(result, expected)
+
+    def test_skips_header_and_footer(self):
+        result = readers.read_csv_arrow(
+            self.path_header_footer,
+            skip_header_rows=2,
+            skip_footer_rows=1,
+            na_values=constants.extra_na,
+            required_columns=["seqID"],
+        )
+        expected = pd.read_csv(self.path, delimiter="\t", na_values=constants.extra_na)
+        assert_frame_equal(result, expected)
+
+    def test_reads_compressed_with_header_and_footer(self):
+        path = self.path_header_footer + ".gz"
+        with open(self.path_header_footer, "rb") as src, gzip.open(path, "wb") as dst:
+            dst.write(src.read())
+        for method in ("gzip", None):
+            result = readers.read_csv_arrow(
+                path if method else self.path_header_footer,
+                skip_header_rows=2,
+                skip_footer_rows=1,
+                na_values=constants.extra_na,
+                required_columns=["seqID"],
+                compression=method,
+            )
+            expected = pd.read_csv(
+                self.path, delimiter="\t", na_values=constants.extra_na
+            )
+            assert_frame_equal(result, expected)
+
+    def test_drops_non_numeric_columns_not_required(self):
+        path = os.path.join(self.data_dir, "mixed.tsv")
+        pd.DataFrame(
+            {"seqID": ["0-L", "1-Y"], "note": ["a", "b"], "score": [1.0, 2.0]}
+        ).to_csv(path, sep="\t", index=False)
+        result = readers.read_csv_arrow(path, required_columns=["seqID"])
+        self.assertListEqual(list(result.columns), ["seqID", "score"])
+
+    def test_extra_na_values_are_null(self):
+        path = os.path.join(self.data_dir, "na.tsv")
+        with open(path, "wt") as fh:
+            fh.write("seqID\tscore\tcount\n0-L\tundefined\tNone\n1-Y\t1.5\tNone\n")
+        result = readers.read_csv_arrow(
+            path, na_values=constants.extra_na, required_columns=["seqID"]
+        )
+        expected = pd.read_csv(path, delimiter="\t", na_values=constants.extra_na)
+        assert_frame_equal(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
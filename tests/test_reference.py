@@ -0,0 +1,135 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from mavedbconvert import reference
+
+
+class TestWildTypeIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = reference.WildTypeIndex("ATGAAATAA")
+
+    def test_builds_base_codon_and_protein_arrays(self):
+        self.assertEqual(self.index.bases.dtype, np.uint8)
+        self.assertEqual(self.index.bases.tobytes(), b"ATGAAATAA")
+        self.assertEqual(self.index.codons.shape, (3, 3))
+        self.assertEqual(self.index.codons[1].tobytes(), b"AAA")
+        self.assertEqual(self.index.protein.tobytes(), b"MK*")
+        self.assertListEqual(list(self.index.protein_codes), ["Met", "Lys", "Ter"])
+
+    def test_non_coding_has_no_protein(self):
+        index = reference.WildTypeIndex("ATGA", is_coding=False)
+        self.assertIsNone(index.codons)
+        self.assertIsNone(index.protein)
+        self.assertEqual(index.protein_length, 0)
+        with self.assertRaises(ValueError):
+            index.aa_mismatches([0], ["Met"])
+
+    def test_error_coding_length_not_multiple_of_three(self):
+        with self.assertRaises(ValueError):
+            reference.WildTypeIndex("ATGA")
+
+    def test_base_mismatches(self):
+        mask = self.index.base_mismatches([0, 1, 2, 3], "ATCA")
+        self.assertListEqual(mask.tolist(), [False, False, True, False])
+
+    def test_base_mismatches_accepts_sequence_of_bases(self):
+        mask = self.index.base_mismatches(np.array([8, 0]), ["A", "T"])
+        self.assertListEqual(mask.tolist(), [False, True])
+
+    def test_out_of_bounds_positions_are_mismatches(self):
+        mask = self.index.base_mismatches([-1, 9, 0], "AAA")
+        self.assertListEqual(mask.tolist(), [True, True, False])
+
+    def test_aa_mismatches(self):
+        mask = self.index.aa_mismatches(
+            [0, 1, 2, 3, -1], ["Met", "Met", "Ter", "Met", "Met"]
+        )
+        self.assertListEqual(mask.tolist(), [False, True, False, True, True])
+
+    def test_empty_batch(self):
+        self.assertEqual(len(self.index.base_mismatches([], "")), 0)
+        self.assertEqual(len(self.index.aa_mismatches([], [])), 0)
+
+    def test_error_one_reference_per_position(self):
+        with self.assertRaises(ValueError):
+            self.index.base_mismatches([0, 1], "A")
+
+
+class TestExtractProteinEvents(unittest.TestCase):
+    def test_extracts_position_and_reference_of_each_event(self):
+        rows, positions, refs = reference.extract_protein_events(
+            ["p.[Met1Lys;Lys2=]", "p.Met3Lys", "(p.Ter4Lys)"]
+        )
+        self.assertListEqual(rows.tolist(), [0, 0, 1, 2])
+        self.assertListEqual(positions.tolist(), [1, 2, 3, 4])
+        self.assertListEqual(refs.tolist(), ["Met", "Lys", "Met", "Ter"])
+
+    def test_skips_missing_special_and_synonymous_variants(self):
+        rows, _, _ = reference.extract_protein_events(
+            [None, "_wt", "_sy", "p.=", "p.Met1Lys"]
+        )
+        self.assertListEqual(rows.tolist(), [4])
+
+    def test_empty_column(self):
+        rows, positions, refs = reference.extract_protein_events([])
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(len(positions), 0)
+        self.assertEqual(len(refs), 0)
+
+
+class TestEncodeCodons(unittest.TestCase):
+    def test_encodes_strings_and_ascii_codes_alike(self):
+        index = reference.WildTypeIndex("ATGAAATAA")
+        codes = reference.encode_codons(["ATG", "AAA", "TAA"])
+        self.assertListEqual(codes.tolist(), index.codon_codes.tolist())
+        self.assertEqual(len(set(codes.tolist())), 3)
+
+
+class TestExtractNucleotideEvents(unittest.TestCase):
+    def test_extracts_position_and_reference_of_each_event(self):
+        rows, positions, refs = reference.extract_nucleotide_events(
+            ["c.[1A>G;2t>C]", "c.3G>A (p.Met1Ile), c.5A>T (p.Lys2Ile)", "p.Met1Lys"]
+        )
+        self.assertListEqual(rows.tolist(), [0, 0, 1, 1])
+        self.assertListEqual(positions.tolist(), [1, 2, 3, 5])
+        self.assertListEqual(refs.tolist(), list(b"ATGA"))
+
+    def test_skips_missing_and_special_variants(self):
+        rows, _, refs = reference.extract_nucleotide_events([None, "_wt", "c.1A>G"])
+        self.assertListEqual(rows.tolist(), [2])
+        self.assertEqual(refs.dtype, np.uint8)
+
+
+class TestOffsetMatches(unittest.TestCase):
+    def setUp(self):
+        self.index = reference.WildTypeIndex("ATGAAAGGG")
+
+    def test_counts_matches_for_each_offset(self):
+        matches = self.index.offset_matches(
+            [11, 12, 13], reference.encode("ATG"), [-1, 0, 10]
+        )
+        self.assertListEqual(matches.tolist(), [0, 0, 3])
+
+    def test_out_of_bounds_positions_do_not_match(self):
+        matches = self.index.offset_matches([1, 9], reference.encode("AG"), [0, 5])
+        self.assertListEqual(matches.tolist(), [2, 0])
+
+    def test_compares_amino_acids(self):
+        matches = self.index.offset_matches(
+            [2, 3], ["Lys", "Gly"], [0, 1], protein=True
+        )
+        self.assertListEqual(matches.tolist(), [2, 0])
+
+    def test_matches_in_blocks(self):
+        args = ([11, 12, 13], reference.encode("ATG"), np.arange(20))
+        expected = self.index.offset_matches(*args)
+        with patch.object(reference, "MAX_BLOCK_SIZE", 2):
+            matches = self.index.offset_matches(*args)
+        self.assertListEqual(matches.tolist(), expected.tolist())
+        self.assertEqual(matches[10], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
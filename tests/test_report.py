@@ -0,0 +1,156 @@
+import os
+import json
+import tempfile
+import logging
+import unittest
+from logging.handlers import QueueHandler
+from unittest.mock import MagicMock
+
+from mavedbconvert import report, profiling, exceptions, LOGGER, LOG_LISTENER
+
+
+class TestRunReport(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "report.json")
+        self.src = os.path.join(self._tmp.name, "input.tsv")
+        with open(self.src, "wt") as fh:
+            fh.write("seqID\tscore\n0-L\t1.0\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def load(self):
+        with open(self.path) as fh:
+            return json.load(fh)
+
+    def test_recording_is_noop_without_active_report(self):
+        self.assertIsNone(report.active_report())
+        report.count("rows_dropped_na", 2)
+        report.record_dataset(parsed=10)
+
+    def test_writes_json_on_exit(self):
+        with report.run_report(self.path, program="enrich", src=self.src):
+            pass
+        result = self.load()
+        self.assertEqual(result["program"], "enrich")
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["input_size"], os.path.getsize(self.src))
+
+    def test_records_datasets_and_totals(self):
+        with report.run_report(self.path):
+            report.record_dataset(
+                element="variants", condition="c1", df_type="scores", parsed=10
+            )
+            report.record_dataset(
+                element="variants",
+                condition="c1",
+                df_type="counts",
+                parsed=10,
+                invalid=2,
+            )
+        result = self.load()
+        self.assertEqual(len(result["datasets"]), 2)
+        self.assertEqual(result["datasets"][1]["rows_valid"], 8)
+        self.assertEqual(result["datasets"][1]["condition"], "c1")
+        self.assertEqual(result["rows_parsed"], 20)
+        self.assertEqual(result["rows_invalid"], 2)
+
+    def test_accumulates_counters(self):
+        with report.run_report(self.path):
+            report.count("rows_dropped_na", 2)
+            report.count("rows_dropped_na", 3)
+        self.assertEqual(self.load()["counters"]["rows_dropped_na"], 5)
+
+    def test_includes_stage_timings(self):
+        with report.run_report(self.path):
+            with profiling.stage("filters", rows=4):
+                pass
+        stages = self.load()["stages"]
+        self.assertIn("filters", stages)
+        self.assertEqual(stages["filters"]["rows"], 4)
+
+    def test_uses_active_profiler(self):
+        with profiling.Profiler() as profiler:
+            with report.run_report(self.path) as run:
+                self.assertIs(run.profiler, profiler)
+            self.assertIs(profiling.active_profiler(), profiler)
+
+    def test_stops_own_profiler_on_exit(self):
+        with report.run_report(self.path):
+            self.assertIsNotNone(profiling.active_profiler())
+        self.assertIsNone(profiling.active_profiler())
+        self.assertIsNone(report.active_report())
+
+    def test_writes_failed_status_on_error(self):
+        with self.assertRaises(ValueError):
+            with report.run_report(self.path):
+                raise ValueError("bad offset")
+        result = self.load()
+        self.assertEqual(result["status"], "failed")
+        self.assertIn("bad offset", result["error"])
+
+    def test_input_size_none_when_streaming(self):
+        self.assertIsNone(report.RunReport(self.path, src="-").input_size)
+
+
+class TestErrorSummary(unittest.TestCase):
+    def setUp(self):
+        self.summary = report.ErrorSummary(max_samples=2)
+        for i in range(5):
+            self.summary.add(
+                "row{}".format(i), exceptions.NegativePositionError(variant=str(i))
+            )
+        self.summary.add("bad", "Could not parse 'bad'.")
+
+    def test_counts_errors_by_code(self):
+        self.assertEqual(len(self.summary), 6)
+        self.assertEqual(self.summary.counts["negative_position"], 5)
+        self.assertEqual(self.summary.counts["invalid_variant"], 1)
+
+    def test_keeps_bounded_samples(self):
+        self.assertEqual(len(self.summary.samples["negative_position"]), 2)
+        lines = self.summary.lines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("5 row(s) failed with 'negative_position'", lines[0])
+        self.assertIn("row1", lines[0])
+        self.assertNotIn("row2", lines[0])
+        self.assertTrue(lines[0].endswith("; ..."))
+
+    def test_logs_one_line_per_code(self):
+        logger = MagicMock()
+        self.summary.log(logger, "invalid.csv")
+        self.assertEqual(logger.warning.call_count, 3)
+        self.assertIn("invalid.csv", logger.warning.call_args_list[0][0][0])
+
+    def test_logs_through_a_logger(self):
+        # The test package disables logging, which would skip the call.
+        logging.disable(logging.NOTSET)
+        self.addCleanup(logging.disable, logging.CRITICAL)
+        logger = logging.getLogger("tests.test_report")
+        with self.assertLogs(logger, level="WARNING") as logs:
+            self.summary.log(logger, "invalid.csv")
+        self.assertEqual(len(logs.records), 3)
+        self.assertIn("invalid.csv", logs.records[0].getMessage())
+
+    def test_log_adds_counts_to_active_report(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with report.run_report(os.path.join(tmpdir, "r.json")) as run:
+                self.summary.log(MagicMock())
+            self.assertEqual(run.counters["invalid_negative_position"], 5)
+
+    def test_does_not_log_empty_summary(self):
+        logger = MagicMock()
+        report.ErrorSummary().log(logger)
+        logger.warning.assert_not_called()
+
+
+class TestQueueLogging(unittest.TestCase):
+    def test_package_logger_writes_through_queue(self):
+        handlers = logging.getLogger(LOGGER).handlers
+        self.assertTrue(any(isinstance(h, QueueHandler) for h in handlers))
+        self.assertTrue(LOG_LISTENER.handlers)
+
+
+if __name__ == "__main__":
+    unittest.main()
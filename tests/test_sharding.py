@@ -0,0 +1,87 @@
+import os
+import json
+import unittest
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from mavedbconvert import enrich, sharding, constants
+
+from tests import ProgramTestCase
+from tests.test_enrich import WT
+
+
+class TestShardBounds(unittest.TestCase):
+    def test_slices_cover_rows_in_order(self):
+        bounds = [sharding.shard_bounds(10, (i, 3)) for i in (1, 2, 3)]
+        self.assertListEqual(bounds, [(0, 3), (3, 6), (6, 10)])
+
+    def test_empty_slices_when_more_shards_than_rows(self):
+        self.assertEqual(sharding.shard_bounds(1, (1, 2)), (0, 0))
+
+
+class TestShardFilename(unittest.TestCase):
+    def test_inserts_and_removes_shard_number(self):
+        name = sharding.shard_filename("mavedb_enrich.csv", (2, 4))
+        self.assertEqual(name, "mavedb_enrich.shard-2-of-4.csv")
+        self.assertEqual(sharding.unshard_filename(name), "mavedb_enrich.csv")
+
+
+class TestShardedConversion(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "enrich", "enrich.tsv")
+        self.expected = os.path.join(self.data_dir, "enrich", "enrich_expected.csv")
+        self.dst = os.path.join(self.data_dir, "shards")
+
+    def convert(self, shard):
+        p = enrich.Enrich(
+            src=self.path,
+            wt_sequence=WT,
+            one_based=False,
+            score_column="log2_ratio",
+            input_type=constants.score_type,
+            dst=self.dst,
+            shard=shard,
+        )
+        p.convert()
+        return p.output_files[-1]
+
+    def test_writes_partial_outputs_and_metadata(self):
+        path = self.convert((1, 2))
+        self.assertEqual(
+            path, os.path.join(self.dst, "mavedb_enrich.shard-1-of-2.json")
+        )
+        with open(path) as fh:
+            metadata = json.load(fh)
+        self.assertEqual(metadata["shard"], [1, 2])
+        self.assertEqual(metadata["datasets"][0]["name"], "mavedb_enrich.csv")
+        self.assertEqual(
+            metadata["datasets"][0]["files"],
+            {"csv": "mavedb_enrich.shard-1-of-2.csv"},
+        )
+
+    def test_merge_matches_unsharded_conversion(self):
+        paths = [self.convert((i, 2)) for i in (2, 1)]
+        merged = sharding.merge(paths)
+        self.assertListEqual(merged, [os.path.join(self.dst, "mavedb_enrich.csv")])
+        assert_frame_equal(pd.read_csv(merged[0]), pd.read_csv(self.expected))
+
+    def test_merge_error_missing_shard(self):
+        path = self.convert((1, 2))
+        with self.assertRaises(ValueError):
+            sharding.merge([path])
+
+    def test_merge_error_shards_with_different_settings(self):
+        paths = [self.convert((i, 2)) for i in (1, 2)]
+        with open(paths[1]) as fh:
+            metadata = json.load(fh)
+        metadata["output_formats"] = ["parquet"]
+        with open(paths[1], "wt") as fh:
+            json.dump(metadata, fh)
+        with self.assertRaises(ValueError):
+            sharding.merge(paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import sys
 import unittest
+from unittest.mock import patch
 
 import numpy as np
+import pandas as pd
 
 from mavedbconvert import utilities, constants, exceptions
 
@@ -67,6 +70,15 @@ class TestFormatColumn(unittest.TestCase):
         self.assertIs(utilities.format_column(["none"], astype=str)[0], None)
 
 
+class TestExcelEngine(unittest.TestCase):
+    def test_returns_pandas_engine(self):
+        self.assertIn(utilities.excel_engine(), ("calamine", "openpyxl"))
+
+    def test_falls_back_to_openpyxl_without_calamine(self):
+        with patch.dict(sys.modules, {"python_calamine": None}):
+            self.assertEqual(utilities.excel_engine(), "openpyxl")
+
+
 class TestIsNumeric(unittest.TestCase):
     def test_true_for_float(self):
         self.assertTrue(utilities.is_numeric(float))
@@ -321,5 +333,51 @@ class TestHgvsColumns(unittest.TestCase):
         )
 
 
+class TestHgvsCategorical(unittest.TestCase):
+    def test_stores_variants_as_categorical(self):
+        column = utilities.hgvs_categorical(["c.1A>G", None, "c.1A>G"])
+        self.assertListEqual(list(column.categories), ["c.1A>G"])
+        self.assertListEqual(column.codes.tolist(), [0, -1, 0])
+
+    def test_shares_categories_of_dtype(self):
+        scores = utilities.hgvs_categorical(["c.1A>G", "c.2C>T"])
+        counts = utilities.hgvs_categorical(["c.2C>T", "c.1A>G"], scores.dtype)
+        self.assertIs(counts.categories, scores.categories)
+        self.assertListEqual(list(counts), ["c.2C>T", "c.1A>G"])
+
+    def test_appends_variants_missing_from_dtype(self):
+        scores = utilities.hgvs_categorical(["c.1A>G"])
+        counts = utilities.hgvs_categorical(["c.1A>G", "c.3G>A", None], scores.dtype)
+        self.assertListEqual(list(counts.categories), ["c.1A>G", "c.3G>A"])
+        self.assertListEqual(counts.codes.tolist(), [0, 1, -1])
+
+    def test_hgvs_dtypes_of_categorical_columns(self):
+        df = pd.DataFrame(
+            {
+                constants.nt_variant_col: utilities.hgvs_categorical(["c.1A>G"]),
+                constants.pro_variant_col: ["p.Met1Val"],
+                "score": [1.0],
+            }
+        )
+        dtypes = utilities.hgvs_dtypes(df)
+        self.assertListEqual(list(dtypes), [constants.nt_variant_col])
+
+
+class TestNullMask(unittest.TestCase):
+    def test_object_and_categorical_columns_agree(self):
+        values = ["c.1A>G", None, "None", " ", "c.2C>T"]
+        expected = [False, True, True, True, False]
+        self.assertListEqual(
+            utilities.null_mask(pd.Series(values, dtype=object)).tolist(), expected
+        )
+        self.assertListEqual(
+            utilities.null_mask(pd.Series(pd.Categorical(values))).tolist(), expected
+        )
+
+    def test_categorical_without_categories(self):
+        values = pd.Series(pd.Categorical([None, None]))
+        self.assertListEqual(utilities.null_mask(values).tolist(), [True, True])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -81,6 +81,68 @@ class TestHGVSValidators(unittest.TestCase):
         validators.validate_hgvs_uniqueness(df, constants.nt_variant_col)  # Should pass
 
 
+class TestStreamingUniquenessValidator(unittest.TestCase):
+    def test_nt_is_primary_column_when_present(self):
+        validator = validators.StreamingUniquenessValidator(
+            [constants.nt_variant_col, constants.pro_variant_col]
+        )
+        self.assertEqual(validator.primary_col, constants.nt_variant_col)
+
+    def test_pro_is_primary_column_when_nt_absent(self):
+        validator = validators.StreamingUniquenessValidator(
+            [constants.pro_variant_col]
+        )
+        self.assertEqual(validator.primary_col, constants.pro_variant_col)
+
+    def test_error_duplicates_within_chunk(self):
+        validator = validators.StreamingUniquenessValidator(
+            [constants.nt_variant_col]
+        )
+        df = pd.DataFrame({constants.nt_variant_col: ["c.1A>G", "c.1A>G"]})
+        with self.assertRaises(ValueError):
+            validator.validate(df)
+
+    def test_error_duplicates_across_chunks(self):
+        validator = validators.StreamingUniquenessValidator(
+            [constants.nt_variant_col]
+        )
+        validator.validate(pd.DataFrame({constants.nt_variant_col: ["c.1A>G"]}))
+        validator.validate(pd.DataFrame({constants.nt_variant_col: ["c.2A>G"]}))
+        with self.assertRaises(ValueError):
+            validator.validate(
+                pd.DataFrame({constants.nt_variant_col: ["c.3A>G", "c.1A>G"]})
+            )
+
+    def test_error_duplicates_after_runs_are_merged(self):
+        validator = validators.StreamingUniquenessValidator(
+            [constants.nt_variant_col]
+        )
+        for i in range(1, 8):
+            validator.validate(
+                pd.DataFrame({constants.nt_variant_col: ["c.{}A>G".format(i)]})
+            )
+        self.assertListEqual([len(run) for run in validator.runs], [4, 2, 1])
+        for i in range(1, 8):
+            with self.assertRaises(ValueError):
+                validator.validate(
+                    pd.DataFrame({constants.nt_variant_col: ["c.{}A>G".format(i)]})
+                )
+
+    def test_ignores_null_values(self):
+        validator = validators.StreamingUniquenessValidator(
+            [constants.nt_variant_col]
+        )
+        validator.validate(pd.DataFrame({constants.nt_variant_col: [None, None]}))
+        validator.validate(pd.DataFrame({constants.nt_variant_col: [None]}))
+
+    def test_duplicate_protein_variants_do_not_raise(self):
+        validator = validators.StreamingUniquenessValidator(
+            [constants.pro_variant_col]
+        )
+        validator.validate(pd.DataFrame({constants.pro_variant_col: ["p.Leu1Pro"]}))
+        validator.validate(pd.DataFrame({constants.pro_variant_col: ["p.Leu1Pro"]}))
+
+
 class TestMaveDBCompliance(unittest.TestCase):
     def test_error_primary_column_contains_null(self):
         df = pd.DataFrame(
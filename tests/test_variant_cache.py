@@ -0,0 +1,73 @@
+import os
+import unittest
+
+from mavedbconvert import variant_cache
+
+from tests import ProgramTestCase
+
+
+class TestParseContext(unittest.TestCase):
+    def test_changes_with_parse_settings(self):
+        context = variant_cache.parse_context("ATG", 0, True)
+        self.assertEqual(context, variant_cache.parse_context("atg", 0, True))
+        self.assertNotEqual(context, variant_cache.parse_context("ATC", 0, True))
+        self.assertNotEqual(context, variant_cache.parse_context("ATG", 3, True))
+        self.assertNotEqual(context, variant_cache.parse_context("ATG", 0, False))
+        self.assertNotEqual(
+            context, variant_cache.parse_context("ATG", 0, True, version="0.0.0")
+        )
+
+
+class TestVariantCache(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.data_dir, "variants.sqlite")
+        self.cache = variant_cache.VariantCache(self.path)
+        self.context = variant_cache.parse_context("AAA", 0, True)
+        self.results = {
+            "c.1A>G (p.Lys1Glu)": ("c.1A>G", "p.Lys1Glu", None),
+            "c.1T>G (p.Lys1Val)": (None, None, "Reference base mismatch."),
+        }
+
+    def tearDown(self):
+        self.cache.close()
+        super().tearDown()
+
+    def test_lookup_returns_stored_results(self):
+        self.cache.store(self.context, "variants", self.results)
+        cached = self.cache.lookup(
+            self.context, "variants", list(self.results) + ["c.2A>G (p.Lys1Arg)"]
+        )
+        self.assertDictEqual(cached, self.results)
+
+    def test_lookup_is_keyed_on_context_and_element(self):
+        self.cache.store(self.context, "variants", self.results)
+        self.assertEqual(
+            self.cache.lookup(self.context, "synonymous", self.results), {}
+        )
+        self.assertEqual(self.cache.lookup(self.context, None, self.results), {})
+        other = variant_cache.parse_context("AAG", 0, True)
+        self.assertEqual(self.cache.lookup(other, "variants", self.results), {})
+
+    def test_persists_across_connections(self):
+        self.cache.store(self.context, None, self.results)
+        self.cache.close()
+        self.cache = variant_cache.VariantCache(self.path)
+        self.assertEqual(len(self.cache), 2)
+        self.assertDictEqual(
+            self.cache.lookup(self.context, None, self.results), self.results
+        )
+
+    def test_lookup_handles_more_variants_than_batch_size(self):
+        results = {
+            "c.{}A>G".format(i): ("c.{}A>G".format(i), None, None)
+            for i in range(variant_cache.BATCH_SIZE + 5)
+        }
+        self.cache.store(self.context, None, results)
+        self.assertEqual(
+            len(self.cache.lookup(self.context, None, results)), len(results)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
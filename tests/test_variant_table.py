@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+from mavedbconvert import reference, variant_table
+
+
+class TestVariantTable(unittest.TestCase):
+    def setUp(self):
+        # Asp Val Trp
+        self.index = reference.WildTypeIndex("GACGTTTGG")
+
+    def test_from_seq_ids_fills_event_arrays(self):
+        table = variant_table.VariantTable.from_seq_ids(["0-L", "1,2-y,?"])
+        self.assertEqual(len(table), 3)
+        self.assertListEqual(table.row.tolist(), [0, 1, 1])
+        self.assertListEqual(table.event.tolist(), [0, 0, 1])
+        self.assertListEqual(table.row_offsets.tolist(), [0, 1, 3])
+        self.assertListEqual(table.position.tolist(), [0, 1, 2])
+        self.assertEqual(table.alt.tobytes(), b"LYX")
+        self.assertEqual(table.prefix.tobytes(), b"ppp")
+
+    def test_from_seq_ids_does_not_parse_malformed_seq_ids(self):
+        seq_ids = ["", "-", "NA-NA", "0-", "-D", "0-B", "1,2-L", None, "0-L"]
+        table = variant_table.VariantTable.from_seq_ids(seq_ids)
+        self.assertListEqual(table.parsed.tolist(), [False] * 8 + [True])
+        self.assertListEqual(table.row.tolist(), [8])
+
+    def test_shift_subtracts_offset(self):
+        table = variant_table.VariantTable.from_seq_ids(["3-L"]).shift(2)
+        self.assertListEqual(table.position.tolist(), [1])
+
+    def test_invalid_rows_out_of_bounds(self):
+        table = variant_table.VariantTable.from_seq_ids(["1-L", "0,2-L,L", "3-L", "x"])
+        invalid = table.invalid_rows(table.out_of_bounds(3))
+        self.assertListEqual(invalid.tolist(), [False, True, False, True])
+
+    def test_to_hgvs_formats_protein_variants(self):
+        table = variant_table.VariantTable.from_seq_ids(
+            ["0-D", "0-L", "0,1-L,Y", "0,0-L,L", "2-?", "x"]
+        )
+        table = table.shift(-1).fill_reference(self.index.protein)
+        self.assertListEqual(
+            table.to_hgvs(),
+            [
+                "p.Asp1=",
+                "p.Asp1Leu",
+                "p.[Asp1Leu;Val2Tyr]",
+                "p.Asp1Leu",
+                "p.Trp3Xaa",
+                None,
+            ],
+        )
+
+    def test_to_hgvs_skips_rows_not_valid(self):
+        table = variant_table.VariantTable.from_seq_ids(["1-L", "2-L"])
+        table = table.fill_reference(self.index.protein)
+        self.assertListEqual(table.to_hgvs(valid=[False, True]), [None, "p.Val2Leu"])
+
+    def test_to_hgvs_without_events(self):
+        table = variant_table.VariantTable.from_seq_ids(["x"])
+        self.assertEqual(len(table), 0)
+        self.assertListEqual(table.to_hgvs(), [None])
+
+    def test_codon_substitutions_formats_nucleotide_variants(self):
+        table = variant_table.VariantTable.codon_substitutions(
+            np.array([1.0, np.nan, 3.0]), ["GAA", "TGG"], parsed=[True, False, True]
+        )
+        self.assertListEqual(table.position.tolist(), [1, 2, 3, 7, 8, 9])
+        table = table.fill_reference(self.index.bases)
+        self.assertListEqual(table.to_hgvs(), ["c.[1=;2=;3C>A]", None, "c.[7=;8=;9=]"])
+
+    def test_reference_mismatches(self):
+        table = variant_table.VariantTable(
+            row=[0, 1, 2, 3],
+            position=[1, 2, 10, 3],
+            ref=reference.encode("GTGA"),
+            alt=reference.encode("AAAA"),
+            prefix=reference.encode("cccc"),
+            n_rows=4,
+        )
+        mismatched = table.reference_mismatches(self.index.bases)
+        self.assertListEqual(mismatched.tolist(), [False, True, True, True])
+
+    def test_error_events_not_ordered_by_row(self):
+        with self.assertRaises(ValueError):
+            variant_table.VariantTable(
+                row=[1, 0],
+                position=[1, 1],
+                ref=[0, 0],
+                alt=[65, 65],
+                prefix=[99, 99],
+                n_rows=2,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import io
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from mavedbconvert import writers, constants
+
+from tests import ProgramTestCase
+
+try:
+    import pyarrow as pa
+    from pyarrow import parquet, feather
+except ImportError:  # pragma: no cover
+    pa = None
+
+
+class TestWriteCsv(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                constants.nt_variant_col: [
+                    "c.1A>G",
+                    None,
+                    "c.[1A>G;2C>T]",
+                    'a,"b"',
+                    "c\nd",
+                    np.NaN,
+                ],
+                "score": [1.5, np.NaN, 1e-20, -0.0, np.inf, 1 / 3],
+                "count": [1, 2, 3, 4, 5, 6],
+                "flag": [True, False, True, False, True, False],
+                "se": pd.array([0.1, None, 3, 4, 5, 6], dtype="Float64"),
+            }
+        )
+
+    def assert_matches_pandas(self, df, **kwargs):
+        expected = io.StringIO()
+        df.to_csv(
+            expected,
+            sep=",",
+            na_rep=np.NaN,
+            index=kwargs.get("index", False),
+            header=kwargs.get("header", True),
+        )
+        result = io.StringIO()
+        writers.write_csv(df, result, chunksize=4, **kwargs)
+        self.assertEqual(result.getvalue(), expected.getvalue())
+
+    def test_matches_pandas(self):
+        self.assert_matches_pandas(self.df)
+
+    def test_matches_pandas_with_index(self):
+        self.assert_matches_pandas(self.df, index=True)
+        self.assert_matches_pandas(
+            self.df.set_index(constants.nt_variant_col), index=True
+        )
+
+    def test_matches_pandas_without_header(self):
+        self.assert_matches_pandas(self.df, header=False)
+
+    def test_matches_pandas_for_empty_frame(self):
+        self.assert_matches_pandas(self.df.iloc[:0])
+
+    def test_quotes_column_names(self):
+        self.assert_matches_pandas(self.df.rename(columns={"score": "a,b"}))
+
+    def test_falls_back_to_pandas_for_other_frames(self):
+        self.assert_matches_pandas(self.df[["score"]])
+        self.assert_matches_pandas(
+            pd.DataFrame({"date": pd.date_range("2020", periods=3), "x": [1, 2, 3]})
+        )
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestColumnarWriters(ProgramTestCase):
+    def setUp(self):
+        super().setUp()
+        self.df = pd.DataFrame(
+            {
+                constants.nt_variant_col: ["c.1A>G", "c.2C>T", "c.1A>G"],
+                constants.pro_variant_col: [None, np.NaN, None],
+                "score": [1.5, np.NaN, -0.25],
+                "count": [1, 2, 3],
+            }
+        )
+
+    def test_hgvs_columns_are_dictionary_encoded(self):
+        table = writers.to_arrow_table(self.df)
+        for column in constants.variant_columns:
+            self.assertTrue(pa.types.is_dictionary(table.schema.field(column).type))
+        self.assertTrue(pa.types.is_floating(table.schema.field("score").type))
+        self.assertTrue(pa.types.is_integer(table.schema.field("count").type))
+
+    def test_keeps_categorical_hgvs_columns(self):
+        df = self.df.astype({constants.nt_variant_col: "category"})
+        table = writers.to_arrow_table(df)
+        field = table.schema.field(constants.nt_variant_col)
+        self.assertTrue(pa.types.is_dictionary(field.type))
+        self.assertListEqual(
+            table.column(constants.nt_variant_col).to_pylist(),
+            list(self.df[constants.nt_variant_col]),
+        )
+
+    def test_parquet_roundtrip_keeps_dtypes(self):
+        path = os.path.join(self.data_dir, "mavedb.parquet")
+        writers.write_parquet(self.df, path)
+        result = parquet.read_table(path).to_pandas()
+        self.assertEqual(result["count"].dtype, np.int64)
+        self.assertEqual(result["score"].dtype, np.float64)
+        self.assertListEqual(
+            list(result[constants.nt_variant_col].astype(str)),
+            list(self.df[constants.nt_variant_col]),
+        )
+        self.assertTrue(result[constants.pro_variant_col].isna().all())
+
+    def test_feather_roundtrip(self):
+        path = os.path.join(self.data_dir, "mavedb.feather")
+        writers.write_feather(self.df, path, compression="zstd")
+        result = feather.read_feather(path)
+        assert_frame_equal(result[["score", "count"]], self.df[["score", "count"]])
+
+    def test_error_unknown_format(self):
+        with self.assertRaises(ValueError):
+            writers.write_columnar(self.df, "out", "xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()